@@ -125,19 +125,147 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
-LOGIN_URL = 'login'
+# Login view is namespaced by the users app; login_required redirects here
+LOGIN_URL = 'users:login'
 
-CACHE = {
-    'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': 'redis://redis:6379/1',
-        'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+# Cache
+# При пустом CACHE_URL используется локальный кэш процесса (для разработки
+# и тестов), иначе — Redis с резервным локальным кэшем на время его
+# недоступности.
+CACHE_URL = env('CACHE_URL', default='')
+
+CACHE_COMPRESSORS = {
+    'none': 'django_redis.compressors.identity.IdentityCompressor',
+    'zlib': 'django_redis.compressors.zlib.ZlibCompressor',
+    'lzma': 'django_redis.compressors.lzma.LzmaCompressor',
+}
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.ResilientRedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': env('CACHE_KEY_PREFIX', default='industrial_safety'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'CONNECTION_POOL_KWARGS': {
+                    'max_connections': env.int(
+                        'CACHE_MAX_CONNECTIONS', default=50
+                    ),
+                },
+                'SOCKET_CONNECT_TIMEOUT': env.float(
+                    'CACHE_SOCKET_CONNECT_TIMEOUT', default=0.5
+                ),
+                'SOCKET_TIMEOUT': env.float('CACHE_SOCKET_TIMEOUT', default=0.5),
+                'COMPRESSOR': CACHE_COMPRESSORS[
+                    env('CACHE_COMPRESSOR', default='zlib')
+                ],
+                # Страницы списка, сводки и документы кэшируются как
+                # объекты моделей, даты и байты, поэтому только pickle.
+                'SERIALIZER': (
+                    'django_redis.serializers.pickle.PickleSerializer'
+                ),
+                'RETRY_INTERVAL': env.int('CACHE_RETRY_INTERVAL', default=30),
+                # Поколения списка проверок, увеличенные во время
+                # недоступности Redis только в локальном кэше, сбрасываются
+                # после восстановления, иначе снова читались бы страницы и
+                # отчёты прежних поколений (см. facility.caching).
+                'RECOVERY_DELETE_PATTERNS': ['examinations_generation:*'],
+                'COLLECT_STATS': env.bool('CACHE_COLLECT_STATS', default=True),
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
-}
 
 # Variable of the cache storage time value
-CACHE_TTL = env('CACHE_TIME', default=300)
+CACHE_TTL = env.int('CACHE_TIME', default=300)
 # Variable value of the number of pages displayed
 DISPLAY_COUNT = env.int('DISPLAY_COUNT', default=4)
+# Pagination mode of the examinations list: 'offset' or 'cursor'
+INDEX_PAGINATION = env.str('INDEX_PAGINATION', default='offset')
+# Use the PostgreSQL planner estimate instead of COUNT(*) for the total
+INDEX_APPROXIMATE_COUNT = env.bool('INDEX_APPROXIMATE_COUNT', default=False)
+# Number of rows inserted in one transaction by the examinations import
+EXAMINATION_IMPORT_BATCH_SIZE = env.int(
+    'EXAMINATION_IMPORT_BATCH_SIZE', default=2000
+)
+# Storage time of the due dates dashboard; it is also reset on any change
+DASHBOARD_CACHE_TTL = env.int('DASHBOARD_CACHE_TTL', default=60 * 60)
+# Number of examinations listed on the due dates dashboard
+DASHBOARD_LIST_SIZE = env.int('DASHBOARD_LIST_SIZE', default=100)
+# Storage time of the organization statistics; it is also reset on any change
+STATISTICS_CACHE_TTL = env.int('STATISTICS_CACHE_TTL', default=6 * 60 * 60)
+# Number of recent months in the monthly examination statistics
+STATISTICS_MONTHS = env.int('STATISTICS_MONTHS', default=24)
+# Number of days before the next check when its author is notified
+EXAMINATION_NOTIFY_DAYS = env.int('EXAMINATION_NOTIFY_DAYS', default=30)
+# Email delivery; the console backend prints messages instead of sending
+EMAIL_BACKEND = env.str(
+    'EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend'
+)
+EMAIL_HOST = env.str('EMAIL_HOST', default='localhost')
+EMAIL_PORT = env.int('EMAIL_PORT', default=25)
+EMAIL_HOST_USER = env.str('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = env.str('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=False)
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=30)
+DEFAULT_FROM_EMAIL = env.str('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+# Number of processes rendering documents of a batch
+DOCUMENT_WORKERS = env.int('DOCUMENT_WORKERS', default=2)
+# Maximum number of examinations in one batch of documents
+DOCUMENT_BATCH_LIMIT = env.int('DOCUMENT_BATCH_LIMIT', default=1000)
+# Number of prepared document templates kept in memory of each process
+DOCUMENT_TEMPLATE_CACHE_SIZE = env.int(
+    'DOCUMENT_TEMPLATE_CACHE_SIZE', default=16
+)
+# Prepare all document templates when the application starts
+DOCUMENT_TEMPLATE_WARMUP = env.bool('DOCUMENT_TEMPLATE_WARMUP', default=False)
+# Storage of generated documents: 'cache' (Django cache), 'disk' or empty
+DOCUMENT_CACHE = env.str('DOCUMENT_CACHE', default='cache')
+# Storage time of a document in the Django cache, in seconds
+DOCUMENT_CACHE_TTL = env.int('DOCUMENT_CACHE_TTL', default=7 * 24 * 60 * 60)
+# Directory and total size limit (megabytes) of the disk document storage
+DOCUMENT_CACHE_DIR = env.str(
+    'DOCUMENT_CACHE_DIR', default=str(BASE_DIR / 'document_cache')
+)
+DOCUMENT_CACHE_MAX_SIZE = env.int(
+    'DOCUMENT_CACHE_MAX_SIZE', default=512
+) * 1024 * 1024
+# Minimum seconds between size checks of the disk document storage in each
+# process
+DOCUMENT_CACHE_EVICT_INTERVAL = env.int(
+    'DOCUMENT_CACHE_EVICT_INTERVAL', default=60
+)
+# Queue of background document jobs: 'redis' or 'local' (in-process)
+DOCUMENT_JOB_QUEUE = env.str(
+    'DOCUMENT_JOB_QUEUE', default='redis' if CACHE_URL else 'local'
+)
+# The queue should use a Redis instance that does not evict keys: the cache
+# instance evicts least recently used keys, including queued job ids
+DOCUMENT_JOB_QUEUE_URL = env.str('DOCUMENT_JOB_QUEUE_URL', default=CACHE_URL)
+DOCUMENT_JOB_QUEUE_NAME = env.str(
+    'DOCUMENT_JOB_QUEUE_NAME', default='document_jobs'
+)
+# Process jobs of the local queue in a thread of the web process; without
+# it background generation is not offered for the local queue
+DOCUMENT_JOB_LOCAL_WORKER = env.bool('DOCUMENT_JOB_LOCAL_WORKER', default=False)
+# Hours a finished job and its document are kept
+DOCUMENT_JOB_RETENTION = env.int('DOCUMENT_JOB_RETENTION', default=24)
+# Seconds after which a running job whose worker stopped is failed and a
+# queued job whose id was lost from the queue is queued again
+DOCUMENT_JOB_TIMEOUT = env.int('DOCUMENT_JOB_TIMEOUT', default=600)
+# Addresses (host:port) of unoserver processes converting documents to PDF;
+# PDF output is disabled when empty
+DOCUMENT_PDF_SERVERS = env.list('DOCUMENT_PDF_SERVERS', default=[])
+# Requests allowed to wait for a free converter in each web process
+DOCUMENT_PDF_QUEUE_LIMIT = env.int('DOCUMENT_PDF_QUEUE_LIMIT', default=4)
+# Seconds to wait for a converter and the conversion
+DOCUMENT_PDF_TIMEOUT = env.int('DOCUMENT_PDF_TIMEOUT', default=30)
+DOCUMENT_PDF_EXECUTABLE = env.str(
+    'DOCUMENT_PDF_EXECUTABLE', default='libreoffice'
+)
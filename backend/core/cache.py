@@ -0,0 +1,241 @@
+"""
+Модуль бэкенда кэша Redis с резервным локальным кэшем и сбором статистики
+попаданий и промахов.
+
+Классы:
+    ResilientRedisCache — Кэш Redis, который при недоступности сервера
+        переключается на локальный кэш процесса, чтобы ошибки кэша
+        не приводили к ошибкам запросов.
+"""
+import logging
+import socket
+import threading
+import time
+from collections import Counter
+
+from django.core.cache.backends.locmem import LocMemCache
+from django_redis.cache import RedisCache
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import ConnectionError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (
+    ConnectionError, TimeoutError, ConnectionInterrupted, socket.timeout
+)
+STATS_KEY = 'cache_stats'
+MISSING = object()
+
+
+def get_key_prefix(key):
+    """
+    Возвращает префикс ключа кэша — пространство имён до первого ':'.
+    Ключ без ':' целиком считается своим пространством имён.
+    """
+    return str(key).split(':', 1)[0]
+
+
+class ResilientRedisCache(RedisCache):
+    """
+    Кэш Redis с переключением на локальный кэш при недоступности сервера.
+
+    После ошибки соединения Redis не используется в течение RETRY_INTERVAL
+    секунд: все операции выполняются в локальном кэше процесса, поэтому
+    запросы не ожидают таймаута соединения на каждой операции. После
+    восстановления соединения локальный кэш очищается, а ключи шаблонов
+    RECOVERY_DELETE_PATTERNS удаляются из Redis.
+
+    Бэкенд считает попадания и промахи по префиксам ключей. Счётчики
+    накапливаются в процессе и раз в STATS_FLUSH_INTERVAL секунд
+    добавляются в хэш Redis, в котором собирается общая статистика всех
+    рабочих процессов.
+
+    Дополнительные параметры OPTIONS:
+        RETRY_INTERVAL (int): Пауза перед повторным обращением к Redis после
+            ошибки соединения, в секундах (по умолчанию 30).
+        RECOVERY_DELETE_PATTERNS (list): Шаблоны ключей, удаляемых из Redis
+            при первом обращении после восстановления соединения (по
+            умолчанию пустой список). Изменения таких ключей во время
+            недоступности попадают только в локальный кэш, и без удаления
+            после восстановления снова читались бы прежние значения.
+        COLLECT_STATS (bool): Собирать ли статистику (по умолчанию True).
+        STATS_FLUSH_INTERVAL (int): Период сохранения статистики в Redis,
+            в секундах (по умолчанию 10).
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get('OPTIONS', {})
+        self._retry_interval = options.get('RETRY_INTERVAL', 30)
+        self._collect_stats = options.get('COLLECT_STATS', True)
+        self._stats_flush_interval = options.get('STATS_FLUSH_INTERVAL', 10)
+        self._unavailable_until = 0
+        self._recovery_patterns = options.get('RECOVERY_DELETE_PATTERNS', [])
+        self._recovering = False
+        self._fallback = LocMemCache(f'fallback-{server}', {
+            'TIMEOUT': params.get('TIMEOUT', 300),
+            'KEY_PREFIX': params.get('KEY_PREFIX', ''),
+            'VERSION': params.get('VERSION', 1),
+        })
+        self._stats_lock = threading.Lock()
+        self._hits = Counter()
+        self._misses = Counter()
+        self._stats_flushed_at = time.monotonic()
+
+    @property
+    def is_available(self):
+        """Признак того, что операции выполняются в Redis."""
+        return time.monotonic() >= self._unavailable_until
+
+    def _call(self, method, *args, **kwargs):
+        """
+        Выполняет операцию в Redis, а при его недоступности — в локальном
+        кэше.
+        """
+        if self.is_available:
+            try:
+                if self._recovering:
+                    self._recover()
+                return getattr(super(), method)(*args, **kwargs)
+            except CONNECTION_ERRORS as error:
+                logger.warning(
+                    'Redis недоступен, используется локальный кэш: %s', error
+                )
+                self._recovering = True
+                self._unavailable_until = (
+                    time.monotonic() + self._retry_interval
+                )
+        return getattr(self._fallback, method)(*args, **kwargs)
+
+    def _recover(self):
+        """
+        Удаляет из Redis ключи шаблонов RECOVERY_DELETE_PATTERNS, которые во
+        время недоступности изменялись только в локальном кэше, и очищает
+        локальный кэш, чтобы при следующей недоступности не читались
+        оставшиеся в нём устаревшие значения.
+        """
+        for pattern in self._recovery_patterns:
+            super().delete_pattern(pattern)
+        self._recovering = False
+        self._fallback.clear()
+        logger.info('Соединение с Redis восстановлено')
+
+    def get(self, key, default=None, version=None):
+        value = self._call('get', key, MISSING, version=version)
+        self._record(key, value is not MISSING)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        values = self._call('get_many', keys, version=version)
+        for key in keys:
+            self._record(key, key in values)
+        return values
+
+    def set(self, *args, **kwargs):
+        return self._call('set', *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        return self._call('add', *args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self._call('set_many', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call('delete', *args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self._call('delete_many', *args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        return self._call('incr', *args, **kwargs)
+
+    def decr(self, *args, **kwargs):
+        return self._call('decr', *args, **kwargs)
+
+    def has_key(self, *args, **kwargs):
+        return self._call('has_key', *args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        return self._call('touch', *args, **kwargs)
+
+    def clear(self):
+        self._fallback.clear()
+        return self._call('clear')
+
+    def _record(self, key, hit):
+        """Учитывает попадание или промах по префиксу ключа."""
+        if not self._collect_stats:
+            return
+        with self._stats_lock:
+            counter = self._hits if hit else self._misses
+            counter[get_key_prefix(key)] += 1
+            due = (
+                time.monotonic() - self._stats_flushed_at
+                >= self._stats_flush_interval
+            )
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Добавляет накопленные в процессе счётчики в хэш Redis."""
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            self._hits, self._misses = Counter(), Counter()
+            self._stats_flushed_at = time.monotonic()
+        if not (hits or misses):
+            return
+        try:
+            if not self.is_available:
+                raise ConnectionError('Redis недоступен')
+            pipeline = self.client.get_client(write=True).pipeline()
+            stats_key = self.make_key(STATS_KEY)
+            for prefix, count in hits.items():
+                pipeline.hincrby(stats_key, f'{prefix}:hits', count)
+            for prefix, count in misses.items():
+                pipeline.hincrby(stats_key, f'{prefix}:misses', count)
+            pipeline.execute()
+        except CONNECTION_ERRORS:
+            with self._stats_lock:
+                self._hits.update(hits)
+                self._misses.update(misses)
+
+    def get_stats(self):
+        """
+        Возвращает статистику по префиксам ключей в виде словаря
+        {префикс: {'hits': int, 'misses': int}}: общую из Redis и ещё
+        не сохранённую статистику текущего процесса.
+        """
+        self.flush_stats()
+        stats = {}
+        with self._stats_lock:
+            pending = [('hits', self._hits), ('misses', self._misses)]
+            for kind, counter in pending:
+                for prefix, count in counter.items():
+                    stats.setdefault(prefix, {'hits': 0, 'misses': 0})
+                    stats[prefix][kind] += count
+        stored = {}
+        if self.is_available:
+            try:
+                stored = self.client.get_client(write=False).hgetall(
+                    self.make_key(STATS_KEY)
+                )
+            except CONNECTION_ERRORS:
+                pass
+        for field, count in stored.items():
+            prefix, kind = field.decode().rsplit(':', 1)
+            stats.setdefault(prefix, {'hits': 0, 'misses': 0})
+            stats[prefix][kind] += int(count)
+        return stats
+
+    def reset_stats(self):
+        """Удаляет накопленную статистику."""
+        with self._stats_lock:
+            self._hits, self._misses = Counter(), Counter()
+        if not self.is_available:
+            return
+        try:
+            self.client.get_client(write=True).delete(
+                self.make_key(STATS_KEY)
+            )
+        except CONNECTION_ERRORS:
+            pass
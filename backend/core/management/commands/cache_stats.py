@@ -0,0 +1,50 @@
+"""
+Команда вывода статистики попаданий и промахов кэша по префиксам ключей.
+
+Пример:
+    python manage.py cache_stats
+    python manage.py cache_stats --reset
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Выводит количество попаданий и промахов кэша по префиксам '
+            'ключей, собранное всеми рабочими процессами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Сбросить статистику после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, 'get_stats'):
+            raise CommandError(
+                f'Бэкенд кэша {cache.__class__.__name__} не собирает '
+                f'статистику. Укажите CACHE_URL для использования Redis.'
+            )
+        stats = cache.get_stats()
+        if not cache.is_available:
+            self.stderr.write(
+                'Redis недоступен, выводится статистика только '
+                'текущего процесса.'
+            )
+        if not stats:
+            self.stdout.write('Статистика пока не собрана.')
+        else:
+            self.stdout.write(
+                f'{"Префикс":<24}{"Попадания":>12}{"Промахи":>12}'
+                f'{"Доля попаданий":>16}'
+            )
+            for prefix, counts in sorted(stats.items()):
+                total = counts['hits'] + counts['misses']
+                rate = counts['hits'] / total if total else 0
+                self.stdout.write(
+                    f'{prefix:<24}{counts["hits"]:>12}'
+                    f'{counts["misses"]:>12}{rate:>16.1%}'
+                )
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write('Статистика сброшена.')
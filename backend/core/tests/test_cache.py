@@ -0,0 +1,170 @@
+from fnmatch import fnmatch
+from io import StringIO
+
+import pytest
+from core.cache import ResilientRedisCache, get_key_prefix
+from django.core.management import CommandError, call_command
+from django_redis.cache import RedisCache
+from redis.exceptions import ConnectionError
+
+
+@pytest.fixture
+def unavailable_cache():
+    """Фикстура кэша Redis, сервер которого недоступен."""
+    return ResilientRedisCache('redis://127.0.0.1:1/0', {
+        'OPTIONS': {
+            'SOCKET_CONNECT_TIMEOUT': 0.1,
+            'SOCKET_TIMEOUT': 0.1,
+            'RETRY_INTERVAL': 60,
+        }
+    })
+
+
+class FakeRedis:
+    """
+    Хранилище, заменяющее операции RedisCache в тестах: во время
+    имитации недоступности каждая операция завершается ошибкой соединения.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.outage = False
+
+    def check(self):
+        if self.outage:
+            raise ConnectionError('Redis недоступен')
+
+    def get(self, key, default=None, version=None):
+        self.check()
+        return self.data.get(key, default)
+
+    def add(self, key, value, timeout=None, version=None):
+        self.check()
+        return self.data.setdefault(key, value) is value
+
+    def set(self, key, value, timeout=None, version=None):
+        self.check()
+        self.data[key] = value
+
+    def incr(self, key, delta=1, version=None):
+        self.check()
+        if key not in self.data:
+            raise ValueError(f'Ключ {key} не найден.')
+        self.data[key] += delta
+        return self.data[key]
+
+    def delete_pattern(self, pattern):
+        self.check()
+        for key in [key for key in self.data if fnmatch(key, pattern)]:
+            del self.data[key]
+
+
+@pytest.fixture
+def flaky_cache(monkeypatch):
+    """
+    Фикстура кэша Redis, недоступность сервера которого включается
+    атрибутом redis.outage.
+    """
+    redis = FakeRedis()
+    for method in ('get', 'add', 'set', 'incr', 'delete_pattern'):
+        monkeypatch.setattr(
+            RedisCache, method, staticmethod(getattr(redis, method))
+        )
+    flaky = ResilientRedisCache('redis://127.0.0.1:1/0', {
+        'OPTIONS': {
+            'RETRY_INTERVAL': 0,
+            'COLLECT_STATS': False,
+            'RECOVERY_DELETE_PATTERNS': ['examinations_generation:*'],
+        }
+    })
+    flaky.redis = redis
+    return flaky
+
+
+def test_get_key_prefix():
+    """Тестирование выделения префикса ключа кэша."""
+    assert get_key_prefix('examinations_page:1:2:abc') == (
+        'examinations_page'
+    )
+    assert get_key_prefix('examinations_generation:1') == (
+        'examinations_generation'
+    )
+    assert get_key_prefix('document:abc') == 'document'
+    assert get_key_prefix('organizations') == 'organizations'
+
+
+def test_fallback_when_redis_unavailable(unavailable_cache):
+    """
+    Тестирование работы кэша через локальный бэкенд при недоступном Redis.
+    """
+    unavailable_cache.set('examinations_page', [1, 2, 3])
+    assert not unavailable_cache.is_available
+    assert unavailable_cache.get('examinations_page') == [1, 2, 3]
+    assert unavailable_cache.get('missing', 'default') == 'default'
+    assert unavailable_cache.get_or_set('counter', 1) == 1
+    assert unavailable_cache.incr('counter') == 2
+    unavailable_cache.delete('counter')
+    assert unavailable_cache.get('counter') is None
+
+
+def test_stats_collected_by_prefix(unavailable_cache):
+    """Тестирование подсчёта попаданий и промахов по префиксам ключей."""
+    unavailable_cache.set('document:1', b'content')
+    unavailable_cache.get('document:1')
+    unavailable_cache.get('document:2')
+    unavailable_cache.get_many(['examinations_page:1', 'document:1'])
+    assert unavailable_cache.get_stats() == {
+        'document': {'hits': 2, 'misses': 1},
+        'examinations_page': {'hits': 0, 'misses': 1},
+    }
+    unavailable_cache.reset_stats()
+    assert unavailable_cache.get_stats() == {}
+
+
+def test_cache_stats_command(unavailable_cache):
+    """Тестирование вывода статистики командой cache_stats."""
+    unavailable_cache.get('document:1')
+    out = StringIO()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            'core.management.commands.cache_stats.cache', unavailable_cache
+        )
+        call_command('cache_stats', '--reset', stdout=out, stderr=StringIO())
+    output = out.getvalue()
+    assert 'document' in output
+    assert '0.0%' in output
+    assert unavailable_cache.get_stats() == {}
+
+
+def test_cache_stats_command_unsupported_backend(settings):
+    """
+    Тестирование ошибки команды cache_stats для бэкенда без статистики.
+    """
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    with pytest.raises(CommandError):
+        call_command('cache_stats')
+
+
+def test_generation_bumped_during_outage_reset(flaky_cache):
+    """
+    Тестирование сброса поколения, увеличенного во время недоступности
+    Redis только в локальном кэше: после восстановления не читаются ни
+    прежнее поколение Redis, ни значения локального кэша.
+    """
+    key = 'examinations_generation:1'
+    assert flaky_cache.get_or_set(key, 5) == 5
+    flaky_cache.set('examinations_page:1:5:abc', ['page'])
+
+    flaky_cache.redis.outage = True
+    assert flaky_cache.get_or_set(key, 7) == 7
+    assert flaky_cache.incr(key) == 8
+
+    flaky_cache.redis.outage = False
+    assert flaky_cache.get(key) is None
+    assert flaky_cache.get_or_set(key, 9) == 9
+    assert flaky_cache.get('examinations_page:1:5:abc') == ['page']
+    assert not flaky_cache._fallback.has_key(key)
@@ -0,0 +1,45 @@
+"""
+Модуль администрирования для просмотра заданий генерации документов
+в интерфейсе Django Admin.
+
+Классы:
+    DocumentJobAdmin — Настройка отображения и фильтрации данных модели
+        DocumentJob в Django Admin.
+"""
+from django.contrib import admin
+
+from .models import DocumentJob
+
+
+class DocumentJobAdmin(admin.ModelAdmin):
+    """
+    Класс для настройки отображения и фильтрации данных модели DocumentJob
+    в Django Admin.
+
+    Атрибуты:
+        list_display (tuple): Определяет поля модели DocumentJob,
+            отображаемые в списке записей, включая время ожидания в очереди,
+            время заполнения и размер документа для оценки нагрузки на
+            обработчики.
+        list_filter (tuple): Определяет поля для фильтрации в Django Admin
+            списка записей по состоянию и шаблону.
+        exclude (tuple): Содержимое документа не отображается в форме.
+        readonly_fields (tuple): Задания создаются и изменяются только
+            обработчиками.
+    """
+    list_display = (
+        'id', 'user', 'template', 'status', 'created_at',
+        'queue_time', 'render_time', 'size'
+    )
+    list_filter = ('status', 'template')
+    exclude = ('content',)
+    readonly_fields = (
+        'user', 'template', 'combined', 'examination_ids', 'status', 'error',
+        'created_at', 'started_at', 'finished_at', 'filename', 'size'
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('content')
+
+
+admin.site.register(DocumentJob, DocumentJobAdmin)
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DocumentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'documents'
+
+    def ready(self):
+        """
+        Регистрирует проверку шаблонов документов. Если включена настройка
+        DOCUMENT_TEMPLATE_WARMUP, при запуске процесса определяет
+        переменные всех шаблонов и подготавливает их.
+        """
+        from . import checks  # noqa: F401
+
+        if settings.DOCUMENT_TEMPLATE_WARMUP:
+            from .registry import scan
+            from .template_cache import warm_up
+
+            warm_up(info.path for info in scan())
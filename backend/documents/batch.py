@@ -0,0 +1,126 @@
+"""
+Модуль пакетной генерации документов.
+
+Проверки загружаются из базы одним запросом, документы заполняются в
+пуле процессов и по мере готовности записываются в ZIP-архив, который
+отдаётся клиенту потоком. Промежуточные файлы на диске не создаются.
+"""
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from facility.export import StreamBuffer
+from facility.filters import (filter_examinations, get_filtered_examinations,
+                              get_ordering, get_visible_examinations)
+
+from .document_generation import (get_context, get_context_keys,
+                                  get_template_path, render_document)
+from .template_cache import get_template
+
+
+class BatchTooLarge(Exception):
+    """Количество выбранных проверок превышает DOCUMENT_BATCH_LIMIT."""
+
+
+def get_batch_examinations(user, params):
+    """
+    Возвращает проверки для пакетной генерации: перечисленные в параметре
+    'ids' или отобранные фильтрами главной страницы. Учитываются только
+    проверки, доступные пользователю.
+    """
+    ids = [pk for pk in params.getlist('ids') if pk.isdigit()]
+    if ids:
+        queryset = filter_examinations(
+            get_visible_examinations(user).filter(pk__in=ids), params
+        ).order_by(get_ordering(params))
+    else:
+        queryset = get_filtered_examinations(user, params)
+    return queryset.select_related(
+        'examined__company_name', 'commission', 'briefing', 'course'
+    )
+
+
+def load_examinations(queryset):
+    """
+    Загружает проверки одним запросом. Вызывает BatchTooLarge, если их
+    больше DOCUMENT_BATCH_LIMIT.
+    """
+    limit = settings.DOCUMENT_BATCH_LIMIT
+    examinations = list(queryset[:limit + 1])
+    if len(examinations) > limit:
+        raise BatchTooLarge(
+            f'Выбрано больше {limit} проверок, уточните фильтр.'
+        )
+    return examinations
+
+
+def get_document_name(template, examination):
+    """Возвращает имя файла документа проверки."""
+    return f'{template}_{examination.pk}.docx'
+
+
+def render_documents(template_path, contexts, workers=None):
+    """
+    Заполняет шаблон для каждого контекста и возвращает содержимое
+    документов в исходном порядке. При workers > 1 документы заполняются
+    в пуле процессов; одновременно в работе находится не больше
+    workers * 2 документов, поэтому готовые, но ещё не переданные
+    клиенту документы не накапливаются в памяти.
+    """
+    workers = workers or settings.DOCUMENT_WORKERS
+    if workers <= 1:
+        for context in contexts:
+            yield render_document(template_path, context)
+        return
+
+    # Шаблон подготавливается до запуска пула, чтобы дочерние процессы,
+    # созданные через fork, получили его из кэша
+    get_template(template_path)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for context in contexts:
+                pending.append(
+                    pool.submit(render_document, template_path, context)
+                )
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def stream_zip(files):
+    """
+    Записывает пары (имя файла, содержимое) в ZIP-архив и отдаёт его по
+    частям по мере добавления файлов. Документы .docx уже сжаты, поэтому
+    в архиве они хранятся без повторного сжатия.
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def stream_documents(template, examinations, workers=None):
+    """
+    Возвращает поток ZIP-архива с документами по шаблону template для
+    загруженных проверок.
+    """
+    names = [
+        get_document_name(template, examination)
+        for examination in examinations
+    ]
+    template_path = get_template_path(template)
+    keys = get_context_keys(template_path)
+    contents = render_documents(
+        template_path,
+        [get_context(examination, keys) for examination in examinations],
+        workers
+    )
+    return stream_zip(zip(names, contents))
@@ -0,0 +1,38 @@
+"""
+Модуль проверки шаблонов документов средствами Django (manage.py check).
+
+Ошибки шаблонов обнаруживаются при запуске приложения, а не при
+заполнении документа по запросу пользователя.
+"""
+from django.core.checks import Error, Warning, register
+
+from .document_generation import CONTEXT_FIELDS
+from .registry import get_template_variables, get_templates
+
+
+@register()
+def check_document_templates(app_configs, **kwargs):
+    """
+    Проверяет, что каждый шаблон документа разбирается и использует только
+    переменные, для которых формируется контекст (CONTEXT_FIELDS).
+    """
+    errors = []
+    for info in get_templates():
+        variables = get_template_variables(info.path)
+        if variables is None:
+            errors.append(Error(
+                f'Не удалось разобрать шаблон документа {info.name}.',
+                obj=info.path,
+                id='documents.E001',
+            ))
+            continue
+        unknown = sorted(variables - CONTEXT_FIELDS.keys())
+        if unknown:
+            errors.append(Warning(
+                f'Шаблон документа {info.name} использует переменные, '
+                f'которых нет в контексте: {", ".join(unknown)}.',
+                hint='Добавьте их в CONTEXT_FIELDS или исправьте шаблон.',
+                obj=info.path,
+                id='documents.W001',
+            ))
+    return errors
@@ -0,0 +1,202 @@
+"""
+Модуль кэша сформированных документов.
+
+Ключ документа вычисляется по содержимому: хэш файла шаблона и хэш
+контекста заполнения. Поэтому изменение проверки или шаблона даёт новый
+ключ и устаревший документ больше не запрашивается, а неизменный
+документ не нужно формировать заново, пока он находится в кэше. Тот же
+ключ используется как ETag ответа с документом.
+
+Хранилище выбирается настройкой DOCUMENT_CACHE:
+- 'cache' — кэш Django (Redis), объём ограничивается политикой
+    вытеснения Redis (maxmemory-policy allkeys-lru);
+- 'disk' — каталог DOCUMENT_CACHE_DIR, при превышении
+    DOCUMENT_CACHE_MAX_SIZE удаляются давно не запрашивавшиеся документы;
+    каталог просматривается для вытеснения не чаще раза в
+    DOCUMENT_CACHE_EVICT_INTERVAL секунд в каждом процессе, поэтому между
+    просмотрами размер может ненадолго превысить лимит;
+- пустое значение — кэш отключён.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY = 'document:{key}'
+# Ключ документа PDF — ключ документа .docx с суффиксом '_pdf' (см.
+# documents.views.get_document_source), по нему выбирается расширение файла
+FILE_FORMATS = ('docx', 'pdf')
+
+_digests = {}
+# Время последнего вытеснения в каталогах хранилища на диске
+_evicted_at = {}
+_lock = threading.Lock()
+
+
+def get_template_digest(template_path):
+    """
+    Возвращает хэш содержимого файла шаблона. Хэш вычисляется один раз
+    для каждого времени изменения файла.
+    """
+    mtime = os.stat(template_path).st_mtime
+    with _lock:
+        cached = _digests.get(template_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(template_path, 'rb') as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    with _lock:
+        _digests[template_path] = (mtime, digest)
+    return digest
+
+
+def get_document_key(template_path, contexts, combined=False):
+    """
+    Возвращает ключ документа по хэшу шаблона и контекстов заполнения.
+
+    Параметры:
+    - template_path (str): Путь к шаблону документа (.docx).
+    - contexts (list): Контексты проверок в порядке следования в
+        документе.
+    - combined (bool): Документ является общим протоколом заседания.
+    """
+    data = json.dumps(
+        [combined, contexts], sort_keys=True, ensure_ascii=False, default=str
+    )
+    digest = hashlib.sha256(get_template_digest(template_path).encode())
+    digest.update(data.encode())
+    return digest.hexdigest()
+
+
+class CacheStorage:
+    """Хранилище документов в кэше Django."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def get(self, key):
+        return cache.get(CACHE_KEY.format(key=key))
+
+    def set(self, key, content):
+        cache.set(CACHE_KEY.format(key=key), content, timeout=self.timeout)
+
+
+class DiskStorage:
+    """
+    Хранилище документов в каталоге с ограничением общего размера.
+    Время изменения файла обновляется при каждом чтении и служит
+    отметкой последнего использования для вытеснения. Вытеснение
+    выполняется после записи, если с предыдущего вытеснения в этом
+    процессе прошло не меньше evict_interval секунд.
+    """
+
+    def __init__(self, directory, max_size, evict_interval=0):
+        self.directory = directory
+        self.max_size = max_size
+        self.evict_interval = evict_interval
+
+    def get_path(self, key):
+        """Возвращает путь файла документа с расширением его формата."""
+        digest, _, file_format = key.partition('_')
+        return os.path.join(
+            self.directory, key[:2], f'{digest}.{file_format or "docx"}'
+        )
+
+    def get(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as file:
+                content = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def set(self, key, content):
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Запись во временный файл, чтобы параллельные запросы не читали
+        # недописанный документ
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix='.tmp'
+        )
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.replace(temp_path, path)
+        if self.eviction_due():
+            self.evict()
+
+    def eviction_due(self):
+        """
+        Проверяет, пора ли вытеснять документы, и отмечает время
+        вытеснения. Обход каталога при каждой записи стоил бы времени,
+        пропорционального числу документов в кэше.
+        """
+        now = time.monotonic()
+        with _lock:
+            evicted_at = _evicted_at.get(self.directory)
+            if (evicted_at is not None
+                    and now - evicted_at < self.evict_interval):
+                return False
+            _evicted_at[self.directory] = now
+        return True
+
+    def iter_files(self):
+        """Возвращает (время использования, размер, путь) документов."""
+        if not os.path.isdir(self.directory):
+            return
+        for folder in os.scandir(self.directory):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.name.rpartition('.')[2] not in FILE_FORMATS:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def evict(self):
+        """Удаляет давно не использованные документы сверх лимита."""
+        files = sorted(self.iter_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def get_storage():
+    """Возвращает хранилище документов по настройке DOCUMENT_CACHE."""
+    if settings.DOCUMENT_CACHE == 'cache':
+        return CacheStorage(settings.DOCUMENT_CACHE_TTL)
+    if settings.DOCUMENT_CACHE == 'disk':
+        return DiskStorage(
+            settings.DOCUMENT_CACHE_DIR, settings.DOCUMENT_CACHE_MAX_SIZE,
+            settings.DOCUMENT_CACHE_EVICT_INTERVAL
+        )
+    return None
+
+
+def get_document(key, render):
+    """
+    Возвращает содержимое документа из кэша по ключу, а при отсутствии
+    формирует его функцией render и сохраняет в кэш.
+    """
+    storage = get_storage()
+    content = storage.get(key) if storage else None
+    if content is None:
+        content = render()
+        if storage:
+            storage.set(key, content)
+    return content
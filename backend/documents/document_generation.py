@@ -1,16 +1,163 @@
-from docxtpl import DocxTemplate
+import copy
+import io
+import os
+import re
+from operator import attrgetter
+
+from docx import Document
+from docx.oxml.ns import qn
+from docxcompose.composer import Composer
 from facility.models import Examination
 
+from .document_cache import get_document, get_document_key
+from .registry import TEMPLATE_DIR, TEMPLATE_SUFFIX, get_template_variables
+from .template_cache import get_template
+
+# Ключи контекста, которые различаются для проверок одного заседания
+SESSION_ROW_FIELDS = (
+    'examined_full_name',
+    'examined_position',
+    'examined_brigade',
+    'examination_reason',
+    'certificate_number',
+    'safety_group',
+    'work_experience',
+    'next_check_date',
+    'briefings_name',
+)
+ROW_MARKER = re.compile(r'\[\[(\w+)\]\]')
+
+
+def get_template_path(template):
+    """Возвращает путь к файлу шаблона документа по его имени."""
+    return os.path.join(TEMPLATE_DIR, f'{template}{TEMPLATE_SUFFIX}')
+
+
+def date_value(path):
+    """Возвращает функцию получения даты проверки в формате ДД.ММ.ГГГГ."""
+    getter = attrgetter(path)
+    return lambda examination: getter(examination).strftime('%d.%m.%Y')
+
+
+# Ключи контекста документа: связанная запись проверки, которую нужно
+# загрузить через select_related, и функция получения значения
+CONTEXT_FIELDS = {
+    'company_name': (
+        'examined__company_name', attrgetter('examined.company_name')
+    ),
+    'protocol_number': (None, attrgetter('protocol_number')),
+    'examined__check_date': (None, date_value('current_check_date')),
+    'chairman_name': ('commission', attrgetter('commission.chairman_name')),
+    'chairman_position': (
+        'commission', attrgetter('commission.chairman_position')
+    ),
+    'member1_name': ('commission', attrgetter('commission.member1_name')),
+    'member1_position': (
+        'commission', attrgetter('commission.member1_position')
+    ),
+    'member2_name': ('commission', attrgetter('commission.member2_name')),
+    'member2_position': (
+        'commission', attrgetter('commission.member2_position')
+    ),
+    'examined_full_name': ('examined', attrgetter('examined.full_name')),
+    'examined_position': ('examined', attrgetter('examined.position')),
+    'examined_brigade': ('examined', attrgetter('examined.brigade')),
+    'examination_reason': (None, attrgetter('reason')),
+    'course_number': ('course', attrgetter('course.course_number')),
+    'course_name': ('course', attrgetter('course.course_name')),
+    'certificate_number': (None, attrgetter('certificate_number')),
+    'safety_group': ('examined', attrgetter('examined.safety_group')),
+    'safety_officer_name': (
+        'commission', attrgetter('commission.safety_officer_name')
+    ),
+    'safety_officer_position': (
+        'commission', attrgetter('commission.safety_officer_position')
+    ),
+    'work_experience': ('examined', attrgetter('examined.work_experience')),
+    'next_check_date': (None, date_value('next_check_date')),
+    'briefings_name': ('briefing', attrgetter('briefing.name')),
+}
+# Связанные записи проверки, которые используются в контексте документа
+EXAMINATION_RELATIONS = ('examined__company_name', 'commission', 'briefing',
+                         'course')
+
+
+def get_context_keys(template_path):
+    """
+    Возвращает ключи контекста, которые используются в шаблоне, или None,
+    если переменные шаблона неизвестны и нужен полный контекст.
+    """
+    variables = get_template_variables(template_path)
+    if variables is None:
+        return None
+    return [key for key in CONTEXT_FIELDS if key in variables]
+
+
+def get_relations(keys=None):
+    """
+    Возвращает связанные записи проверки, которые нужно загрузить для
+    ключей контекста keys (None — для полного контекста).
+    """
+    if keys is None:
+        return EXAMINATION_RELATIONS
+    relations = {CONTEXT_FIELDS[key][0] for key in keys} - {None}
+    if 'examined__company_name' in relations:
+        relations.discard('examined')
+    return tuple(sorted(relations))
+
+
+def with_relations(queryset, keys=None):
+    """
+    Добавляет к запросу проверок загрузку связанных записей, которые
+    используются в ключах контекста keys.
+    """
+    relations = get_relations(keys)
+    # select_related() без аргументов загружает все связанные записи
+    return queryset.select_related(*relations) if relations else queryset
+
+
+def get_context(examination, keys=None):
+    """
+    Возвращает контекст шаблона документа для проверки: значения ключей
+    keys или всех ключей CONTEXT_FIELDS, если keys не указаны. Связанные
+    записи, которые используются в этих ключах, должны быть загружены
+    заранее через select_related(*get_relations(keys)).
+    """
+    if keys is None:
+        keys = CONTEXT_FIELDS
+    return {key: CONTEXT_FIELDS[key][1](examination) for key in keys}
+
+
+def render_document(template_path, context):
+    """
+    Заполняет шаблон документа данными контекста и возвращает содержимое
+    документа .docx без сохранения на диск. Функция не обращается к базе
+    данных и может выполняться в дочернем процессе.
+    """
+    doc = get_template(template_path)
+    doc.render(context)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
 
-def generate_document(examination_id, template_path, output_path):
+def generate_document(examination_id, template_path):
     """
-    Генерирует документ на основе выбранного шаблона и данных проверки.
+    Генерирует документ на основе выбранного шаблона и данных проверки и
+    возвращает его содержимое. Загружаются только связанные записи и
+    формируются только ключи контекста, которые используются в шаблоне
+    (см. registry). Документ формируется в памяти и
+    сохраняется в кэш документов по хэшу шаблона и контекста (см.
+    document_cache), поэтому повторно заполняется только после изменения
+    данных проверки или шаблона.
 
     Параметры:
     - examination_id (int): Идентификатор проверки, для которой создается
         документ.
     - template_path (str): Путь к шаблону документа (.docx).
-    - output_path (str): Путь для сохранения сгенерированного документа.
+
+    Возвращает:
+    - bytes: Содержимое документа .docx.
 
     Ключи контекста:
     - company_name (str): Наименование компании.
@@ -37,41 +184,160 @@ def generate_document(examination_id, template_path, output_path):
     - next_check_date (str): Дата следующей проверки.
     - briefings_name (str): Вид инструктажа.
     """
-    examination = Examination.objects.select_related(
-        'examined', 'commission', 'briefing', 'course'
-    ).get(id=examination_id)
-
-    # Подготовка данных для шаблона
-    context = {
-        'company_name': examination.examined.company_name,
-        'protocol_number': examination.protocol_number,
-        'examined__check_date': examination.current_check_date.strftime(
-            '%d.%m.%Y'
-        ),
-        'chairman_name': examination.commission.chairman_name,
-        'chairman_position': examination.commission.chairman_position,
-        'member1_name': examination.commission.member1_name,
-        'member1_position': examination.commission.member1_position,
-        'member2_name': examination.commission.member2_name,
-        'member2_position': examination.commission.member2_position,
-        'examined_full_name': examination.examined.full_name,
-        'examined_position': examination.examined.position,
-        'examined_brigade': examination.examined.brigade,
-        'examination_reason': examination.reason,
-        'course_number': examination.course.course_number,
-        'course_name': examination.course.course_name,
-        'certificate_number': examination.certificate_number,
-        'safety_group': examination.examined.safety_group,
-        'safety_officer_name': examination.commission.safety_officer_name,
-        'safety_officer_position': (
-            examination.commission.safety_officer_position
-        ),
-        'work_experience': examination.examined.work_experience,
-        'next_check_date': examination.next_check_date.strftime('%d.%m.%Y'),
-        'briefings_name': examination.briefing.name
+    keys = get_context_keys(template_path)
+    examination = with_relations(Examination.objects, keys).get(
+        id=examination_id
+    )
+    context = get_context(examination, keys)
+
+    return get_document(
+        get_document_key(template_path, [context]),
+        lambda: render_document(template_path, context)
+    )
+
+
+def get_session_examinations(examination, keys=None, queryset=None):
+    """
+    Возвращает проверки организации с теми же номером и датой протокола,
+    что и у выбранной проверки, для общего протокола заседания комиссии.
+    Проверки отбираются из queryset (по умолчанию из всех проверок), чтобы
+    в протокол попадали только доступные пользователю записи.
+    Загружаются связанные записи для ключей контекста keys.
+    """
+    if queryset is None:
+        queryset = Examination.objects.all()
+    return with_relations(queryset, keys).filter(
+        protocol_number=examination.protocol_number,
+        current_check_date=examination.current_check_date,
+        organization=examination.organization_id,
+    ).order_by('examined__full_name', 'pk')
+
+
+def get_session_protocol_key(template_path, examinations, keys=None):
+    """
+    Возвращает ключ общего протокола проверок в кэше документов. Ключ
+    вычисляется по контекстам только тех ключей, которые используются в
+    шаблоне, поэтому протокол, сформированный на странице документа
+    проверки и в фоновом задании, хранится в кэше один раз.
+    """
+    if keys is None:
+        keys = get_context_keys(template_path)
+    return get_document_key(
+        template_path, [get_context(item, keys) for item in examinations],
+        combined=True
+    )
+
+
+def get_session_key(examination):
+    """
+    Возвращает ключ заседания комиссии: проверки с одинаковыми номером и
+    датой протокола, комиссией и программой обучения оформляются одним
+    протоколом.
+    """
+    return (
+        examination.protocol_number, examination.current_check_date,
+        examination.commission_id, examination.course_id
+    )
+
+
+def fill_row_markers(element, context):
+    """Заменяет метки полей строки в тексте элемента значениями контекста."""
+    for text in element.iter(qn('w:t')):
+        if text.text and '[[' in text.text:
+            text.text = ROW_MARKER.sub(
+                lambda match: str(context.get(match.group(1)) or ''),
+                text.text
+            )
+
+
+def set_row_number(row, number):
+    """Записывает порядковый номер в первую ячейку строки таблицы."""
+    cell = row.find(qn('w:tc'))
+    texts = list(cell.iter(qn('w:t'))) if cell is not None else []
+    if texts and ''.join(text.text or '' for text in texts).strip().isdigit():
+        texts[0].text = str(number)
+        for text in texts[1:]:
+            text.text = ''
+
+
+def render_session_part(template_path, contexts):
+    """
+    Заполняет шаблон протокола для всех проверок одного заседания.
+
+    Шаблон заполняется один раз: общие поля — данными первой проверки, а
+    поля строки таблицы (SESSION_ROW_FIELDS) — метками. Затем строка с
+    метками копируется для каждой проверки и заполняется её данными.
+    Возвращает документ python-docx или None, если поля проверки в
+    шаблоне не собраны в одну строку таблицы (например, в удостоверении).
+    """
+    doc = get_template(template_path)
+    doc.render({
+        **contexts[0],
+        **{field: f'[[{field}]]' for field in SESSION_ROW_FIELDS}
+    })
+    body = doc.docx.element.body
+    marked_rows = {
+        text.getparent()
+        for text in body.iter(qn('w:t'))
+        if text.text and ROW_MARKER.search(text.text)
+    }
+    rows = {
+        next(element.iterancestors(qn('w:tr')), None)
+        for element in marked_rows
     }
+    if len(rows) != 1 or None in rows:
+        return None
 
-    doc = DocxTemplate(template_path)
-    doc.render(context)
+    row = rows.pop()
+    previous = row
+    for number, context in enumerate(contexts[1:], start=2):
+        clone = copy.deepcopy(row)
+        fill_row_markers(clone, context)
+        set_row_number(clone, number)
+        previous.addnext(clone)
+        previous = clone
+    fill_row_markers(row, contexts[0])
+    return doc.docx
+
+
+def render_session_protocol(template_path, examinations):
+    """
+    Формирует один документ для нескольких проверок и возвращает его
+    содержимое.
+
+    Проверки группируются по заседаниям (см. get_session_key). Для каждого
+    заседания протокол заполняется один раз, а строки таблицы с
+    аттестуемыми добавляются копированием заполненной строки. Если шаблон
+    не содержит такой строки, документ каждой проверки заполняется
+    отдельно. Части объединяются в один документ через docxcompose, каждая
+    часть начинается с новой страницы.
+
+    Параметры:
+    - template_path (str): Путь к шаблону документа (.docx).
+    - examinations (list): Проверки с загруженными через select_related
+        связанными записями в порядке следования в документе.
+    """
+    keys = get_context_keys(template_path)
+    sessions = {}
+    for examination in examinations:
+        sessions.setdefault(get_session_key(examination), []).append(
+            get_context(examination, keys)
+        )
+    parts = []
+    for contexts in sessions.values():
+        part = render_session_part(template_path, contexts)
+        if part is not None:
+            parts.append(part)
+            continue
+        parts.extend(
+            Document(io.BytesIO(render_document(template_path, context)))
+            for context in contexts
+        )
 
-    doc.save(output_path)
+    composer = Composer(parts[0])
+    for part in parts[1:]:
+        composer.doc.add_page_break()
+        composer.append(part)
+    buffer = io.BytesIO()
+    composer.save(buffer)
+    return buffer.getvalue()
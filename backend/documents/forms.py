@@ -1,18 +1,12 @@
 from django import forms
 
-TEMPLATE_CHOICES = [
-    ('протокол_проверки_по_БДД',
-     'Протокол проверки по безопасности дорожного движения'),
-    ('протокол_проверки_по_ОТ',
-     'Протокол проверки по охране труда'),
-    ('протокол_проверки_по_ПБ',
-     'Протокол проверки по охране труда'),
-    ('протокол_проверки_по_первой_помощи',
-     'Протокол проверки оказания первой медицинской помощи'),
-    ('удостоверение_пороверки_по_ОТ',
-     'Удостоверение проверки по охране труда'),
-    ('удостоверение_по_ЭБ',
-     'Удостоверение проверки по электробезопасности'),
+from .jobs import is_background_available
+from .pdf import is_pdf_available
+from .registry import get_template_choices
+
+FILE_FORMATS = [
+    ('docx', 'Документ Word (.docx)'),
+    ('pdf', 'Документ PDF (.pdf)'),
 ]
 
 
@@ -22,8 +16,47 @@ class DocumentGenerationForm(forms.Form):
 
     Поля:
     - template: ChoiceField — поле для выбора шаблона документа.
-        Шаблон указывается из списка TEMPLATE_CHOICES.
+        Шаблон указывается из найденных в каталоге шаблонов (см.
+        registry.get_template_choices).
+    - combined: BooleanField — сформировать один документ на заседание
+        комиссии для всех проверок с теми же номером и датой протокола.
+    - file_format: ChoiceField — формат документа; PDF доступен, если
+        настроены серверы преобразования (см. documents.pdf).
     """
     template = forms.ChoiceField(
-        choices=TEMPLATE_CHOICES, label='Шаблон документа'
+        choices=get_template_choices, label='Шаблон документа'
+    )
+    combined = forms.BooleanField(
+        required=False, label='Общий протокол заседания комиссии'
     )
+    file_format = forms.ChoiceField(
+        choices=FILE_FORMATS, required=False, label='Формат документа'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'file_format' in self.fields and not is_pdf_available():
+            self.fields['file_format'].choices = FILE_FORMATS[:1]
+
+    def clean_file_format(self):
+        return self.cleaned_data.get('file_format') or 'docx'
+
+
+class DocumentBatchForm(DocumentGenerationForm):
+    """
+    Форма пакетной генерации документов.
+
+    Поля:
+    - background: BooleanField — сформировать документы фоновым заданием
+        и загрузить их после выполнения (см. documents.jobs). Поле
+        доступно, если задания очереди выполняются обработчиками.
+    """
+    background = forms.BooleanField(
+        required=False, label='Сформировать в фоне'
+    )
+    file_format = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not is_background_available():
+            del self.fields['background']
@@ -0,0 +1,306 @@
+"""
+Модуль фоновой генерации документов.
+
+Запрос на генерацию сохраняется заданием DocumentJob, идентификатор
+которого ставится в очередь. Обработчики (команда run_document_worker)
+забирают задания из очереди, заполняют документы и сохраняют результат в
+задании, а клиент опрашивает состояние задания и загружает готовый файл.
+Поэтому длительная генерация не занимает рабочие процессы веб-сервера.
+
+Очередь выбирается настройкой DOCUMENT_JOB_QUEUE:
+- 'redis' — список Redis, общий для веб-сервера и обработчиков;
+- 'local' — очередь в памяти процесса для тестов и разработки без
+    Redis. Задания выполняются вызовом process_next в том же процессе или
+    фоновым потоком, если включена настройка DOCUMENT_JOB_LOCAL_WORKER.
+"""
+import logging
+import queue
+import threading
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from facility.models import Examination
+
+from .batch import load_examinations, stream_documents
+from .document_cache import get_document
+from .document_generation import (generate_document, get_session_protocol_key,
+                                  get_template_path, render_session_protocol)
+from .models import DocumentJob
+
+logger = logging.getLogger(__name__)
+
+
+class RedisQueue:
+    """
+    Очередь заданий в списке Redis. Используется отдельное соединение без
+    таймаута чтения, чтобы обработчик мог ожидать задания блокирующей
+    командой BRPOP.
+    """
+
+    def __init__(self, url, name):
+        self.url = url
+        self.name = name
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            from redis import Redis
+
+            self._connection = Redis.from_url(self.url)
+        return self._connection
+
+    def push(self, job_id):
+        self.connection.lpush(self.name, job_id)
+
+    def pop(self, timeout):
+        item = self.connection.brpop(self.name, timeout=timeout)
+        return int(item[1]) if item else None
+
+    def __len__(self):
+        return self.connection.llen(self.name)
+
+
+class LocalQueue:
+    """Очередь заданий в памяти процесса."""
+
+    def __init__(self):
+        self.items = queue.Queue()
+        self.worker = None
+
+    def push(self, job_id):
+        self.items.put(job_id)
+        if settings.DOCUMENT_JOB_LOCAL_WORKER and self.worker is None:
+            self.worker = threading.Thread(
+                target=run_worker, args=(self,), daemon=True
+            )
+            self.worker.start()
+
+    def pop(self, timeout):
+        try:
+            return self.items.get(block=bool(timeout), timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def __len__(self):
+        return self.items.qsize()
+
+
+_local_queue = LocalQueue()
+_redis_queues = {}
+
+
+def get_queue():
+    """Возвращает очередь заданий по настройке DOCUMENT_JOB_QUEUE."""
+    if settings.DOCUMENT_JOB_QUEUE != 'redis':
+        return _local_queue
+    key = (settings.DOCUMENT_JOB_QUEUE_URL, settings.DOCUMENT_JOB_QUEUE_NAME)
+    if key not in _redis_queues:
+        _redis_queues[key] = RedisQueue(*key)
+    return _redis_queues[key]
+
+
+def is_background_available():
+    """
+    Проверяет, выполняет ли кто-нибудь задания очереди: очередь Redis
+    обрабатывают обработчики run_document_worker, а очередь в памяти
+    процесса — только фоновый поток DOCUMENT_JOB_LOCAL_WORKER.
+    """
+    return (settings.DOCUMENT_JOB_QUEUE == 'redis'
+            or settings.DOCUMENT_JOB_LOCAL_WORKER)
+
+
+def enqueue_job(user, template, examination_ids, combined=False):
+    """
+    Создаёт задание генерации документа и ставит его в очередь после
+    фиксации транзакции.
+
+    Параметры:
+    - user (User): Пользователь, запросивший документ.
+    - template (str): Имя шаблона документа.
+    - examination_ids (list): Идентификаторы проверок, доступных
+        пользователю, в порядке следования в документе.
+    - combined (bool): Сформировать общий протокол заседания комиссии.
+    """
+    job = DocumentJob.objects.create(
+        user=user,
+        template=template,
+        combined=combined,
+        examination_ids=list(examination_ids),
+    )
+    transaction.on_commit(partial(push_job, job.pk))
+    return job
+
+
+def push_job(job_id, job_queue=None):
+    """
+    Ставит задание в очередь. Если очередь недоступна, задание
+    завершается с ошибкой, чтобы клиент не ожидал его бесконечно.
+    """
+    try:
+        (job_queue or get_queue()).push(job_id)
+    except Exception as error:
+        logger.exception('Не удалось поставить задание %s в очередь', job_id)
+        DocumentJob.objects.filter(pk=job_id).update(
+            status=DocumentJob.FAILED,
+            error=f'Очередь заданий недоступна: {error}',
+            finished_at=timezone.now(),
+        )
+
+
+def load_job_examinations(job):
+    """Загружает проверки задания в сохранённом порядке."""
+    examinations = load_examinations(
+        Examination.objects.select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        ).filter(pk__in=job.examination_ids)
+    )
+    order = {pk: index for index, pk in enumerate(job.examination_ids)}
+    return sorted(examinations, key=lambda item: order[item.pk])
+
+
+def render_job(job):
+    """
+    Формирует документ задания и возвращает имя файла и содержимое: один
+    документ .docx, общий протокол заседаний или ZIP-архив документов.
+    """
+    template_path = get_template_path(job.template)
+    if not job.combined and len(job.examination_ids) == 1:
+        examination_id = job.examination_ids[0]
+        return (
+            f'{job.template}_{examination_id}.docx',
+            generate_document(examination_id, template_path)
+        )
+    examinations = load_job_examinations(job)
+    if not examinations:
+        raise Examination.DoesNotExist('Проверки задания не найдены.')
+    if job.combined:
+        return f'{job.template}.docx', get_document(
+            get_session_protocol_key(template_path, examinations),
+            partial(render_session_protocol, template_path, examinations)
+        )
+    # Обработчики сами работают параллельно, поэтому документы задания
+    # заполняются последовательно
+    return f'{job.template}.zip', b''.join(
+        stream_documents(job.template, examinations, workers=1)
+    )
+
+
+def run_job(job_id):
+    """
+    Выполняет задание и возвращает его. Задание переводится в состояние
+    «Выполняется» одним запросом UPDATE, поэтому при нескольких
+    обработчиках оно выполняется только один раз. Возвращает None, если
+    задание уже выполнено или удалено.
+    """
+    claimed = DocumentJob.objects.filter(
+        pk=job_id, status=DocumentJob.QUEUED
+    ).update(status=DocumentJob.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return None
+    job = DocumentJob.objects.defer('content').get(pk=job_id)
+    try:
+        job.filename, job.content = render_job(job)
+    except Exception as error:
+        logger.exception('Ошибка выполнения задания %s', job_id)
+        job.status = DocumentJob.FAILED
+        job.error = str(error)
+        job.content = None
+    else:
+        job.status = DocumentJob.DONE
+        job.size = len(job.content)
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'filename', 'content', 'size', 'finished_at'
+    ])
+    logger.info(
+        'Задание %s: %s, ожидание %s, заполнение %s, размер %s',
+        job.pk, job.status, job.queue_time, job.render_time, job.size
+    )
+    return job
+
+
+def process_next(timeout=0, job_queue=None):
+    """
+    Забирает из очереди и выполняет одно задание. Ожидает задание не
+    дольше timeout секунд (0 — не ожидать) и возвращает None, если
+    очередь пуста.
+    """
+    job_id = (job_queue or get_queue()).pop(timeout)
+    if job_id is None:
+        return None
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def delete_expired_jobs():
+    """Удаляет задания, завершённые раньше DOCUMENT_JOB_RETENTION часов."""
+    expired = timezone.now() - timedelta(
+        hours=settings.DOCUMENT_JOB_RETENTION
+    )
+    deleted, _ = DocumentJob.objects.filter(finished_at__lt=expired).delete()
+    return deleted
+
+
+def fail_stale_jobs():
+    """
+    Завершает с ошибкой задания, которые выполняются дольше
+    DOCUMENT_JOB_TIMEOUT секунд: обработчик такого задания, вероятно,
+    остановился, и иначе клиент ожидал бы задание бесконечно. Задание не
+    ставится в очередь повторно, чтобы документ, из-за которого
+    остановился обработчик, не останавливал следующие.
+    """
+    now = timezone.now()
+    return DocumentJob.objects.filter(
+        status=DocumentJob.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.DOCUMENT_JOB_TIMEOUT),
+    ).update(
+        status=DocumentJob.FAILED,
+        error='Задание не выполнено за отведённое время.',
+        finished_at=now,
+    )
+
+
+def requeue_lost_jobs(job_queue=None):
+    """
+    Повторно ставит в очередь задания, ожидающие дольше
+    DOCUMENT_JOB_TIMEOUT секунд. Вызывается, когда очередь пуста, поэтому
+    идентификаторы таких заданий потеряны очередью (например, при
+    перезапуске Redis), и иначе клиент ожидал бы задание бесконечно.
+    Задание, уже взятое другим обработчиком, повторно не выполняется.
+    """
+    lost = list(DocumentJob.objects.filter(
+        status=DocumentJob.QUEUED,
+        created_at__lt=timezone.now() - timedelta(
+            seconds=settings.DOCUMENT_JOB_TIMEOUT
+        ),
+    ).values_list('pk', flat=True))
+    for job_id in lost:
+        logger.warning('Задание %s потеряно очередью и поставлено повторно',
+                       job_id)
+        push_job(job_id, job_queue)
+    return len(lost)
+
+
+def run_worker(job_queue=None, timeout=5, max_jobs=None):
+    """
+    Выполняет задания из очереди, пока не будет выполнено max_jobs
+    заданий (None — без ограничения). Пока очередь пуста, удаляет
+    устаревшие задания, завершает с ошибкой зависшие и повторно ставит в
+    очередь потерянные.
+    """
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        if process_next(timeout, job_queue) is None:
+            delete_expired_jobs()
+            fail_stale_jobs()
+            requeue_lost_jobs(job_queue)
+            continue
+        processed += 1
+    return processed
@@ -0,0 +1,58 @@
+"""
+Команда сравнения времени заполнения документа без кэша шаблонов и с
+подготовленным шаблоном из кэша.
+
+Пример:
+    python manage.py benchmark_templates --repeat 50
+"""
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from documents import template_cache
+from documents.document_generation import get_context
+from documents.registry import get_templates
+from docxtpl import DocxTemplate
+from facility.models import Examination
+
+
+def measure(factory, context, repeat):
+    """Возвращает среднее время заполнения и сохранения документа в мс."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        doc = factory()
+        doc.render(context)
+        doc.save(io.BytesIO())
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время заполнения документов по всем шаблонам без '
+            'кэша и с кэшем подготовленных шаблонов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество документов на каждый замер.'
+        )
+
+    def handle(self, *args, **options):
+        examination = Examination.objects.select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        ).first()
+        context = get_context(examination) if examination else {}
+        repeat = options['repeat']
+        for info in get_templates():
+            name, path = info.name, info.path
+            cold = measure(lambda: DocxTemplate(path), context, repeat)
+            template_cache.clear()
+            started = time.perf_counter()
+            template_cache.get_template(path)
+            prepare = (time.perf_counter() - started) * 1000
+            warm = measure(
+                lambda: template_cache.get_template(path), context, repeat
+            )
+            self.stdout.write(
+                f'{name}: без кэша {cold:.1f} мс, подготовка {prepare:.1f} '
+                f'мс, из кэша {warm:.1f} мс (x{cold / warm:.1f})'
+            )
@@ -0,0 +1,93 @@
+"""
+Команда пакетной генерации документов в ZIP-архив.
+
+Проверки отбираются по списку идентификаторов или по фильтрам главной
+страницы. С флагом --combined вместо архива формируется один документ с
+общими протоколами заседаний комиссии.
+
+Пример:
+    python manage.py generate_documents --template протокол_проверки_по_ОТ \
+        --organization 1 --next-check-date 2025-01-15 --output audit.zip
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from documents.batch import BatchTooLarge, load_examinations, stream_documents
+from documents.document_generation import (get_template_path,
+                                           render_session_protocol)
+from documents.registry import get_template_choices
+from facility.filters import FILTER_PARAMS, filter_examinations, get_ordering
+from facility.models import Examination
+
+
+class Command(BaseCommand):
+    help = ('Формирует документы по шаблону для выбранных проверок и '
+            'сохраняет их в ZIP-архив.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template', required=True,
+            choices=[name for name, _ in get_template_choices()],
+            help='Шаблон документа.'
+        )
+        parser.add_argument(
+            '--output', required=True, help='Путь к создаваемому файлу.'
+        )
+        parser.add_argument(
+            '--ids', type=int, nargs='+',
+            help='Идентификаторы проверок.'
+        )
+        parser.add_argument(
+            '--organization', type=int,
+            help='Идентификатор организации.'
+        )
+        for param in FILTER_PARAMS:
+            parser.add_argument(
+                f"--{param.replace('_', '-')}", dest=param,
+                help='Фильтр главной страницы.'
+            )
+        parser.add_argument(
+            '--order-by', dest='order_by', help='Сортировка документов.'
+        )
+        parser.add_argument(
+            '--combined', action='store_true',
+            help=('Сформировать один документ .docx с общими протоколами '
+                  'заседаний комиссии вместо архива.')
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            help='Количество процессов (по умолчанию DOCUMENT_WORKERS).'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Examination.objects.select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        )
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        if options['organization']:
+            queryset = queryset.filter(organization=options['organization'])
+        queryset = filter_examinations(queryset, options)
+        queryset = queryset.order_by(get_ordering(options))
+        try:
+            examinations = load_examinations(queryset)
+        except BatchTooLarge as error:
+            raise CommandError(error)
+        if not examinations:
+            raise CommandError('Не найдено ни одной проверки.')
+
+        started = time.perf_counter()
+        with open(options['output'], 'wb') as output:
+            if options['combined']:
+                output.write(render_session_protocol(
+                    get_template_path(options['template']), examinations
+                ))
+            else:
+                for chunk in stream_documents(
+                    options['template'], examinations, options['workers']
+                ):
+                    output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f'Сформировано документов: {len(examinations)} за '
+            f'{time.perf_counter() - started:.1f} с.'
+        ))
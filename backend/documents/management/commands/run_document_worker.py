@@ -0,0 +1,66 @@
+"""
+Команда обработчика очереди фоновой генерации документов.
+
+Обработчик ожидает задания в очереди DOCUMENT_JOB_QUEUE и выполняет их по
+одному. Для параллельной генерации запускается несколько обработчиков;
+их количество подбирается по времени ожидания заданий в очереди
+(см. статистику --stats).
+
+Пример:
+    python manage.py run_document_worker
+    python manage.py run_document_worker --stats
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, F, Max, Sum
+from documents.jobs import get_queue, run_worker
+from documents.models import DocumentJob
+
+
+class Command(BaseCommand):
+    help = ('Выполняет задания фоновой генерации документов из очереди.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-jobs', type=int,
+            help='Завершить работу после выполнения указанного количества '
+                 'заданий.'
+        )
+        parser.add_argument(
+            '--timeout', type=int, default=5,
+            help='Время ожидания задания в очереди, в секундах.'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Вывести статистику выполненных заданий и завершить работу.'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.show_stats()
+            return
+        self.stdout.write('Обработчик заданий генерации документов запущен.')
+        processed = run_worker(
+            timeout=options['timeout'], max_jobs=options['max_jobs']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено заданий: {processed}.'
+        ))
+
+    def show_stats(self):
+        """Выводит длину очереди и время выполнения заданий по шаблонам."""
+        self.stdout.write(f'Заданий в очереди: {len(get_queue())}')
+        rows = DocumentJob.objects.filter(
+            status=DocumentJob.DONE
+        ).values('template').annotate(
+            jobs=Count('id'),
+            queue_time=Avg(F('started_at') - F('created_at')),
+            max_queue_time=Max(F('started_at') - F('created_at')),
+            render_time=Avg(F('finished_at') - F('started_at')),
+            size=Sum('size'),
+        ).order_by('template')
+        for row in rows:
+            self.stdout.write(
+                f"{row['template']}: заданий {row['jobs']}, ожидание "
+                f"{row['queue_time']} (макс. {row['max_queue_time']}), "
+                f"заполнение {row['render_time']}, объём {row['size']} байт"
+            )
@@ -0,0 +1,79 @@
+"""
+Команда запуска пула серверов преобразования документов в PDF.
+
+Для каждого адреса из DOCUMENT_PDF_SERVERS запускается процесс unoserver
+с LibreOffice в режиме сервера. Команда следит за процессами и
+перезапускает завершившиеся, пока не будет остановлена (Ctrl+C или
+SIGTERM). Требуются установленные LibreOffice и пакет unoserver.
+
+Пример:
+    DOCUMENT_PDF_SERVERS=127.0.0.1:2003,127.0.0.1:2005 \
+        python manage.py run_pdf_converters
+"""
+import shutil
+import signal
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Смещение порта UNO LibreOffice относительно порта XML-RPC unoserver
+UNO_PORT_OFFSET = 1000
+
+
+class Command(BaseCommand):
+    help = ('Запускает и перезапускает серверы преобразования документов '
+            'в PDF (unoserver) по адресам DOCUMENT_PDF_SERVERS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--executable', default=settings.DOCUMENT_PDF_EXECUTABLE,
+            help='Путь к исполняемому файлу LibreOffice.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Период проверки процессов, в секундах.'
+        )
+
+    def get_command(self, server, executable):
+        """Возвращает команду запуска unoserver для адреса 'хост:порт'."""
+        host, port = server.rsplit(':', 1)
+        return [
+            'unoserver', '--interface', host, '--port', port,
+            '--uno-port', str(int(port) + UNO_PORT_OFFSET),
+            '--executable', executable,
+        ]
+
+    def handle(self, *args, **options):
+        if not settings.DOCUMENT_PDF_SERVERS:
+            raise CommandError('Не заданы адреса DOCUMENT_PDF_SERVERS.')
+        if shutil.which('unoserver') is None:
+            raise CommandError('Не найдена команда unoserver.')
+        commands = {
+            server: self.get_command(server, options['executable'])
+            for server in settings.DOCUMENT_PDF_SERVERS
+        }
+        processes = {}
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        try:
+            while not stopping:
+                for server, command in commands.items():
+                    process = processes.get(server)
+                    if process is None or process.poll() is not None:
+                        if process is not None:
+                            self.stderr.write(
+                                f'Сервер {server} завершился с кодом '
+                                f'{process.returncode}, перезапуск.'
+                            )
+                        processes[server] = subprocess.Popen(command)
+                        self.stdout.write(f'Запущен сервер {server}.')
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for process in processes.values():
+                process.terminate()
+            for process in processes.values():
+                process.wait()
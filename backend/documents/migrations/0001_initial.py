@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-17 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template', models.CharField(max_length=255, verbose_name='Шаблон документа')),
+                ('combined', models.BooleanField(default=False, verbose_name='Общий протокол заседания комиссии')),
+                ('examination_ids', models.JSONField(default=list, verbose_name='Идентификаторы проверок')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='queued', max_length=16, verbose_name='Состояние')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Поставлено в очередь')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало заполнения')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание заполнения')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='Имя файла')),
+                ('size', models.PositiveIntegerField(blank=True, null=True, verbose_name='Размер, байт')),
+                ('content', models.BinaryField(blank=True, null=True, verbose_name='Содержимое файла')),
+                ('user', models.ForeignKey(help_text='Пользователь, запросивший документ', on_delete=django.db.models.deletion.CASCADE, related_name='document_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Задание генерации документа',
+                'verbose_name_plural': 'Задания генерации документов',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['finished_at'], name='document_job_finished_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,116 @@
+"""
+Модуль моделей генерации документов.
+"""
+from django.db import models
+from users.models import User
+
+
+class DocumentJob(models.Model):
+    """
+    Модель задания фоновой генерации документа.
+
+    Задание ставится в очередь (см. documents.jobs) и выполняется
+    обработчиком run_document_worker. Время постановки в очередь, начала
+    и окончания заполнения и размер результата сохраняются для оценки
+    нагрузки на обработчики.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='document_jobs',
+        verbose_name="Пользователь",
+        help_text="Пользователь, запросивший документ"
+    )
+    template = models.CharField(
+        max_length=255,
+        verbose_name="Шаблон документа"
+    )
+    combined = models.BooleanField(
+        default=False,
+        verbose_name="Общий протокол заседания комиссии"
+    )
+    examination_ids = models.JSONField(
+        default=list,
+        verbose_name="Идентификаторы проверок"
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name="Состояние"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Поставлено в очередь"
+    )
+    started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Начало заполнения"
+    )
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Окончание заполнения"
+    )
+    filename = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Имя файла"
+    )
+    size = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Размер, байт"
+    )
+    content = models.BinaryField(
+        blank=True,
+        null=True,
+        verbose_name="Содержимое файла"
+    )
+
+    class Meta:
+        verbose_name = "Задание генерации документа"
+        verbose_name_plural = "Задания генерации документов"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['finished_at'], name='document_job_finished_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Задание №{self.pk}: {self.template}"
+
+    @property
+    def queue_time(self):
+        """Время ожидания в очереди."""
+        if self.started_at:
+            return self.started_at - self.created_at
+        return None
+
+    @property
+    def render_time(self):
+        """Время заполнения документа."""
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
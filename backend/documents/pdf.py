@@ -0,0 +1,141 @@
+"""
+Модуль преобразования документов .docx в PDF.
+
+Преобразование выполняют постоянно запущенные процессы LibreOffice в
+режиме сервера (unoserver, см. команду run_pdf_converters), поэтому на
+каждый запрос не тратится время запуска LibreOffice. Адреса серверов
+задаются настройкой DOCUMENT_PDF_SERVERS; если она пуста, вывод в PDF
+недоступен.
+
+Каждый сервер одновременно преобразует один документ. Пул выдаёт
+свободный сервер, а запросы сверх числа серверов ожидают в очереди
+длиной не больше DOCUMENT_PDF_QUEUE_LIMIT. При переполнении очереди или
+превышении DOCUMENT_PDF_TIMEOUT запрос завершается ошибкой PdfBusy,
+чтобы рабочие процессы веб-сервера не накапливались в ожидании.
+"""
+import queue
+import threading
+import time
+import xmlrpc.client
+
+from django.conf import settings
+
+
+class PdfError(Exception):
+    """Ошибка преобразования документа в PDF."""
+
+
+class PdfBusy(PdfError):
+    """Все серверы преобразования заняты, а очередь заполнена."""
+
+
+class TimeoutTransport(xmlrpc.client.Transport):
+    """Транспорт XML-RPC с таймаутом соединения."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+def convert_on_server(server, content, timeout):
+    """
+    Преобразует документ в PDF на сервере unoserver по адресу
+    'хост:порт' и возвращает содержимое PDF.
+    """
+    proxy = xmlrpc.client.ServerProxy(
+        f'http://{server}', allow_none=True,
+        transport=TimeoutTransport(timeout)
+    )
+    try:
+        # Аргументы метода convert сервера unoserver 2.x: inpath, indata,
+        # outpath, convert_to, filtername, filter_options, update_index,
+        # infiltername
+        result = proxy.convert(
+            None, xmlrpc.client.Binary(content), None, 'pdf', None, [],
+            True, None
+        )
+    except (OSError, xmlrpc.client.Error) as error:
+        raise PdfError(f'Ошибка сервера преобразования {server}: {error}')
+    finally:
+        proxy('close')()
+    return result.data
+
+
+class ConverterPool:
+    """
+    Пул серверов преобразования в PDF.
+
+    Атрибуты:
+        servers (Queue): Свободные серверы.
+        slots (BoundedSemaphore): Места для выполняемых и ожидающих
+            запросов.
+        timeout (float): Предельное время ожидания и преобразования.
+    """
+
+    def __init__(self, servers, queue_limit, timeout,
+                 convert=convert_on_server):
+        self.servers = queue.Queue()
+        for server in servers:
+            self.servers.put(server)
+        self.slots = threading.BoundedSemaphore(len(servers) + queue_limit)
+        self.timeout = timeout
+        self.convert_on_server = convert
+
+    def convert(self, content):
+        """Преобразует документ .docx в PDF и возвращает содержимое PDF."""
+        if not self.slots.acquire(blocking=False):
+            raise PdfBusy('Очередь преобразования в PDF заполнена.')
+        try:
+            deadline = time.monotonic() + self.timeout
+            try:
+                server = self.servers.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PdfBusy('Нет свободного сервера преобразования в PDF.')
+            try:
+                return self.convert_on_server(
+                    server, content, max(deadline - time.monotonic(), 1)
+                )
+            finally:
+                self.servers.put(server)
+        finally:
+            self.slots.release()
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Возвращает пул серверов по настройкам DOCUMENT_PDF_* или None, если
+    серверы не заданы.
+    """
+    if not settings.DOCUMENT_PDF_SERVERS:
+        return None
+    key = (
+        tuple(settings.DOCUMENT_PDF_SERVERS),
+        settings.DOCUMENT_PDF_QUEUE_LIMIT,
+        settings.DOCUMENT_PDF_TIMEOUT,
+    )
+    with _lock:
+        if key not in _pools:
+            _pools[key] = ConverterPool(*key)
+        return _pools[key]
+
+
+def is_pdf_available():
+    """Проверяет, настроено ли преобразование документов в PDF."""
+    return bool(settings.DOCUMENT_PDF_SERVERS)
+
+
+def convert_to_pdf(content):
+    """Преобразует документ .docx в PDF и возвращает содержимое PDF."""
+    pool = get_pool()
+    if pool is None:
+        raise PdfError('Преобразование в PDF не настроено.')
+    return pool.convert(content)
@@ -0,0 +1,152 @@
+"""
+Модуль реестра шаблонов документов.
+
+Реестр находит файлы шаблонов .docx в каталоге TEMPLATE_DIR и для
+каждого шаблона определяет переменные, которые в нём используются
+(DocxTemplate.get_undeclared_template_variables). По переменным шаблона
+формируется только нужная часть контекста документа и загружаются только
+нужные связанные записи проверки (см. document_generation).
+
+Разбор шаблона занимает десятки миллисекунд, поэтому переменные
+сохраняются в памяти процесса и в кэше Django по хэшу содержимого файла:
+после перезапуска или в другом рабочем процессе шаблон повторно не
+разбирается, а изменённый шаблон разбирается заново.
+"""
+import logging
+import os
+import threading
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from docxtpl import DocxTemplate
+
+from .document_cache import get_template_digest
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(settings.BASE_DIR, 'documents', 'templates')
+TEMPLATE_SUFFIX = '.docx'
+VARIABLES_KEY = 'template_variables:{digest}'
+
+# Названия шаблонов для формы выбора; для остальных файлов название
+# формируется из имени файла
+TEMPLATE_LABELS = {
+    'протокол_проверки_по_БДД':
+        'Протокол проверки по безопасности дорожного движения',
+    'протокол_проверки_по_ОТ':
+        'Протокол проверки по охране труда',
+    'протокол_проверки_по_ПБ':
+        'Протокол проверки по охране труда',
+    'протокол_проверки_по_первой_помощи':
+        'Протокол проверки оказания первой медицинской помощи',
+    'удостоверение_пороверки_по_ОТ':
+        'Удостоверение проверки по охране труда',
+    'удостоверение_по_ЭБ':
+        'Удостоверение проверки по электробезопасности',
+}
+
+_variables = {}
+_lock = threading.Lock()
+
+
+class TemplateInfo:
+    """
+    Описание шаблона документа.
+
+    Атрибуты:
+        name (str): Имя шаблона — имя файла без расширения.
+        path (str): Путь к файлу шаблона.
+        label (str): Название шаблона для формы выбора.
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.label = TEMPLATE_LABELS.get(
+            name, name.replace('_', ' ').capitalize()
+        )
+
+    @property
+    def variables(self):
+        """Переменные шаблона или None, если шаблон не удалось разобрать."""
+        return get_template_variables(self.path)
+
+    def __repr__(self):
+        return f'TemplateInfo({self.name!r})'
+
+
+def get_templates():
+    """Возвращает описания шаблонов каталога TEMPLATE_DIR по имени."""
+    return sorted(
+        (
+            TemplateInfo(entry.name[:-len(TEMPLATE_SUFFIX)], entry.path)
+            for entry in os.scandir(TEMPLATE_DIR)
+            # Файлы '~$...' — временные файлы открытых в Word документов
+            if entry.name.endswith(TEMPLATE_SUFFIX)
+            and not entry.name.startswith('~$')
+        ),
+        key=attrgetter('name')
+    )
+
+
+def get_template_choices():
+    """Возвращает варианты выбора шаблона для формы."""
+    return [(info.name, info.label) for info in get_templates()]
+
+
+def parse_variables(template_path):
+    """Разбирает шаблон и возвращает множество его переменных."""
+    return frozenset(
+        DocxTemplate(template_path).get_undeclared_template_variables()
+    )
+
+
+def get_template_variables(template_path):
+    """
+    Возвращает множество переменных шаблона. Если шаблон не удаётся
+    разобрать, возвращает None: в этом случае документ заполняется полным
+    контекстом, а ошибка шаблона проявится при заполнении.
+    """
+    try:
+        mtime = os.stat(template_path).st_mtime
+    except OSError:
+        return None
+    with _lock:
+        cached = _variables.get(template_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    key = VARIABLES_KEY.format(digest=get_template_digest(template_path))
+    variables = cache.get(key)
+    if variables is None:
+        try:
+            variables = parse_variables(template_path)
+        except Exception:
+            logger.warning(
+                'Не удалось разобрать шаблон %s', template_path, exc_info=True
+            )
+            return None
+        cache.set(key, sorted(variables), timeout=None)
+    else:
+        variables = frozenset(variables)
+    with _lock:
+        _variables[template_path] = (mtime, variables)
+    return variables
+
+
+def scan():
+    """
+    Определяет переменные всех шаблонов каталога заранее и возвращает их
+    описания.
+    """
+    templates = get_templates()
+    for info in templates:
+        get_template_variables(info.path)
+    return templates
+
+
+def clear():
+    """Очищает переменные шаблонов в памяти процесса."""
+    with _lock:
+        _variables.clear()
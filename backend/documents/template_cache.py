@@ -0,0 +1,141 @@
+"""
+Модуль кэша подготовленных шаблонов документов.
+
+Большая часть времени заполнения шаблона docxtpl уходит на подготовку
+XML документа (patch_xml) и компиляцию его в шаблон Jinja, которые
+повторяются при каждом создании DocxTemplate. Кэш хранит в памяти
+процесса содержимое файла шаблона, подготовленный XML и
+скомпилированные шаблоны Jinja его частей, поэтому при повторном
+заполнении остаются только распаковка документа и подстановка значений.
+Запись кэша привязана к пути и времени изменения файла шаблона, при
+превышении размера вытесняются давно не использованные шаблоны.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+
+class TemplateEnvironment(Environment):
+    """Окружение Jinja, сохраняющее скомпилированные шаблоны."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compiled = {}
+
+    def from_string(self, source, *args, **kwargs):
+        template = self.compiled.get(source)
+        if template is None:
+            template = super().from_string(source, *args, **kwargs)
+            self.compiled[source] = template
+        return template
+
+
+class PreparedTemplate:
+    """
+    Подготовленный шаблон документа. Не изменяется при заполнении и может
+    использоваться одновременно несколькими потоками.
+
+    Атрибуты:
+        path (str): Путь к файлу шаблона.
+        mtime (float): Время изменения файла при загрузке.
+        content (bytes): Содержимое файла шаблона.
+        patched (dict): Подготовленный XML частей документа по исходному.
+        jinja_env (TemplateEnvironment): Окружение со скомпилированными
+            шаблонами частей документа.
+    """
+
+    def __init__(self, path, mtime):
+        self.path = path
+        self.mtime = mtime
+        with open(path, 'rb') as file:
+            self.content = file.read()
+        self.patched = {}
+        self.jinja_env = TemplateEnvironment()
+        self.lock = threading.Lock()
+        # Пробное заполнение подготавливает и компилирует все части
+        CachedDocxTemplate(self).render({})
+
+    def patch_xml(self, template, src_xml):
+        patched = self.patched.get(src_xml)
+        if patched is None:
+            with self.lock:
+                patched = DocxTemplate.patch_xml(template, src_xml)
+                self.patched[src_xml] = patched
+        return patched
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """
+    Шаблон docxtpl, использующий подготовленные части PreparedTemplate.
+    Для каждого документа создаётся новый объект.
+    """
+
+    def __init__(self, prepared):
+        super().__init__(io.BytesIO(prepared.content))
+        self.prepared = prepared
+
+    def init_docx(self):
+        if not self.docx or self.is_rendered:
+            self.docx = Document(io.BytesIO(self.prepared.content))
+            self.is_rendered = False
+
+    def patch_xml(self, src_xml):
+        return self.prepared.patch_xml(self, src_xml)
+
+    def render(self, context, jinja_env=None, autoescape=False):
+        super().render(
+            context, jinja_env or self.prepared.jinja_env, autoescape
+        )
+
+
+_templates = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def get_template(template_path):
+    """
+    Возвращает шаблон для заполнения документа. Подготовленный шаблон
+    берётся из кэша, если файл не изменился с момента загрузки.
+    """
+    mtime = os.stat(template_path).st_mtime
+    with _lock:
+        prepared = _templates.get(template_path)
+        if prepared is not None and prepared.mtime == mtime:
+            _templates.move_to_end(template_path)
+            _stats['hits'] += 1
+            return CachedDocxTemplate(prepared)
+        _stats['misses'] += 1
+    prepared = PreparedTemplate(template_path, mtime)
+    with _lock:
+        _templates[template_path] = prepared
+        _templates.move_to_end(template_path)
+        while len(_templates) > settings.DOCUMENT_TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)
+    return CachedDocxTemplate(prepared)
+
+
+def warm_up(template_paths):
+    """Загружает шаблоны в кэш заранее, пропуская отсутствующие файлы."""
+    for template_path in template_paths:
+        if os.path.exists(template_path):
+            get_template(template_path)
+
+
+def clear():
+    """Очищает кэш шаблонов и его статистику."""
+    with _lock:
+        _templates.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def get_stats():
+    """Возвращает статистику кэша шаблонов."""
+    with _lock:
+        return {**_stats, 'size': len(_templates)}
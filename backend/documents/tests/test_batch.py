@@ -0,0 +1,187 @@
+import io
+import os
+import zipfile
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from documents.batch import render_documents
+from documents.document_generation import get_template_path
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from users.models import Organization, User
+
+TEMPLATE = 'протокол_проверки_по_ОТ'
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.fixture
+def examinations(user):
+    """
+    Фикстура создания трёх проверок пользователя и одной проверки другой
+    организации.
+    """
+    briefing = Briefing.objects.create(name='Первичный')
+    course = Course.objects.create(
+        course_number='001', course_name='Машинист крана автомобильного'
+    )
+    commission = Commission.objects.create(
+        chairman_name='Иван Иванов',
+        chairman_position='Директор',
+        member1_name='Пётр Петров',
+        member1_position='Главный инженер',
+        member2_name='Николай Сидоров',
+        member2_position='Техник',
+        safety_officer_name='Анна Алексеева',
+        safety_officer_position='Электрик'
+    )
+    other = User.objects.create_user(
+        username='other',
+        email='other@example.com',
+        organization=Organization.objects.create(name='Other organization')
+    )
+    result = []
+    for i, owner in enumerate([user, user, user, other]):
+        examined = Examined.objects.create(
+            full_name=f'Тестируемый {i}',
+            position='Инженер',
+            brigade=f'Цех №{i}',
+            safety_group='III',
+            work_experience='5 лет',
+            user=owner
+        )
+        result.append(Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15 + i),
+            protocol_number=f'{i}/2024',
+            reason='Повторная',
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        ))
+    return result
+
+
+def document_xml(content):
+    """Возвращает XML основной части документа .docx."""
+    return zipfile.ZipFile(io.BytesIO(content)).read(
+        'word/document.xml'
+    ).decode()
+
+
+def read_archive(response):
+    """Возвращает XML документов архива по именам файлов."""
+    archive = zipfile.ZipFile(
+        io.BytesIO(b''.join(response.streaming_content))
+    )
+    return {
+        name: document_xml(archive.read(name))
+        for name in archive.namelist()
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_by_filter(client, settings, user, examinations, workers,
+                         django_assert_num_queries):
+    """
+    Тестирование пакетной генерации по фильтрам главной страницы:
+    проверки загружаются одним запросом, а архив содержит документы
+    только проверок организации пользователя.
+    """
+    settings.DOCUMENT_WORKERS = workers
+    client.login(username=user.username, password='password123')
+    url = reverse('documents:document_batch')
+    # Сессия, пользователь и проверки
+    with django_assert_num_queries(3):
+        response = client.post(
+            url + '?current_check_date=2024-01-15', {'template': TEMPLATE}
+        )
+    assert response['Content-Type'] == 'application/zip'
+    with django_assert_num_queries(0):
+        documents = read_archive(response)
+    assert sorted(documents) == sorted(
+        f'{TEMPLATE}_{examination.pk}.docx'
+        for examination in examinations[:3]
+    )
+    text = documents[f'{TEMPLATE}_{examinations[0].pk}.docx']
+    assert 'Тестируемый 0' in text
+    assert not os.path.exists(
+        os.path.join(settings.BASE_DIR, 'generated_documents',
+                     f'{TEMPLATE}_{examinations[0].pk}.docx')
+    )
+
+
+@pytest.mark.django_db
+def test_batch_by_ids(client, user, examinations):
+    """
+    Тестирование пакетной генерации по списку идентификаторов: проверки
+    другой организации пропускаются.
+    """
+    client.login(username=user.username, password='password123')
+    response = client.post(
+        reverse('documents:document_batch')
+        + f'?ids={examinations[1].pk}&ids={examinations[3].pk}',
+        {'template': TEMPLATE}
+    )
+    assert list(read_archive(response)) == [
+        f'{TEMPLATE}_{examinations[1].pk}.docx'
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_form(client, settings, user, examinations):
+    """
+    Тестирование формы пакетной генерации: отображение количества
+    проверок и ошибка при превышении лимита.
+    """
+    client.login(username=user.username, password='password123')
+    url = reverse('documents:document_batch')
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.context['count'] == 3
+
+    settings.DOCUMENT_BATCH_LIMIT = 2
+    response = client.post(url, {'template': TEMPLATE})
+    assert response.status_code == 200
+    assert response.context['form'].non_field_errors()
+
+
+@pytest.mark.django_db
+def test_batch_requires_login(client):
+    """Тестирование перенаправления неавторизованного пользователя."""
+    response = client.get(reverse('documents:document_batch'))
+    assert response.status_code == 302
+
+
+def test_render_documents_keeps_order():
+    """Тестирование порядка документов при заполнении в пуле процессов."""
+    contexts = [{'examined_full_name': f'Сотрудник {i}'} for i in range(5)]
+    contents = list(
+        render_documents(get_template_path(TEMPLATE), contexts, 2)
+    )
+    for i, content in enumerate(contents):
+        assert f'Сотрудник {i}' in document_xml(content)
+
+
+@pytest.mark.django_db
+def test_generate_documents_command(tmp_path, examinations):
+    """Тестирование команды пакетной генерации документов."""
+    output = tmp_path / 'documents.zip'
+    call_command(
+        'generate_documents', template=TEMPLATE, output=str(output),
+        ids=[examinations[0].pk, examinations[3].pk], workers=1,
+        stdout=io.StringIO()
+    )
+    assert len(zipfile.ZipFile(output).namelist()) == 2
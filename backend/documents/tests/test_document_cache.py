@@ -0,0 +1,221 @@
+import os
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from documents.document_cache import (DiskStorage, get_document,
+                                      get_document_key)
+from documents.document_generation import (get_context, get_context_keys,
+                                           get_template_path)
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from users.models import Organization, User
+
+TEMPLATE = 'протокол_проверки_по_ОТ'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура очистки кэша между тестами."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization'),
+    )
+
+
+@pytest.fixture
+def examination(user):
+    """Фикстура проверки организации пользователя."""
+    examined = Examined.objects.create(
+        full_name='Антонио Фагундес',
+        position='Инженер',
+        brigade='Цех №1',
+        safety_group='III',
+        work_experience='5 лет',
+        user=user,
+    )
+    return Examination.objects.create(
+        current_check_date=date(2024, 1, 15),
+        next_check_date=date(2025, 1, 15),
+        protocol_number='123/2024',
+        reason='Первичная',
+        commission=Commission.objects.create(chairman_name='Иван Иванов'),
+        examined=examined,
+        briefing=Briefing.objects.create(name='Первичный'),
+        course=Course.objects.create(
+            course_number='001', course_name='Машинист крана'
+        ),
+    )
+
+
+@pytest.fixture
+def url(examination):
+    """Фикстура URL загрузки протокола проверки."""
+    return (reverse('documents:document_download', args=[examination.pk])
+            + f'?template={TEMPLATE}')
+
+
+def test_document_key_depends_on_content(tmp_path):
+    """
+    Тестирует ключ документа: он совпадает для тех же шаблона и контекста
+    и меняется при изменении контекста, вида документа или шаблона.
+    """
+    template_path = tmp_path / 'template.docx'
+    template_path.write_bytes(b'first')
+    context = {'protocol_number': '123/2024', 'check_date': date(2024, 1, 15)}
+    key = get_document_key(str(template_path), [context])
+
+    assert get_document_key(str(template_path), [dict(context)]) == key
+    assert get_document_key(
+        str(template_path), [{**context, 'protocol_number': '124/2024'}]
+    ) != key
+    assert get_document_key(
+        str(template_path), [context], combined=True
+    ) != key
+
+    template_path.write_bytes(b'second')
+    os.utime(template_path, (time.time() + 10, time.time() + 10))
+    assert get_document_key(str(template_path), [context]) != key
+
+
+def test_get_document_renders_once(settings):
+    """Тестирует заполнение документа только при отсутствии в кэше."""
+    settings.DOCUMENT_CACHE = 'cache'
+    calls = []
+
+    def render():
+        calls.append(1)
+        return b'document'
+
+    assert get_document('key', render) == b'document'
+    assert get_document('key', render) == b'document'
+    assert len(calls) == 1
+
+    settings.DOCUMENT_CACHE = ''
+    get_document('key', render)
+    assert len(calls) == 2
+
+
+def test_disk_storage_evicts_least_recently_used(tmp_path, settings):
+    """
+    Тестирует хранилище на диске: при превышении размера удаляются
+    давно не запрашивавшиеся документы.
+    """
+    storage = DiskStorage(str(tmp_path), max_size=250)
+    for number, key in enumerate(['aa1', 'bb2', 'cc3']):
+        storage.set(key, b'x' * 100)
+        path = storage.get_path(key)
+        os.utime(path, (number, number))
+        if key == 'bb2':
+            # Первый документ запрашивается и становится самым свежим
+            assert storage.get('aa1') == b'x' * 100
+
+    assert storage.get('aa1') is not None
+    assert storage.get('bb2') is None
+    assert storage.get('cc3') is not None
+
+    settings.DOCUMENT_CACHE = 'disk'
+    settings.DOCUMENT_CACHE_DIR = str(tmp_path)
+    assert get_document('aa1', lambda: b'new') == b'x' * 100
+
+
+def test_disk_storage_evicts_periodically(tmp_path):
+    """
+    Тестирует вытеснение документов на диске не чаще заданного периода:
+    записи между вытеснениями не просматривают каталог.
+    """
+    storage = DiskStorage(str(tmp_path), max_size=150, evict_interval=3600)
+    with patch.object(
+        DiskStorage, 'evict', autospec=True, side_effect=DiskStorage.evict
+    ) as evict:
+        for key in ['aa1', 'bb2', 'cc3']:
+            storage.set(key, b'x' * 100)
+    assert evict.call_count == 1
+    assert len(list(storage.iter_files())) == 3
+
+    storage.evict()
+    assert len(list(storage.iter_files())) == 1
+
+
+def test_disk_storage_file_format(tmp_path):
+    """
+    Тестирует расширение файлов хранилища на диске по формату документа.
+    """
+    storage = DiskStorage(str(tmp_path), max_size=1000)
+    storage.set('aa1', b'docx')
+    storage.set('aa1_pdf', b'%PDF')
+    assert storage.get_path('aa1').endswith('aa1.docx')
+    assert storage.get_path('aa1_pdf').endswith('aa1.pdf')
+    assert storage.get('aa1') == b'docx'
+    assert storage.get('aa1_pdf') == b'%PDF'
+    assert len(list(storage.iter_files())) == 2
+
+
+@pytest.mark.django_db
+def test_download_etag(client, user, examination, url):
+    """
+    Тестирует загрузку документа с ETag: повторный запрос с
+    If-None-Match получает ответ 304 без заполнения документа, а после
+    изменения проверки — новый документ.
+    """
+    client.force_login(user)
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response['ETag']
+    loaded = Examination.objects.select_related(
+        'examined__company_name', 'commission', 'briefing', 'course'
+    ).get(pk=examination.pk)
+    template_path = get_template_path(TEMPLATE)
+    assert etag == '"{}"'.format(get_document_key(
+        template_path,
+        [get_context(loaded, get_context_keys(template_path))]
+    ))
+    assert 'no-cache' in response['Cache-Control']
+
+    with patch('documents.views.get_document') as get_document_mock:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    get_document_mock.assert_not_called()
+
+    examination.reason = 'Внеочередная'
+    examination.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_download_other_organization(client, examination, url):
+    """Тестирует запрет загрузки документа проверки другой организации."""
+    other_user = User.objects.create_user(
+        username='otheruser',
+        email='otheruser@example.com',
+        organization=Organization.objects.create(name='Other organization'),
+    )
+    client.force_login(other_user)
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_download_invalid_template(client, user, examination):
+    """Тестирует загрузку документа по неизвестному шаблону."""
+    client.force_login(user)
+    response = client.get(
+        reverse('documents:document_download', args=[examination.pk]),
+        {'template': 'unknown'}
+    )
+    assert response.status_code == 400
+    assert response.context['form'].errors
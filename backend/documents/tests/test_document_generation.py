@@ -1,8 +1,14 @@
+import io
+import zipfile
 from datetime import date
 from unittest.mock import MagicMock, patch
 
 import pytest
-from documents.document_generation import generate_document
+from django.urls import reverse
+from documents.document_generation import (generate_document,
+                                           get_template_path,
+                                           render_session_protocol)
+from docx import Document
 from facility.models import Briefing, Commission, Course, Examination, Examined
 from users.models import Organization, User
 
@@ -51,24 +57,20 @@ def setup_examination(db):
 
 
 @pytest.mark.django_db
-@patch("documents.document_generation.DocxTemplate")
+@patch("documents.document_generation.get_template")
 def test_generate_document(mock_docxtemplate, setup_examination, tmp_path):
     """
     Тестирует генерацию документа.
-    Проверяет корректность контекста и сохранение файла.
+    Проверяет корректность контекста и возврат содержимого документа.
     """
     template_path = tmp_path / "template.docx"
-    output_path = tmp_path / "output.docx"
     template_path.write_text("Fictitious template content")
 
     mock_doc = MagicMock()
+    mock_doc.save.side_effect = lambda buffer: buffer.write(b"document")
     mock_docxtemplate.return_value = mock_doc
 
-    generate_document(
-        setup_examination.id,
-        str(template_path),
-        str(output_path),
-    )
+    content = generate_document(setup_examination.id, str(template_path))
 
     mock_docxtemplate.assert_called_once_with(str(template_path))
     mock_doc.render.assert_called_once_with({
@@ -99,4 +101,149 @@ def test_generate_document(mock_docxtemplate, setup_examination, tmp_path):
         "next_check_date": "15.01.2025",
         "briefings_name": setup_examination.briefing.name,
     })
-    mock_doc.save.assert_called_once_with(str(output_path))
+    mock_doc.save.assert_called_once()
+    assert content == b"document"
+
+
+@pytest.fixture
+def session_examinations(setup_examination):
+    """
+    Фикстура создания проверок заседания комиссии: трёх проверок с общими
+    номером и датой протокола, проверки другого заседания и проверки
+    другой организации с тем же номером протокола.
+    """
+    examinations = [setup_examination]
+    user = setup_examination.examined.user
+    other_user = User.objects.create_user(
+        username="otheruser",
+        email="otheruser@example.com",
+        organization=Organization.objects.create(name="Other organization"),
+    )
+    for full_name, owner, protocol_number in [
+        ("Борис Борисов", user, "123/2024"),
+        ("Вера Васильева", user, "123/2024"),
+        ("Галина Григорьева", user, "124/2024"),
+        ("Дмитрий Дмитриев", other_user, "123/2024"),
+    ]:
+        examined = Examined.objects.create(
+            full_name=full_name,
+            position="Слесарь",
+            brigade="Цех №2",
+            safety_group="II",
+            work_experience="3 года",
+            user=owner,
+        )
+        examinations.append(Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=protocol_number,
+            reason="Первичная",
+            commission=setup_examination.commission,
+            examined=examined,
+            briefing=setup_examination.briefing,
+            course=setup_examination.course,
+        ))
+    return examinations
+
+
+def get_table_rows(content):
+    """Возвращает тексты ячеек строк всех таблиц документа."""
+    return [
+        [cell.text.strip() for cell in row.cells]
+        for table in Document(io.BytesIO(content)).tables
+        for row in table.rows
+    ]
+
+
+@pytest.mark.django_db
+def test_render_session_protocol(session_examinations):
+    """
+    Тестирует общий протокол: по одной таблице на заседание, строки
+    аттестуемых пронумерованы и заполнены их данными.
+    """
+    examinations = Examination.objects.select_related(
+        "examined__company_name", "commission", "briefing", "course"
+    ).filter(pk__in=[e.pk for e in session_examinations[:4]]).order_by("pk")
+    content = render_session_protocol(
+        get_template_path("протокол_проверки_по_ОТ"), list(examinations)
+    )
+    rows = [row for row in get_table_rows(content) if row[0].isdigit()]
+    assert [row[:2] for row in rows] == [
+        ["1", "Антонио Фагундес"],
+        ["2", "Борис Борисов"],
+        ["3", "Вера Васильева"],
+        ["1", "Галина Григорьева"],
+    ]
+    assert rows[1][5] == "Первичная"
+    text = zipfile.ZipFile(io.BytesIO(content)).read(
+        "word/document.xml"
+    ).decode()
+    assert "[[" not in text
+    assert text.count("123/2024") == 1
+
+
+@pytest.mark.django_db
+def test_render_session_protocol_without_row(session_examinations):
+    """
+    Тестирует объединение документов, в шаблоне которых поля аттестуемого
+    не собраны в одну строку таблицы.
+    """
+    examinations = Examination.objects.select_related(
+        "examined__company_name", "commission", "briefing", "course"
+    ).filter(pk__in=[e.pk for e in session_examinations[:3]])
+    content = render_session_protocol(
+        get_template_path("удостоверение_по_ЭБ"), list(examinations)
+    )
+    text = zipfile.ZipFile(io.BytesIO(content)).read(
+        "word/document.xml"
+    ).decode()
+    for examination in examinations:
+        assert examination.examined.full_name in text
+
+
+@pytest.mark.django_db
+def test_session_protocol_view(client, session_examinations):
+    """
+    Тестирует формирование общего протокола из формы генерации документа:
+    в протокол не попадают проверки другой организации.
+    """
+    client.force_login(session_examinations[0].examined.user)
+    response = client.post(
+        reverse(
+            "documents:document_generate", args=[session_examinations[0].pk]
+        ),
+        {"template": "протокол_проверки_по_ОТ", "combined": "on"},
+    )
+    assert response.status_code == 200
+    names = [row[1] for row in get_table_rows(response.content)]
+    assert "Вера Васильева" in names
+    assert "Галина Григорьева" not in names
+    assert "Дмитрий Дмитриев" not in names
+
+
+@pytest.mark.django_db
+def test_generate_document_in_memory(setup_examination):
+    """Тестирует формирование документа по шаблону без записи на диск."""
+    content = generate_document(
+        setup_examination.id, get_template_path("протокол_проверки_по_ОТ")
+    )
+    text = zipfile.ZipFile(io.BytesIO(content)).read(
+        "word/document.xml"
+    ).decode()
+    assert setup_examination.examined.full_name in text
+
+
+@pytest.mark.django_db
+def test_generate_document_loads_used_relations(setup_examination,
+                                                django_assert_num_queries):
+    """
+    Тестирует генерацию документа по шаблону без программы обучения:
+    запрос не соединяет таблицы программ обучения и организаций.
+    """
+    with django_assert_num_queries(1) as queries:
+        generate_document(
+            setup_examination.id, get_template_path("удостоверение_по_ЭБ")
+        )
+    sql = queries.captured_queries[0]['sql']
+    assert 'facility_course' not in sql
+    assert 'users_organization' not in sql
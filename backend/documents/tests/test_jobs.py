@@ -0,0 +1,300 @@
+import io
+import zipfile
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from documents.jobs import (delete_expired_jobs, enqueue_job, fail_stale_jobs,
+                            get_queue, process_next, requeue_lost_jobs,
+                            run_worker)
+from documents.models import DocumentJob
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from users.models import Organization, User
+
+TEMPLATE = 'протокол_проверки_по_ОТ'
+
+
+@pytest.fixture(autouse=True)
+def local_queue(settings):
+    """Фикстура пустой очереди заданий в памяти процесса."""
+    settings.DOCUMENT_JOB_QUEUE = 'local'
+    settings.DOCUMENT_JOB_LOCAL_WORKER = False
+    while get_queue().pop(0) is not None:
+        pass
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.fixture
+def examinations(user):
+    """Фикстура создания трёх проверок пользователя."""
+    commission = Commission.objects.create(chairman_name='Иван Иванов')
+    briefing = Briefing.objects.create(name='Первичный')
+    course = Course.objects.create(
+        course_number='001', course_name='Машинист крана'
+    )
+    result = []
+    for i in range(3):
+        examined = Examined.objects.create(
+            full_name=f'Тестируемый {i}',
+            position='Инженер',
+            brigade='Цех №1',
+            safety_group='III',
+            work_experience='5 лет',
+            user=user
+        )
+        result.append(Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number='1/2024',
+            reason='Повторная',
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        ))
+    return result
+
+
+@pytest.mark.django_db
+def test_background_batch(client, user, examinations,
+                          django_capture_on_commit_callbacks):
+    """
+    Тестирование фоновой пакетной генерации: задание ставится в очередь,
+    выполняется обработчиком, а клиент получает его состояние и архив.
+    """
+    client.login(username=user.username, password='password123')
+    with django_capture_on_commit_callbacks(execute=True), patch(
+        'documents.forms.is_background_available', return_value=True
+    ):
+        response = client.post(
+            reverse('documents:document_batch'),
+            {'template': TEMPLATE, 'background': 'on'}
+        )
+    job = DocumentJob.objects.get()
+    assert response.status_code == 302
+    assert response.url == reverse('documents:document_job', args=[job.pk])
+
+    response = client.get(response.url)
+    assert response.status_code == 200
+    assert response['Refresh']
+    status_url = reverse('documents:document_job_status', args=[job.pk])
+    assert client.get(status_url).json()['status'] == DocumentJob.QUEUED
+
+    assert process_next().pk == job.pk
+    status = client.get(status_url).json()
+    assert status['status'] == DocumentJob.DONE
+    assert status['queue_time'] >= 0
+    assert status['render_time'] >= 0
+    assert not client.get(response.request['PATH_INFO']).has_header(
+        'Refresh'
+    )
+
+    response = client.get(status['download_url'])
+    assert response['Content-Type'] == 'application/zip'
+    assert len(response.content) == status['size']
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == [
+        f'{TEMPLATE}_{examination.pk}.docx' for examination in examinations
+    ]
+
+
+@pytest.mark.django_db
+def test_single_document_job(user, examinations,
+                             django_capture_on_commit_callbacks):
+    """Тестирование задания генерации документа одной проверки."""
+    with django_capture_on_commit_callbacks(execute=True):
+        job = enqueue_job(user, TEMPLATE, [examinations[1].pk])
+    job = process_next()
+    assert job.status == DocumentJob.DONE
+    assert job.filename == f'{TEMPLATE}_{examinations[1].pk}.docx'
+    text = zipfile.ZipFile(io.BytesIO(job.content)).read(
+        'word/document.xml'
+    ).decode()
+    assert 'Тестируемый 1' in text
+    assert process_next() is None
+
+
+@pytest.mark.django_db
+def test_failed_job(user, django_capture_on_commit_callbacks):
+    """Тестирование завершения с ошибкой задания без проверок."""
+    with django_capture_on_commit_callbacks(execute=True):
+        enqueue_job(user, TEMPLATE, [0, -1])
+    job = process_next()
+    assert job.status == DocumentJob.FAILED
+    assert job.error
+    assert job.finished_at
+
+
+@pytest.mark.django_db
+def test_unavailable_queue(user, django_capture_on_commit_callbacks):
+    """
+    Тестирование задания, которое не удалось поставить в очередь: оно
+    сразу завершается с ошибкой.
+    """
+    with patch('documents.jobs.get_queue', side_effect=ConnectionError):
+        with django_capture_on_commit_callbacks(execute=True):
+            job = enqueue_job(user, TEMPLATE, [1])
+    job.refresh_from_db()
+    assert job.status == DocumentJob.FAILED
+
+
+@pytest.mark.django_db
+def test_job_of_other_user(client, user, examinations):
+    """Тестирование недоступности задания другого пользователя."""
+    job = enqueue_job(user, TEMPLATE, [examinations[0].pk])
+    other = User.objects.create_user(
+        username='other', email='other@example.com'
+    )
+    client.force_login(other)
+    for name in ['document_job', 'document_job_status',
+                 'document_job_download']:
+        assert client.get(
+            reverse(f'documents:{name}', args=[job.pk])
+        ).status_code == 404
+
+
+@pytest.mark.django_db
+def test_worker_command(user, examinations,
+                        django_capture_on_commit_callbacks):
+    """Тестирование команды обработчика очереди и вывода статистики."""
+    with django_capture_on_commit_callbacks(execute=True):
+        enqueue_job(user, TEMPLATE, [examinations[0].pk], combined=True)
+    stdout = io.StringIO()
+    call_command('run_document_worker', max_jobs=1, timeout=0, stdout=stdout)
+    assert 'Выполнено заданий: 1' in stdout.getvalue()
+
+    stdout = io.StringIO()
+    call_command('run_document_worker', stats=True, stdout=stdout)
+    assert f'{TEMPLATE}: заданий 1' in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_delete_expired_jobs(settings, user):
+    """Тестирование удаления давно завершённых заданий."""
+    settings.DOCUMENT_JOB_RETENTION = 1
+    old = enqueue_job(user, TEMPLATE, [1])
+    recent = enqueue_job(user, TEMPLATE, [1])
+    queued = enqueue_job(user, TEMPLATE, [1])
+    DocumentJob.objects.filter(pk=old.pk).update(
+        finished_at=timezone.now() - timedelta(hours=2)
+    )
+    DocumentJob.objects.filter(pk=recent.pk).update(
+        finished_at=timezone.now()
+    )
+    assert delete_expired_jobs() == 1
+    assert set(DocumentJob.objects.values_list('pk', flat=True)) == {
+        recent.pk, queued.pk
+    }
+
+
+@pytest.mark.django_db
+def test_combined_job_uses_view_cache(client, settings, user, examinations,
+                                      django_capture_on_commit_callbacks):
+    """
+    Тестирование общего протокола задания: задание берёт из кэша протокол,
+    уже сформированный на странице документа проверки, под тем же ключом.
+    """
+    cache.clear()
+    settings.DOCUMENT_CACHE = 'cache'
+    client.force_login(user)
+    response = client.get(
+        reverse('documents:document_download', args=[examinations[0].pk]),
+        {'template': TEMPLATE, 'combined': 'on'}
+    )
+    assert response.status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        enqueue_job(
+            user, TEMPLATE, [item.pk for item in examinations], combined=True
+        )
+    with patch('documents.jobs.render_session_protocol') as render_mock:
+        job = process_next()
+    render_mock.assert_not_called()
+    assert job.status == DocumentJob.DONE
+    assert job.content == response.content
+
+
+@pytest.mark.django_db
+def test_fail_stale_jobs(settings, user):
+    """
+    Тестирование завершения с ошибкой заданий, обработчик которых
+    остановился во время выполнения.
+    """
+    settings.DOCUMENT_JOB_TIMEOUT = 60
+    stale = enqueue_job(user, TEMPLATE, [1])
+    running = enqueue_job(user, TEMPLATE, [1])
+    queued = enqueue_job(user, TEMPLATE, [1])
+    DocumentJob.objects.filter(pk=stale.pk).update(
+        status=DocumentJob.RUNNING,
+        started_at=timezone.now() - timedelta(minutes=5)
+    )
+    DocumentJob.objects.filter(pk=running.pk).update(
+        status=DocumentJob.RUNNING, started_at=timezone.now()
+    )
+    assert fail_stale_jobs() == 1
+    stale.refresh_from_db()
+    assert stale.status == DocumentJob.FAILED
+    assert stale.error and stale.finished_at
+    assert dict(DocumentJob.objects.filter(
+        pk__in=[running.pk, queued.pk]
+    ).values_list('pk', 'status')) == {
+        running.pk: DocumentJob.RUNNING, queued.pk: DocumentJob.QUEUED
+    }
+
+
+@pytest.mark.django_db
+def test_background_option_requires_worker(client, settings, user,
+                                           examinations):
+    """
+    Тестирование того, что фоновая генерация не предлагается, если
+    задания очереди в памяти процесса никто не выполняет.
+    """
+    client.login(username=user.username, password='password123')
+    url = reverse('documents:document_batch')
+    response = client.get(url)
+    assert 'background' not in response.context['form'].fields
+    assert 'name="background"' not in response.content.decode()
+
+    response = client.post(url, {'template': TEMPLATE, 'background': 'on'})
+    assert response['Content-Type'] == 'application/zip'
+    assert not DocumentJob.objects.exists()
+
+    settings.DOCUMENT_JOB_QUEUE = 'redis'
+    assert 'background' in client.get(url).context['form'].fields
+
+
+@pytest.mark.django_db
+def test_requeue_lost_jobs(settings, user, examinations):
+    """
+    Тестирование повторной постановки в очередь заданий, идентификаторы
+    которых потеряны очередью: обработчик выполняет их, когда очередь
+    пуста.
+    """
+    settings.DOCUMENT_JOB_TIMEOUT = 60
+    lost = enqueue_job(user, TEMPLATE, [examinations[0].pk])
+    recent = enqueue_job(user, TEMPLATE, [examinations[0].pk])
+    DocumentJob.objects.filter(pk=lost.pk).update(
+        created_at=timezone.now() - timedelta(minutes=5)
+    )
+    assert len(get_queue()) == 0
+
+    assert run_worker(get_queue(), timeout=0, max_jobs=1) == 1
+    lost.refresh_from_db()
+    recent.refresh_from_db()
+    assert lost.status == DocumentJob.DONE
+    assert recent.status == DocumentJob.QUEUED
+    assert requeue_lost_jobs() == 0
@@ -0,0 +1,136 @@
+import threading
+import xmlrpc.client
+from email.header import decode_header
+from xmlrpc.server import SimpleXMLRPCServer
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from documents.forms import DocumentGenerationForm
+from documents.pdf import ConverterPool, PdfBusy, PdfError, convert_on_server
+
+from .test_views import setup_examination  # noqa: F401
+
+TEMPLATE = 'протокол_проверки_по_ОТ'
+
+
+@pytest.fixture
+def converter():
+    """
+    Фикстура сервера XML-RPC с методом convert, как у unoserver. Вместо
+    преобразования возвращает исходные данные с заголовком PDF.
+    """
+    calls = []
+
+    def convert(inpath, indata, outpath, convert_to, *args):
+        calls.append(convert_to)
+        return xmlrpc.client.Binary(b'%PDF-' + indata.data[:2])
+
+    server = SimpleXMLRPCServer(
+        ('127.0.0.1', 0), allow_none=True, logRequests=False
+    )
+    server.register_function(convert, 'convert')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.calls = calls
+    server.address = '127.0.0.1:{}'.format(server.server_address[1])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_convert_on_server(converter):
+    """Тестирует обращение к серверу преобразования."""
+    assert convert_on_server(converter.address, b'PK', 5) == b'%PDF-PK'
+    assert converter.calls == ['pdf']
+
+
+def test_convert_on_unavailable_server():
+    """Тестирует ошибку при недоступном сервере преобразования."""
+    with pytest.raises(PdfError):
+        convert_on_server('127.0.0.1:1', b'PK', 1)
+
+
+def blocking_pool(queue_limit, timeout):
+    """Возвращает пул из одного сервера, преобразование в котором ждёт."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def convert(server, content, timeout):
+        started.set()
+        release.wait(5)
+        return b'%PDF'
+
+    pool = ConverterPool(['server'], queue_limit, timeout, convert=convert)
+    thread = threading.Thread(target=pool.convert, args=(b'PK',))
+    thread.start()
+    started.wait(5)
+    return pool, release, thread
+
+
+def test_pool_queue_limit():
+    """Тестирует отказ при заполненной очереди пула."""
+    pool, release, thread = blocking_pool(queue_limit=0, timeout=5)
+    with pytest.raises(PdfBusy):
+        pool.convert(b'PK')
+    release.set()
+    thread.join()
+    assert pool.convert(b'PK') == b'%PDF'
+
+
+def test_pool_timeout():
+    """Тестирует отказ, если сервер не освободился за время ожидания."""
+    pool, release, thread = blocking_pool(queue_limit=1, timeout=0.2)
+    with pytest.raises(PdfBusy):
+        pool.convert(b'PK')
+    release.set()
+    thread.join()
+
+
+def test_form_without_converters(settings):
+    """Тестирует недоступность формата PDF без серверов преобразования."""
+    settings.DOCUMENT_PDF_SERVERS = []
+    form = DocumentGenerationForm({'template': TEMPLATE, 'file_format': 'pdf'})
+    assert not form.is_valid()
+    assert 'file_format' in form.errors
+    form = DocumentGenerationForm({'template': TEMPLATE})
+    assert form.is_valid()
+    assert form.cleaned_data['file_format'] == 'docx'
+
+
+@pytest.mark.django_db
+def test_pdf_document(client, settings, converter,
+                      setup_examination):  # noqa: F811
+    """
+    Тестирует загрузку документа в PDF: преобразованный документ
+    сохраняется в кэше и повторно не преобразуется.
+    """
+    cache.clear()
+    settings.DOCUMENT_PDF_SERVERS = [converter.address]
+    client.force_login(setup_examination.examined.user)
+    url = reverse('documents:document_generate', args=[setup_examination.id])
+    for _ in range(2):
+        response = client.post(
+            url, {'template': TEMPLATE, 'file_format': 'pdf'}
+        )
+        assert response['Content-Type'] == 'application/pdf'
+        assert response.content == b'%PDF-PK'
+        header, charset = decode_header(response['Content-Disposition'])[0]
+        assert header.decode(charset).endswith(
+            f'{TEMPLATE}_{setup_examination.id}.pdf"'
+        )
+    assert converter.calls == ['pdf']
+
+
+@pytest.mark.django_db
+def test_pdf_unavailable(client, settings, setup_examination):  # noqa: F811
+    """Тестирует ответ 503, если сервер преобразования недоступен."""
+    cache.clear()
+    settings.DOCUMENT_PDF_SERVERS = ['127.0.0.1:1']
+    client.force_login(setup_examination.examined.user)
+    response = client.post(
+        reverse('documents:document_generate', args=[setup_examination.id]),
+        {'template': TEMPLATE, 'file_format': 'pdf'}
+    )
+    assert response.status_code == 503
+    assert response.context['form'].non_field_errors()
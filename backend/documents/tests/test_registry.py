@@ -0,0 +1,83 @@
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from documents import registry
+from documents.checks import check_document_templates
+from documents.document_generation import (get_context_keys, get_relations,
+                                           get_template_path)
+from docx import Document
+
+CERTIFICATE = 'удостоверение_по_ЭБ'
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Фикстура очистки переменных шаблонов между тестами."""
+    registry.clear()
+    cache.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def template_dir(tmp_path, monkeypatch):
+    """
+    Фикстура каталога шаблонов с копией удостоверения и шаблоном с
+    неизвестной переменной.
+    """
+    shutil.copy(get_template_path(CERTIFICATE), tmp_path)
+    document = Document()
+    document.add_paragraph('{{ protocol_number }} {{ unknown_field }}')
+    document.save(tmp_path / 'новый_шаблон.docx')
+    (tmp_path / '~$новый_шаблон.docx').write_bytes(b'lock')
+    monkeypatch.setattr(registry, 'TEMPLATE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_template_choices(template_dir):
+    """Тестирует варианты выбора шаблона по файлам каталога."""
+    assert registry.get_template_choices() == [
+        ('новый_шаблон', 'Новый шаблон'),
+        (CERTIFICATE, 'Удостоверение проверки по электробезопасности'),
+    ]
+
+
+def test_variables_cached(template_dir):
+    """
+    Тестирует сохранение переменных шаблона: после перезапуска процесса
+    шаблон не разбирается повторно, пока не изменится его содержимое.
+    """
+    path = str(template_dir / 'новый_шаблон.docx')
+    assert registry.get_template_variables(path) == {
+        'protocol_number', 'unknown_field'
+    }
+    registry.clear()
+    with patch('documents.registry.parse_variables') as parse_mock:
+        assert registry.get_template_variables(path) == {
+            'protocol_number', 'unknown_field'
+        }
+    parse_mock.assert_not_called()
+
+
+def test_certificate_relations():
+    """
+    Тестирует связанные записи удостоверения по электробезопасности:
+    программа обучения и организация в нём не используются.
+    """
+    keys = get_context_keys(get_template_path(CERTIFICATE))
+    assert 'course_name' not in keys
+    assert get_relations(keys) == ('briefing', 'commission', 'examined')
+
+
+def test_check_unknown_variables(template_dir):
+    """Тестирует предупреждение о переменных шаблона вне контекста."""
+    (template_dir / 'испорченный.docx').write_bytes(b'not a docx')
+    errors = check_document_templates(None)
+    assert [error.id for error in errors] == [
+        'documents.E001', 'documents.W001'
+    ]
+    assert 'unknown_field' in errors[1].msg
+    assert os.path.basename(errors[1].obj) == 'новый_шаблон.docx'
@@ -0,0 +1,121 @@
+import io
+import os
+import shutil
+import threading
+import zipfile
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from documents import template_cache
+from documents.document_generation import get_template_path
+from documents.registry import get_template_choices
+from docxtpl import DocxTemplate
+
+TEMPLATE = 'протокол_проверки_по_ОТ'
+CONTEXT = {
+    'protocol_number': '123/2024',
+    'examined_full_name': 'Антонио Фагундес',
+    'examined_position': 'Инженер',
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    """Фикстура очистки кэша шаблонов между тестами."""
+    template_cache.clear()
+    yield
+    template_cache.clear()
+
+
+def render(doc, context=CONTEXT):
+    """Заполняет шаблон и возвращает XML основной части документа."""
+    doc.render(context)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return zipfile.ZipFile(buffer).read('word/document.xml')
+
+
+def test_cached_render_matches_docxtpl():
+    """
+    Тестирование совпадения документа, заполненного по подготовленному
+    шаблону, с документом, заполненным docxtpl напрямую.
+    """
+    path = get_template_path(TEMPLATE)
+    expected = render(DocxTemplate(path))
+    assert render(template_cache.get_template(path)) == expected
+    assert render(template_cache.get_template(path)) == expected
+    assert template_cache.get_stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_template_reloaded_after_change(tmp_path):
+    """Тестирование повторной загрузки изменённого файла шаблона."""
+    path = str(tmp_path / 'template.docx')
+    shutil.copy(get_template_path(TEMPLATE), path)
+    first = template_cache.get_template(path).prepared
+    assert template_cache.get_template(path).prepared is first
+
+    shutil.copy(get_template_path('удостоверение_по_ЭБ'), path)
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    doc = template_cache.get_template(path)
+    assert doc.prepared is not first
+    assert render(doc) == render(DocxTemplate(path))
+
+
+def test_least_recently_used_evicted(settings):
+    """Тестирование вытеснения давно не использованных шаблонов."""
+    settings.DOCUMENT_TEMPLATE_CACHE_SIZE = 2
+    paths = [get_template_path(name) for name, _ in get_template_choices()[:3]]
+    template_cache.get_template(paths[0])
+    template_cache.get_template(paths[1])
+    template_cache.get_template(paths[0])
+    template_cache.get_template(paths[2])
+    assert template_cache.get_stats()['size'] == 2
+    template_cache.get_template(paths[0])
+    assert template_cache.get_stats()['misses'] == 3
+
+
+def test_concurrent_renders():
+    """
+    Тестирование одновременного заполнения документов по одному
+    подготовленному шаблону из нескольких потоков.
+    """
+    path = get_template_path(TEMPLATE)
+    template_cache.get_template(path)
+    results = {}
+
+    def worker(number):
+        results[number] = render(
+            template_cache.get_template(path),
+            {**CONTEXT, 'examined_full_name': f'Сотрудник {number}'}
+        ).decode()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for number, xml in results.items():
+        assert f'Сотрудник {number}' in xml
+        assert 'Антонио' not in xml
+
+
+def test_warm_up_on_ready(settings):
+    """Тестирование подготовки всех шаблонов при запуске приложения."""
+    settings.DOCUMENT_TEMPLATE_WARMUP = True
+    apps.get_app_config('documents').ready()
+    assert template_cache.get_stats()['size'] == len(get_template_choices())
+
+
+def test_warm_up_skips_missing(tmp_path):
+    """Тестирование пропуска отсутствующих файлов при подготовке."""
+    template_cache.warm_up([str(tmp_path / 'missing.docx')])
+    assert template_cache.get_stats()['size'] == 0
+
+
+@pytest.mark.django_db
+def test_benchmark_templates_command():
+    """Тестирование команды сравнения времени заполнения документов."""
+    out = io.StringIO()
+    call_command('benchmark_templates', repeat=1, stdout=out)
+    assert out.getvalue().count('из кэша') == len(get_template_choices())
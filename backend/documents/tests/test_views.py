@@ -1,15 +1,15 @@
-import os
-import shutil
 from email.header import decode_header
-from unittest.mock import mock_open, patch
+from unittest.mock import patch
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
 from django.urls import reverse
 from documents.forms import DocumentGenerationForm
 from documents.views import document_generate_view
 from facility.models import Briefing, Commission, Course, Examination, Examined
-from users.models import User
+from users.models import Organization, User
 
 
 @pytest.fixture
@@ -55,6 +55,12 @@ def setup_examination():
     return examination
 
 
+def with_user(request, examination):
+    """Возвращает запрос от имени автора аттестуемого проверки."""
+    request.user = examination.examined.user
+    return request
+
+
 @pytest.fixture
 def url(setup_examination):
     """Фикстура URL представления генерации документа."""
@@ -62,30 +68,25 @@ def url(setup_examination):
 
 
 @pytest.mark.django_db
-@patch('documents.views.generate_document')
-def test_document_generation(generate_mock, setup_examination, url, rf):
+@patch('documents.views.render_document')
+def test_document_generation(render_mock, setup_examination, url, rf):
     """Тест успешной генерации документа."""
+    cache.clear()
     data = {'template': "протокол_проверки_по_ОТ"}
-    request = rf.post(url, data)
+    request = with_user(rf.post(url, data), setup_examination)
+    render_mock.return_value = b'Test document content'
 
     output_name = f"протокол_проверки_по_ОТ_{setup_examination.id}.docx"
-    output_path = os.path.join(
-        settings.BASE_DIR, 'generated_documents', output_name
-    )
-    generated_dir = os.path.dirname(output_path)
-
-    os.makedirs(generated_dir, exist_ok=True)
-    with open(output_path, "wb") as temp_file:
-        temp_file.write(b'Test document content')
 
     response = document_generate_view(request, setup_examination.id)
 
-    generate_mock.assert_called_once_with(
-        setup_examination.id,
-        f"{settings.BASE_DIR}/documents/templates/"
-        f"протокол_проверки_по_ОТ.docx",
-        output_path,
-    )
+    render_mock.assert_called_once()
+    template_path, context = render_mock.call_args.args
+    assert template_path == (f"{settings.BASE_DIR}/documents/templates/"
+                             f"протокол_проверки_по_ОТ.docx")
+    assert context['examined_full_name'] == "Антонио Фагундес"
+    assert context['protocol_number'] == '123/2024'
+    assert response.content == b'Test document content'
     assert response.status_code == 200
 
     header = response['Content-Disposition']
@@ -96,14 +97,13 @@ def test_document_generation(generate_mock, setup_examination, url, rf):
     )
     expected_filename = f'attachment; filename="{output_name}"'
     assert expected_filename in decoded_filename
-    shutil.rmtree(generated_dir, ignore_errors=True)
 
 
 @pytest.mark.django_db
 def test_invalid_form_submission(setup_examination, url, rf):
     """Тест отправки пустой формы."""
     data = {}
-    request = rf.post(url, data)
+    request = with_user(rf.post(url, data), setup_examination)
     response = document_generate_view(request, setup_examination.id)
     assert response.status_code == 200
     if hasattr(response, 'context') and response.context:
@@ -112,45 +112,96 @@ def test_invalid_form_submission(setup_examination, url, rf):
 
 
 @pytest.mark.django_db
-@patch('documents.views.cache.get')
-@patch('documents.views.cache.set')
-def test_cache_usage(mock_cache_set, mock_cache_get,
-                     setup_examination, url, rf):
-    """Тестирование использования кэша."""
-    mock_cache_get.return_value = setup_examination
-    request = rf.get(url)
-    response = document_generate_view(request, setup_examination.id)
+def test_single_query(setup_examination, url, rf,
+                      django_assert_num_queries):
+    """
+    Тест загрузки проверки одним запросом и для отображения формы, и для
+    заполнения документа.
+    """
+    cache.clear()
+    with django_assert_num_queries(1):
+        response = document_generate_view(
+            with_user(rf.get(url), setup_examination), setup_examination.id
+        )
     assert response.status_code == 200
-    assert mock_cache_get.called
-    mock_cache_get.assert_called_with(f'examination_{setup_examination.id}')
     assert setup_examination.protocol_number in response.content.decode()
     assert setup_examination.examined.full_name in response.content.decode()
 
+    data = {'template': "протокол_проверки_по_ОТ"}
+    with django_assert_num_queries(1):
+        response = document_generate_view(
+            with_user(rf.post(url, data), setup_examination),
+            setup_examination.id
+        )
+    assert response.status_code == 200
+
 
 @pytest.mark.django_db
-@patch('documents.views.open',
-       new_callable=mock_open,
-       read_data=b'Test document content')
-@patch('documents.views.cache.get')
-@patch('documents.views.cache.set')
-def test_cached_document_response(mock_cache_set, mock_cache_get, mock_open,
-                                  setup_examination, url, rf):
-    """Тест возврата кэшированного документа."""
-    mock_cache_get.side_effect = [None, b'Test document content']
+def test_missing_examination(rf, setup_examination):
+    """Тест запроса формы для несуществующей проверки."""
+    with pytest.raises(Http404):
+        document_generate_view(with_user(rf.get('/'), setup_examination), 0)
+
+
+@pytest.mark.django_db
+@patch('documents.views.render_document')
+def test_cached_document_response(render_mock, setup_examination, url, rf):
+    """
+    Тест возврата документа из кэша: документ заполняется заново только
+    после изменения данных проверки.
+    """
+    cache.clear()
+    render_mock.return_value = b'Test document content'
     data = {'template': "протокол_проверки_по_ОТ"}
-    request = rf.post(url, data)
-    response = document_generate_view(request, setup_examination.id)
 
-    assert response.status_code == 200
-    assert response.content == b'Test document content'
+    for _ in range(2):
+        response = document_generate_view(
+            with_user(rf.post(url, data), setup_examination),
+            setup_examination.id
+        )
+        assert response.status_code == 200
+        assert response.content == b'Test document content'
+    assert render_mock.call_count == 1
+
+    setup_examination.reason = "Внеочередная"
+    setup_examination.save()
+    document_generate_view(
+        with_user(rf.post(url, data), setup_examination),
+        setup_examination.id
+    )
+    assert render_mock.call_count == 2
 
-    header = response['Content-Disposition']
-    decoded_header = decode_header(header)
-    decoded_filename = "".join(
-        part.decode(charset or 'utf-8') if isinstance(part, bytes) else part
-        for part, charset in decoded_header
+
+@pytest.mark.django_db
+def test_anonymous_user_redirected(client, url):
+    """Тест перенаправления анонимного пользователя на страницу входа."""
+    response = client.get(url)
+    assert response.status_code == 302
+    assert response.url.startswith(reverse(settings.LOGIN_URL))
+    response = client.post(url, {'template': "протокол_проверки_по_ОТ"})
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+@patch('documents.views.render_session_protocol')
+def test_other_organization_not_found(render_mock, client, setup_examination,
+                                      url):
+    """
+    Тест запроса документа проверки другой организации: ни форма, ни
+    документ, ни общий протокол заседания не отдаются.
+    """
+    cache.clear()
+    User.objects.create_user(
+        username='otheruser', email='otheruser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Other')
     )
-    expected_filename = (f'attachment; filename='
-                         f'"протокол_проверки_по_ОТ_'
-                         f'{setup_examination.id}.docx"')
-    assert expected_filename in decoded_filename
+    client.login(username='otheruser', password='password123')
+    data = {'template': "протокол_проверки_по_ОТ", 'combined': True}
+    assert client.get(url).status_code == 404
+    assert client.post(url, data).status_code == 404
+    response = client.get(reverse(
+        'documents:document_download', args=[setup_examination.id]
+    ), data)
+    assert response.status_code == 404
+    render_mock.assert_not_called()
@@ -1,11 +1,28 @@
 from django.urls import path
 
-from .views import document_generate_view
+from .views import (document_batch_view, document_download_view,
+                    document_generate_view, document_job_download_view,
+                    document_job_status_view, document_job_view)
 
 app_name = 'documents'
 
 urlpatterns = [
     path('generate/<int:examination_id>/',
          document_generate_view,
-         name='document_generate')
+         name='document_generate'),
+    path('download/<int:examination_id>/',
+         document_download_view,
+         name='document_download'),
+    path('batch/',
+         document_batch_view,
+         name='document_batch'),
+    path('jobs/<int:job_id>/',
+         document_job_view,
+         name='document_job'),
+    path('jobs/<int:job_id>/status/',
+         document_job_status_view,
+         name='document_job_status'),
+    path('jobs/<int:job_id>/download/',
+         document_job_download_view,
+         name='document_job_download'),
 ]
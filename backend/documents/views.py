@@ -1,81 +1,336 @@
 """
 Модуль представлений для управления генерации документов.
 """
-import os
+from functools import partial
 
 from django.conf import settings
-from django.core.cache import cache
-from django.http import HttpResponse
-from django.shortcuts import render
-from facility.models import Examination
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from facility.filters import get_visible_examinations
 
-from .document_generation import generate_document
-from .forms import DocumentGenerationForm
+from .batch import (BatchTooLarge, get_batch_examinations, load_examinations,
+                    stream_documents)
+from .document_cache import get_document, get_document_key
+from .document_generation import (get_context, get_context_keys,
+                                  get_session_examinations,
+                                  get_session_protocol_key, get_template_path,
+                                  render_document, render_session_protocol,
+                                  with_relations)
+from .forms import DocumentBatchForm, DocumentGenerationForm
+from .jobs import enqueue_job
+from .models import DocumentJob
+from .pdf import PdfError, convert_to_pdf
 
+# Период обновления страницы незавершённого задания, в секундах
+JOB_REFRESH_INTERVAL = 2
 
+
+# Типы содержимого загружаемых файлов по расширению
+CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-'
+            'officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+    'zip': 'application/zip',
+}
+
+
+def document_response(content, filename):
+    """Возвращает ответ с файлом документа для загрузки."""
+    response = HttpResponse(
+        content, content_type=CONTENT_TYPES[filename.rsplit('.', 1)[-1]]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def load_examination(queryset, examination_id, form):
+    """
+    Загружает проверку одним запросом: со связанными записями, которые
+    используются в выбранном в форме шаблоне, или только с аттестуемым,
+    если нужно отобразить форму.
+    """
+    if form.is_valid():
+        queryset = with_relations(queryset, get_context_keys(
+            get_template_path(form.cleaned_data['template'])
+        ))
+    else:
+        queryset = queryset.select_related('examined')
+    return get_object_or_404(queryset, pk=examination_id)
+
+
+def get_document_source(template, examination, combined=False,
+                        file_format='docx', queryset=None):
+    """
+    Возвращает ключ документа в кэше, функцию его заполнения и имя файла.
+
+    Общий протокол заседания комиссии формируется для всех проверок
+    организации из queryset с теми же номером и датой протокола, что и у
+    выбранной проверки (см. get_session_examinations). Связанные записи
+    проверки, которые используются в шаблоне, должны быть загружены
+    заранее (см. load_examination). Документ PDF преобразуется из
+    документа .docx, который также сохраняется в кэше документов.
+    """
+    key, render, filename = get_docx_source(
+        template, examination, combined, queryset
+    )
+    if file_format != 'pdf':
+        return key, render, filename
+    return (
+        f'{key}_pdf',
+        lambda: convert_to_pdf(get_document(key, render)),
+        f'{filename[:-len(".docx")]}.pdf'
+    )
+
+
+def get_docx_source(template, examination, combined, queryset=None):
+    """
+    Возвращает ключ, функцию заполнения и имя файла документа .docx.
+    """
+    template_path = get_template_path(template)
+    keys = get_context_keys(template_path)
+    if combined:
+        examinations = list(
+            get_session_examinations(examination, keys, queryset)
+        )
+        key = get_session_protocol_key(template_path, examinations, keys)
+        render = partial(render_session_protocol, template_path, examinations)
+        filename = f'{template}_{examination.protocol_number}.docx'
+        return key, render, filename.replace('/', '-')
+    context = get_context(examination, keys)
+    key = get_document_key(template_path, [context])
+    render = partial(render_document, template_path, context)
+    return key, render, f'{template}_{examination.pk}.docx'
+
+
+@login_required
 def document_generate_view(request, examination_id):
     """
     Обрабатывает запрос на генерацию документа для выбранной записи проверки.
 
-    Получает информацию о проверке из модели Examination по идентификатору.
+    Загружает проверку одним запросом вместе со связанными записями,
+    которые используются в выбранном шаблоне (см. load_examination), и
+    использует её и для отображения формы, и для заполнения документа.
     Затем обрабатывает POST-запрос с формой выбора шаблона,
-    генерирует документ в формате .docx и отправляет его пользователю для
-    загрузки.
+    генерирует документ в формате .docx (или берёт его из кэша документов)
+    и отправляет его пользователю для загрузки. При выборе общего
+    протокола в документ включаются все проверки заседания комиссии
+    (см. get_document_source). Проверка и проверки общего протокола
+    выбираются только из доступных пользователю (см.
+    get_visible_examinations). Для повторных загрузок с проверкой ETag
+    форма отправляется GET-запросом в document_download_view.
 
     Параметры:
     - request: HttpRequest объект, содержащий данные запроса.
     - examination_id: int, идентификатор проверки в базе данных.
 
     Возвращает:
-    - HttpResponse с прикрепленным документом в формате .docx для загрузки.
+    - HttpResponse с прикрепленным документом в формате .docx или .pdf для
+        загрузки или форму с ошибкой, если преобразование в PDF сейчас
+        недоступно (ответ 503).
     """
-    cache_key_examination = f'examination_{examination_id}'
-    examination = cache.get(cache_key_examination)
-    if not examination:
-        examination = Examination.objects.get(id=examination_id)
-        cache.set(cache_key_examination,
-                  examination,
-                  timeout=settings.CACHE_TTL)
-
+    status = 200
+    visible = get_visible_examinations(request.user)
     if request.method == 'POST':
         form = DocumentGenerationForm(request.POST)
+        examination = load_examination(visible, examination_id, form)
         if form.is_valid():
-            template = form.cleaned_data['template']
-            output_name = f"{template}_{examination_id}.docx"
-            output_path = os.path.join(
-                settings.BASE_DIR, 'generated_documents', output_name
+            key, render_content, filename = get_document_source(
+                form.cleaned_data['template'], examination,
+                form.cleaned_data['combined'],
+                form.cleaned_data['file_format'], visible
             )
-
-            cache_key_document = f'document_{output_name}'
-            cached_document = cache.get(cache_key_document)
-            if not cached_document:
-                template_path = os.path.join(
-                    settings.BASE_DIR, 'documents', 'templates',
-                    f"{template}.docx"
+            try:
+                return document_response(
+                    get_document(key, render_content), filename
                 )
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                generate_document(examination_id, template_path, output_path)
-
-                with open(output_path, 'rb') as file:
-                    document_content = file.read()
-                    cache.set(cache_key_document,
-                              document_content,
-                              timeout=settings.CACHE_TTL)
-            else:
-                document_content = cached_document
-
-            response = HttpResponse(
-                document_content,
-                content_type='application/vnd.openxmlformats-'
-                             'officedocument.wordprocessingml.document'
-            )
-            response['Content-Disposition'] = (f'attachment; filename="'
-                                               f'{output_name}"')
-            return response
+            except PdfError as error:
+                form.add_error(None, str(error))
+                status = 503
 
     else:
         form = DocumentGenerationForm()
+        examination = load_examination(visible, examination_id, form)
     return render(
         request, 'documents/document_generate_form.html',
-        {'form': form, 'examination': examination}
+        {'form': form, 'examination': examination}, status=status
+    )
+
+
+@login_required
+def document_download_view(request, examination_id):
+    """
+    Отправляет документ проверки по GET-запросу с поддержкой условных
+    запросов.
+
+    Шаблон и признак общего протокола передаются параметрами 'template' и
+    'combined' строки запроса. Ключ документа в кэше, вычисленный по
+    шаблону и данным проверки, передаётся в заголовке ETag. Если он
+    совпадает с заголовком If-None-Match, документ не формируется и не
+    читается из кэша, а возвращается ответ 304.
+
+    Параметры:
+    - request: HttpRequest объект, содержащий данные запроса.
+    - examination_id: int, идентификатор проверки в базе данных.
+
+    Возвращает:
+    - HttpResponse с документом .docx, ответ 304 или форму выбора
+        шаблона с ошибками.
+    """
+    form = DocumentGenerationForm(request.GET)
+    visible = get_visible_examinations(request.user)
+    examination = load_examination(visible, examination_id, form)
+    if not form.is_valid():
+        return render(
+            request, 'documents/document_generate_form.html',
+            {'form': form, 'examination': examination}, status=400
+        )
+    key, render_content, filename = get_document_source(
+        form.cleaned_data['template'], examination,
+        form.cleaned_data['combined'], form.cleaned_data['file_format'],
+        visible
+    )
+    etag = quote_etag(key)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            content = get_document(key, render_content)
+        except PdfError as error:
+            form.add_error(None, str(error))
+            return render(
+                request, 'documents/document_generate_form.html',
+                {'form': form, 'examination': examination}, status=503
+            )
+        response = document_response(content, filename)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def document_batch_view(request):
+    """
+    Обрабатывает запрос на пакетную генерацию документов.
+
+    Проверки отбираются по параметрам строки запроса: по списку
+    идентификаторов 'ids' или по тем же фильтрам, что и на главной
+    странице. После выбора шаблона документы всех отобранных проверок
+    заполняются в пуле процессов и отправляются пользователю одним
+    ZIP-архивом, который формируется по мере готовности документов.
+    При выборе общего протокола отправляется один документ с протоколами
+    всех заседаний комиссии, к которым относятся отобранные проверки.
+    При выборе фоновой генерации создаётся задание DocumentJob и
+    пользователь перенаправляется на страницу его состояния.
+
+    Параметры:
+    - request: HttpRequest объект, содержащий данные запроса.
+
+    Возвращает:
+    - StreamingHttpResponse с ZIP-архивом документов, перенаправление на
+        страницу задания или HttpResponse с формой выбора шаблона.
+    """
+    examinations = get_batch_examinations(request.user, request.GET)
+    if request.method == 'POST':
+        form = DocumentBatchForm(request.POST)
+        if form.is_valid():
+            template = form.cleaned_data['template']
+            try:
+                loaded = load_examinations(examinations)
+            except BatchTooLarge as error:
+                form.add_error(None, str(error))
+            else:
+                if form.cleaned_data.get('background'):
+                    job = enqueue_job(
+                        request.user, template,
+                        [examination.pk for examination in loaded],
+                        form.cleaned_data['combined']
+                    )
+                    return redirect('documents:document_job', job_id=job.pk)
+                if form.cleaned_data['combined']:
+                    return document_response(
+                        render_session_protocol(
+                            get_template_path(template), loaded
+                        ),
+                        f'{template}.docx'
+                    )
+                response = StreamingHttpResponse(
+                    stream_documents(template, loaded),
+                    content_type='application/zip'
+                )
+                response['Content-Disposition'] = (f'attachment; filename="'
+                                                   f'{template}.zip"')
+                return response
+    else:
+        form = DocumentBatchForm()
+    return render(
+        request, 'documents/document_batch_form.html',
+        {
+            'form': form,
+            'count': examinations.count(),
+            'limit': settings.DOCUMENT_BATCH_LIMIT,
+        }
+    )
+
+
+def get_user_job(request, job_id):
+    """Возвращает задание пользователя без содержимого документа."""
+    return get_object_or_404(
+        DocumentJob.objects.defer('content'), pk=job_id, user=request.user
+    )
+
+
+def get_job_status(job):
+    """Возвращает состояние задания для опроса клиентом."""
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'error': job.error,
+        'queue_time': (
+            job.queue_time.total_seconds() if job.queue_time else None
+        ),
+        'render_time': (
+            job.render_time.total_seconds() if job.render_time else None
+        ),
+        'size': job.size,
+        'download_url': (
+            reverse('documents:document_job_download', args=[job.pk])
+            if job.status == DocumentJob.DONE else None
+        ),
+    }
+
+
+@login_required
+def document_job_view(request, job_id):
+    """
+    Отображает страницу состояния фонового задания генерации документов.
+    Пока задание не завершено, страница обновляется автоматически.
+    """
+    job = get_user_job(request, job_id)
+    response = render(
+        request, 'documents/document_job.html',
+        {'job': job, 'status': get_job_status(job)}
+    )
+    if not job.is_finished:
+        response['Refresh'] = JOB_REFRESH_INTERVAL
+    return response
+
+
+@login_required
+def document_job_status_view(request, job_id):
+    """Возвращает состояние фонового задания в формате JSON."""
+    return JsonResponse(get_job_status(get_user_job(request, job_id)))
+
+
+@login_required
+def document_job_download_view(request, job_id):
+    """
+    Отправляет документ выполненного фонового задания. Для
+    незавершённого задания возвращает ответ 404.
+    """
+    job = get_object_or_404(
+        DocumentJob, pk=job_id, user=request.user, status=DocumentJob.DONE
     )
+    return document_response(job.content, job.filename)
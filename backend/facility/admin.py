@@ -1,18 +1,43 @@
 """
-Модуль администрирования для управления моделями Commission, Examined,
-Briefing, Course и Examination в интерфейсе Django Admin.
+Модуль администрирования для управления моделями Commission, Employee,
+Examined, Briefing, Course, Examination и ExaminationNotification в
+интерфейсе Django Admin.
 
 Классы:
+    EmployeeAdmin — Настройка отображения и поиска данных модели Employee
+        в Django Admin.
     ExaminedAdmin — Настройка отображения и фильтрации данных модели Examined
         в Django Admin.
     CourseAdmin — Настройка отображения и фильтрации данных модели Course
         в Django Admin.
     ExaminationAdmin — Настройка отображения и фильтрации данных модели
         Examination в Django Admin.
+    ExaminationNotificationAdmin — Просмотр отправленных уведомлений о
+        сроках проверок в Django Admin.
 """
 from django.contrib import admin
 
-from .models import Briefing, Commission, Course, Examination, Examined
+from .caching import bump_generation_on_commit
+from .latest import refresh_latest_examinations
+from .models import (Briefing, Commission, Course, Employee, Examination,
+                     ExaminationNotification, Examined)
+
+
+class EmployeeAdmin(admin.ModelAdmin):
+    """
+    Класс для настройки отображения и поиска данных модели Employee
+    в Django Admin.
+
+    Атрибуты:
+        list_display (tuple): Определяет поля модели Employee, отображаемые
+            в списке записей.
+        list_filter (tuple): Определяет поля для фильтрации списка записей
+            по организации сотрудника.
+        search_fields (tuple): Поиск сотрудника по началу ФИО.
+    """
+    list_display = ('full_name', 'organization')
+    list_filter = ('organization',)
+    search_fields = ('^name_key',)
 
 
 class ExaminedAdmin(admin.ModelAdmin):
@@ -33,6 +58,30 @@ class ExaminedAdmin(admin.ModelAdmin):
     )
     list_filter = ('brigade', 'company_name', 'safety_group')
 
+    def save_model(self, request, obj, form, change):
+        """
+        Сохраняет аттестуемого и при смене компании или сотрудника
+        переносит его проверки в новую организацию или к новому сотруднику.
+        """
+        super().save_model(request, obj, form, change)
+        if change and 'employee' in form.changed_data:
+            Examination.objects.filter(examined=obj).update(
+                employee=obj.employee
+            )
+        if change and 'company_name' in form.changed_data:
+            Examination.objects.filter(examined=obj).update(
+                organization=obj.company_name
+            )
+            bump_generation_on_commit(
+                obj.company_name_id, form.initial.get('company_name')
+            )
+        # Массовое обновление не вызывает сигналы проверок, поэтому
+        # текущие проверки сотрудников пересчитываются явно
+        if change and {'employee', 'company_name'} & set(form.changed_data):
+            refresh_latest_examinations(
+                {obj.employee_id, form.initial.get('employee')}
+            )
+
 
 class CourseAdmin(admin.ModelAdmin):
     """
@@ -59,6 +108,8 @@ class ExaminationAdmin(admin.ModelAdmin):
             отображаемые в списке записей.
         list_filter (tuple): Определяет поля для фильтрации в Django Admin
             списка записей по текущей дате и дате следующей проверки.
+        readonly_fields (tuple): Организация и сотрудник проверки
+            заполняются из данных аттестуемого и не редактируются вручную.
     """
     list_display = (
         'created_at', 'current_check_date', 'next_check_date',
@@ -66,10 +117,41 @@ class ExaminationAdmin(admin.ModelAdmin):
         'certificate_number', 'course'
     )
     list_filter = ('current_check_date', 'next_check_date')
+    readonly_fields = ('organization', 'employee')
+
+    def save_model(self, request, obj, form, change):
+        """
+        Сохраняет проверку, устанавливая организацию и сотрудника из данных
+        аттестуемого. Текущие проверки прежнего и нового сотрудника
+        пересчитывает обработчик сохранения проверки (см. модуль signals).
+        """
+        obj.organization_id = obj.examined.company_name_id
+        obj.employee_id = obj.examined.employee_id
+        super().save_model(request, obj, form, change)
+
+
+class ExaminationNotificationAdmin(admin.ModelAdmin):
+    """
+    Класс для просмотра отправленных уведомлений о сроках проверок
+    в Django Admin.
+
+    Атрибуты:
+        list_display (tuple): Определяет поля модели
+            ExaminationNotification, отображаемые в списке записей.
+        list_filter (tuple): Определяет поля для фильтрации списка записей
+            по дате отправки и дате следующей проверки.
+        list_select_related (tuple): Связанные записи списка загружаются
+            одним запросом.
+    """
+    list_display = ('examination', 'next_check_date', 'recipient', 'sent_at')
+    list_filter = ('sent_at', 'next_check_date')
+    list_select_related = ('examination', 'recipient')
 
 
 admin.site.register(Commission)
+admin.site.register(Employee, EmployeeAdmin)
 admin.site.register(Examined, ExaminedAdmin)
 admin.site.register(Briefing)
 admin.site.register(Course, CourseAdmin)
 admin.site.register(Examination, ExaminationAdmin)
+admin.site.register(ExaminationNotification, ExaminationNotificationAdmin)
@@ -0,0 +1,146 @@
+"""
+Модуль кэширования списка проверок и сводки сроков проверок.
+
+Страницы списка хранятся в кэше уже вычисленными: общее количество записей,
+номер страницы и список объектов страницы со связанными записями. Ключ
+страницы содержит область видимости (организация пользователя или все
+записи для суперпользователя) и текущее поколение этой области. При
+изменении проверок, аттестуемых или комиссий поколение увеличивается
+после фиксации транзакции, поэтому устаревшие страницы больше не
+запрашиваются и вытесняются из кэша по истечении CACHE_TTL. Сводка сроков
+(см. модуль dashboard) использует те же поколения, а ключ сводки содержит
+ещё и текущую дату; так же кэшируется статистика организации (см. модуль
+statistics), ключ которой содержит текущий месяц. Поколения, увеличенные
+во время недоступности Redis только в локальном кэше, сбрасываются после
+восстановления соединения (см. RECOVERY_DELETE_PATTERNS в core.cache).
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+ALL_SCOPE = 'all'
+NO_ORGANIZATION_SCOPE = 'none'
+GENERATION_KEY = 'examinations_generation:{scope}'
+PAGE_KEY = 'examinations_page:{scope}:{generation}:{params}'
+DASHBOARD_KEY = 'examinations_dashboard:{scope}:{generation}:{date}'
+STATISTICS_KEY = 'examinations_statistics:{scope}:{generation}:{month}'
+
+
+def new_generation():
+    """
+    Возвращает начальное значение поколения. Используется текущее время,
+    чтобы после вытеснения счётчика из кэша новое поколение не совпало
+    с одним из прежних.
+    """
+    return time.time_ns()
+
+
+def organization_scope(organization_id):
+    """Возвращает область видимости для указанной организации."""
+    if organization_id is None:
+        return NO_ORGANIZATION_SCOPE
+    return str(organization_id)
+
+
+def get_scope(user):
+    """
+    Возвращает область видимости списка проверок для пользователя или None,
+    если список для пользователя не кэшируется.
+    """
+    if not user.is_authenticated:
+        return None
+    if user.is_superuser:
+        return ALL_SCOPE
+    return organization_scope(user.organization_id)
+
+
+def get_generation(scope):
+    """Возвращает текущее поколение области видимости."""
+    return cache.get_or_set(
+        GENERATION_KEY.format(scope=scope), new_generation, timeout=None
+    )
+
+
+def bump_generation(*organization_ids):
+    """
+    Увеличивает поколение областей указанных организаций и общей области
+    суперпользователя, делая их закэшированные страницы недействительными.
+    """
+    scopes = {organization_scope(pk) for pk in organization_ids}
+    scopes.add(ALL_SCOPE)
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope=scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), timeout=None)
+
+
+def bump_generation_on_commit(*organization_ids):
+    """
+    Увеличивает поколения областей указанных организаций после фиксации
+    текущей транзакции (вне транзакции — сразу). До фиксации параллельные
+    запросы ещё читают прежние данные и не должны кэшировать их под новым
+    поколением.
+    """
+    transaction.on_commit(lambda: bump_generation(*organization_ids))
+
+
+def get_page_key(user, params):
+    """
+    Возвращает ключ кэша страницы списка проверок для пользователя и
+    параметров запроса или None, если страница не кэшируется.
+    """
+    scope = get_scope(user)
+    if scope is None:
+        return None
+    query = '&'.join(
+        f'{key}={value}' for key, value in sorted(params.items())
+    )
+    return PAGE_KEY.format(
+        scope=scope,
+        generation=get_generation(scope),
+        params=hashlib.md5(query.encode()).hexdigest()
+    )
+
+
+def get_report_scope(user, organization_id):
+    """
+    Возвращает область видимости отчёта по проверкам или None, если отчёт
+    для пользователя не кэшируется. Отчёт суперпользователя по одной
+    организации совпадает с отчётом пользователей этой организации и
+    хранится в её области.
+    """
+    scope = get_scope(user)
+    if scope == ALL_SCOPE and organization_id is not None:
+        scope = organization_scope(organization_id)
+    return scope
+
+
+def get_dashboard_key(user, organization_id, today):
+    """
+    Возвращает ключ кэша сводки сроков проверок на дату today или None,
+    если сводка не кэшируется.
+    """
+    scope = get_report_scope(user, organization_id)
+    if scope is None:
+        return None
+    return DASHBOARD_KEY.format(
+        scope=scope, generation=get_generation(scope), date=today.isoformat()
+    )
+
+
+def get_statistics_key(user, organization_id, today):
+    """
+    Возвращает ключ кэша статистики проверок за месяц даты today или None,
+    если статистика не кэшируется.
+    """
+    scope = get_report_scope(user, organization_id)
+    if scope is None:
+        return None
+    return STATISTICS_KEY.format(
+        scope=scope, generation=get_generation(scope),
+        month=today.strftime('%Y-%m')
+    )
@@ -0,0 +1,151 @@
+"""
+Модуль сводки сроков проверок.
+
+Сводка отвечает на вопрос, у кого из сотрудников срок следующей проверки
+уже прошёл или наступает в ближайшие 30, 60 и 90 дней, с количеством
+таких сотрудников по программам обучения и цехам (участкам). Учитывается
+только текущая проверка сотрудника по каждой программе обучения (см.
+модуль latest): сроки прежних проверок уже продлены.
+
+Текущие проверки выбираются из таблицы LatestExamination по диапазону
+даты следующей проверки с индексом latest_org_next_idx (организация и
+дата следующей проверки), поэтому объём чтения зависит от числа
+сотрудников, а не от истории проверок. Вычисленная сводка хранится в
+кэше под ключом с поколением организации и текущей датой (см. модуль
+caching), поэтому она пересчитывается после изменения проверок
+организации и при смене дня, а в остальное время отдаётся из кэша.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .caching import get_dashboard_key
+from .filters import get_visible_latest_examinations
+
+# Срок следующей проверки прошёл
+OVERDUE = 0
+# Периоды, дней, на которые делится ближайший срок следующей проверки
+DUE_PERIODS = (30, 60, 90)
+STATUSES = (OVERDUE, *DUE_PERIODS)
+STATUS_TITLES = {
+    OVERDUE: "Просрочено",
+    **{
+        days: f"{start + 1}–{days} дней" if start else f"До {days} дней"
+        for start, days in zip((0, *DUE_PERIODS), DUE_PERIODS)
+    },
+}
+
+# Поля проверок в списке сводки и их имена из связанных моделей
+LIST_FIELDS = ('examination', 'employee', 'next_check_date', 'due')
+LIST_RELATED_FIELDS = {
+    'protocol_number': F('examination__protocol_number'),
+    'organization_name': F('organization__name'),
+    'full_name': F('examination__examined__full_name'),
+    'position': F('examination__examined__position'),
+    'brigade': F('examination__examined__brigade'),
+    'course_number': F('course__course_number'),
+    'course_name': F('course__course_name'),
+}
+
+
+def get_due_examinations(queryset, today):
+    """
+    Возвращает из набора текущих проверок LatestExamination проверки, срок
+    следующей проверки которых прошёл или наступает в пределах последнего
+    периода DUE_PERIODS, с номером периода в поле 'due' (OVERDUE для
+    просроченных).
+    """
+    due = Case(
+        When(next_check_date__lt=today, then=Value(OVERDUE)),
+        *(
+            When(
+                next_check_date__lte=today + timedelta(days=days),
+                then=Value(days)
+            )
+            for days in DUE_PERIODS
+        ),
+        output_field=IntegerField()
+    )
+    return queryset.filter(
+        next_check_date__lte=today + timedelta(days=DUE_PERIODS[-1])
+    ).annotate(due=due)
+
+
+def group_counts(rows, name):
+    """
+    Собирает количество проверок по периодам для каждой группы. Возвращает
+    список групп по алфавиту: название, количество по STATUSES и итог.
+    """
+    groups = {}
+    for row in rows:
+        counts = groups.setdefault(name(row), dict.fromkeys(STATUSES, 0))
+        counts[row['due']] += row['count']
+    return [
+        {
+            'name': group,
+            'counts': list(counts.values()),
+            'total': sum(counts.values()),
+        }
+        for group, counts in sorted(groups.items())
+    ]
+
+
+def build_dashboard(queryset, today, limit=None):
+    """
+    Вычисляет сводку сроков текущих проверок набора queryset
+    (LatestExamination) на дату today: одним запросом количество проверок
+    по периодам, программам обучения и цехам, вторым — первые limit
+    проверок по сроку следующей проверки.
+    """
+    examinations = get_due_examinations(queryset, today)
+    rows = list(examinations.values(
+        'course__course_number', 'course__course_name',
+        'examination__examined__brigade', 'due'
+    ).annotate(count=Count('pk')).order_by())
+    totals = dict.fromkeys(STATUSES, 0)
+    for row in rows:
+        totals[row['due']] += row['count']
+    if limit is None:
+        limit = settings.DASHBOARD_LIST_SIZE
+    return {
+        'today': today,
+        'statuses': [STATUS_TITLES[status] for status in STATUSES],
+        'totals': list(totals.values()),
+        'total': sum(totals.values()),
+        'courses': group_counts(rows, lambda row: (
+            f"{row['course__course_number']} "
+            f"{row['course__course_name']}"
+        )),
+        'brigades': group_counts(
+            rows, lambda row: row['examination__examined__brigade']
+        ),
+        'examinations': list(examinations.order_by(
+            'next_check_date', 'examination'
+        ).values(*LIST_FIELDS, **LIST_RELATED_FIELDS)[:limit]),
+    }
+
+
+def get_dashboard(user, organization_id=None):
+    """
+    Возвращает сводку сроков проверок, доступных пользователю, из кэша или
+    вычисляет её. Суперпользователь может ограничить сводку одной
+    организацией.
+    """
+    today = timezone.localdate()
+    queryset = get_visible_latest_examinations(user)
+    if user.is_superuser and organization_id is not None:
+        queryset = queryset.filter(organization=organization_id)
+    else:
+        organization_id = None
+    cache_key = get_dashboard_key(user, organization_id, today)
+    dashboard = cache.get(cache_key) if cache_key else None
+    if dashboard is None:
+        dashboard = build_dashboard(queryset, today)
+        if cache_key:
+            cache.set(
+                cache_key, dashboard, timeout=settings.DASHBOARD_CACHE_TTL
+            )
+    return dashboard
@@ -0,0 +1,284 @@
+"""
+Модуль потоковой выгрузки списка проверок в форматы CSV и XLSX.
+
+Записи читаются из базы порциями через values_list().iterator(), а файл
+формируется и отдаётся клиенту по мере чтения, поэтому расход памяти не
+зависит от количества выгружаемых записей. Файл XLSX собирается
+непосредственно из XML-частей книги в ZIP-архив, который пишется в
+поток без перемотки.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+# Столбцы выгрузки в порядке таблицы главной страницы: заголовок и поле
+COLUMNS = (
+    ('Номер протокола', 'protocol_number'),
+    ('Дата записи', 'created_at'),
+    ('Дата текущей проверки', 'current_check_date'),
+    ('Дата следующей проверки', 'next_check_date'),
+    ('ФИО аттестуемого', 'examined__full_name'),
+    ('Должность аттестуемого', 'examined__position'),
+    ('Цех, участок аттестуемого', 'examined__brigade'),
+    ('ФИО председателя комиссии', 'commission__chairman_name'),
+    ('Должность председателя комиссии', 'commission__chairman_position'),
+    ('ФИО первого члена комиссии', 'commission__member1_name'),
+    ('Должность первого члена комиссии', 'commission__member1_position'),
+    ('ФИО второго члена комиссии', 'commission__member2_name'),
+    ('Должность второго члена комиссии', 'commission__member2_position'),
+    ('ФИО ответственного за электро-безопасность',
+     'commission__safety_officer_name'),
+    ('Должность ответственного за электро-безопасность',
+     'commission__safety_officer_position'),
+    ('Причина проверки знаний', 'reason'),
+    ('Дата предыдущей проверки', 'previous_check_date'),
+    ('Предыдущая группа по ЭБ', 'examined__previous_safety_group'),
+    ('Вид проводимого инструктажа', 'briefing__name'),
+    ('№ программы обучения', 'course__course_number'),
+    ('Наименование программы обучения', 'course__course_name'),
+    ('Группа по ЭБ', 'examined__safety_group'),
+    ('Стаж работы', 'examined__work_experience'),
+    ('Номер удостоверения', 'certificate_number'),
+)
+# Столбец организации, который выгружается только суперпользователю
+COMPANY_COLUMN = ('Компания', 'examined__company_name__name')
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': ('application/vnd.openxmlformats-officedocument.'
+             'spreadsheetml.sheet'),
+}
+
+
+def get_columns(user):
+    """Возвращает столбцы выгрузки для пользователя."""
+    if user.is_superuser:
+        return (COLUMNS[0], COMPANY_COLUMN) + COLUMNS[1:]
+    return COLUMNS
+
+
+def iter_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Читает значения столбцов из базы порциями по chunk_size записей."""
+    return queryset.values_list(
+        *(field for _, field in columns)
+    ).iterator(chunk_size=chunk_size)
+
+
+def format_value(value):
+    """Приводит значение к строке в формате таблицы главной страницы."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%d.%m.%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d.%m.%Y')
+    return value
+
+
+class Echo:
+    """Объект, возвращающий записанную строку вместо её сохранения."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows, chunk_size=CHUNK_SIZE):
+    """
+    Формирует CSV-файл по частям. Файл начинается с метки BOM, чтобы
+    Excel распознал кодировку UTF-8.
+    """
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow([title for title, _ in columns])
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([format_value(value) for value in row]))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+class StreamBuffer:
+    """
+    Файлоподобный объект без перемотки, накапливающий записанные
+    ZIP-архивом данные до их передачи клиенту.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+# Символы, недопустимые в XML 1.0
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType='
+    '"application/vnd.openxmlformats-officedocument.spreadsheetml.'
+    'worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+    '2006/main" xmlns:r="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships">'
+    '<sheets><sheet name="Проверки" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Стили ячеек: 0 — обычная, 1 — дата, 2 — дата и время, 3 — заголовок
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+    '2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="dd.mm.yyyy"/>'
+    '<numFmt numFmtId="165" formatCode="dd.mm.yyyy hh:mm"/>'
+    '</numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/>'
+    '</border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" '
+    'borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" '
+    'applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" '
+    'applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" '
+    'applyFont="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index):
+    """Возвращает буквенное обозначение столбца по его номеру от нуля."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def xlsx_cell(reference, value, style=0):
+    """Возвращает XML ячейки листа."""
+    if value is None or value == '':
+        return ''
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).replace(tzinfo=None)
+        serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{reference}" s="2"><v>{serial:.6f}</v></c>'
+    if isinstance(value, date):
+        serial = (value - EXCEL_EPOCH.date()).days
+        return f'<c r="{reference}" s="1"><v>{serial}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+    return (f'<c r="{reference}" t="inlineStr" s="{style}"><is>'
+            f'<t xml:space="preserve">{text}</t></is></c>')
+
+
+def xlsx_row(number, letters, values, style=0):
+    """Возвращает XML строки листа."""
+    cells = ''.join(
+        xlsx_cell(f'{letter}{number}', value, style)
+        for letter, value in zip(letters, values)
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+def stream_xlsx(columns, rows, chunk_size=CHUNK_SIZE):
+    """
+    Формирует XLSX-файл по частям. Строки листа сжимаются и отдаются
+    порциями по chunk_size записей; в памяти хранится только текущая
+    порция.
+    """
+    buffer = StreamBuffer()
+    letters = [column_letter(index) for index in range(len(columns))]
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', XLSX_STYLES)
+        # Размер листа заранее неизвестен: без force_zip64 запись
+        # прерывается ошибкой, когда лист превышает 2 ГиБ
+        with archive.open(
+            'xl/worksheets/sheet1.xml', 'w', force_zip64=True
+        ) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/'
+                'spreadsheetml/2006/main"><sheetData>'
+                + xlsx_row(1, letters, [title for title, _ in columns], 3)
+            ).encode())
+            lines = []
+            for number, row in enumerate(rows, start=2):
+                lines.append(xlsx_row(number, letters, row))
+                if len(lines) >= chunk_size:
+                    sheet.write(''.join(lines).encode())
+                    lines = []
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            sheet.write((''.join(lines) + '</sheetData></worksheet>').encode())
+    yield buffer.pop()
+
+
+STREAMS = {
+    'csv': stream_csv,
+    'xlsx': stream_xlsx,
+}
@@ -0,0 +1,118 @@
+"""
+Модуль фильтрации и сортировки списка проверок по параметрам запроса.
+
+Используется всеми представлениями, которые работают с тем же набором
+записей, что и главная страница, чтобы фильтры и сортировка совпадали.
+"""
+from .models import Employee, Examination, LatestExamination, normalize_text
+from .search import search_examinations
+
+# Соответствие параметров запроса условиям фильтрации
+FILTER_PARAMS = {
+    'current_check_date': 'current_check_date',
+    'next_check_date': 'next_check_date',
+    'course_number': 'course__course_number__icontains',
+    'course_name': 'course__course_name__icontains',
+    'brigade': 'examined__brigade__icontains',
+}
+
+# Поля, по которым разрешена сортировка списка
+ORDERING_FIELDS = (
+    'created_at',
+    'protocol_number',
+    'current_check_date',
+    'next_check_date',
+    'examined__brigade',
+    'course__course_number',
+    'course__course_name',
+)
+
+DEFAULT_ORDERING = '-created_at'
+
+
+def get_ordering(params):
+    """
+    Возвращает сортировку из параметра 'order_by', если она разрешена,
+    иначе сортировку по умолчанию.
+    """
+    ordering = params.get('order_by') or DEFAULT_ORDERING
+    if ordering.lstrip('-') not in ORDERING_FIELDS:
+        return DEFAULT_ORDERING
+    return ordering
+
+
+def get_visible_examinations(user):
+    """
+    Возвращает проверки, доступные пользователю: все записи для
+    суперпользователя и записи своей организации для остальных.
+    """
+    if not user.is_authenticated:
+        return Examination.objects.none()
+    queryset = Examination.objects.all()
+    if not user.is_superuser:
+        queryset = queryset.filter(organization=user.organization_id)
+    return queryset
+
+
+def get_visible_latest_examinations(user):
+    """
+    Возвращает текущие проверки сотрудников (LatestExamination), доступные
+    пользователю: все для суперпользователя и своей организации для
+    остальных.
+    """
+    if not user.is_authenticated:
+        return LatestExamination.objects.none()
+    queryset = LatestExamination.objects.all()
+    if not user.is_superuser:
+        queryset = queryset.filter(organization=user.organization_id)
+    return queryset
+
+
+def get_visible_employees(user):
+    """
+    Возвращает сотрудников, доступных пользователю: всех для
+    суперпользователя и сотрудников своей организации для остальных.
+    """
+    if not user.is_authenticated:
+        return Employee.objects.none()
+    queryset = Employee.objects.all()
+    if not user.is_superuser:
+        queryset = queryset.filter(organization=user.organization_id)
+    return queryset
+
+
+def search_employees(user, term):
+    """
+    Возвращает доступных пользователю сотрудников, ФИО которых начинается
+    с введённого текста (без учёта пробелов и регистра). В пределах
+    организации поиск использует индекс employee_org_name_idx.
+    """
+    return get_visible_employees(user).filter(
+        name_key__startswith=normalize_text(term)
+    ).order_by('name_key')
+
+
+def filter_examinations(queryset, params):
+    """
+    Применяет к списку проверок фильтры из параметров запроса. Параметр
+    'current' оставляет только текущие проверки сотрудников по каждой
+    программе обучения (см. модуль latest), а 'q' — проверки, найденные
+    полнотекстовым поиском (см. модуль search).
+    """
+    filters = {
+        lookup: params.get(param)
+        for param, lookup in FILTER_PARAMS.items()
+        if params.get(param)
+    }
+    if params.get('current'):
+        filters['latest__isnull'] = False
+    return search_examinations(queryset.filter(**filters), params.get('q'))
+
+
+def get_filtered_examinations(user, params):
+    """
+    Возвращает доступные пользователю проверки, отфильтрованные и
+    отсортированные по параметрам запроса.
+    """
+    queryset = filter_examinations(get_visible_examinations(user), params)
+    return queryset.order_by(get_ordering(params))
@@ -3,16 +3,44 @@
 """
 
 from django import forms
+from django.core.validators import FileExtensionValidator
+from django.db import transaction
 from users.models import Organization, User
 
-from .models import Commission, Examination, Examined
+from .filters import get_visible_employees
+from .models import Commission, Employee, Examination, Examined
+
+
+def check_previous_check(cleaned_data):
+    """
+    Проверяет, что дата предыдущей проверки и предыдущая группа
+    электробезопасности указаны вместе. Возвращает ошибки по полям.
+    Правило общее для форм и импорта проверок из файла.
+    """
+    previous_check_date = cleaned_data.get('previous_check_date')
+    previous_safety_group = cleaned_data.get('previous_safety_group')
+    errors = {}
+
+    if previous_check_date and not previous_safety_group:
+        errors['previous_safety_group'] = (
+            "Предыдущая группа электробезопасности обязательна "
+            "при указании даты предыдущей проверки."
+        )
+
+    if previous_safety_group and not previous_check_date:
+        errors['previous_check_date'] = (
+            "Дата проведения предыдущей проверки обязательна "
+            "при указании предыдущей группы электробезопасности."
+        )
+    return errors
 
 
 class ExaminationCreateForm(forms.ModelForm):
     """
     Форма для создания записи о проверке, включая информацию об аттестуемом и
     комиссии. Обрабатывает данные о предыдущей и текущей проверке, а также о
-    членах комиссии. Поддерживает создание объектов Examined и Commission.
+    членах комиссии. Поддерживает создание объектов Examined и Commission
+    и выбор существующего сотрудника (Employee).
     """
     class Meta:
         model = Examination
@@ -123,32 +151,40 @@ class ExaminationCreateForm(forms.ModelForm):
             else:
                 self.company_name = user.organization
                 self.user = user
+            # Сотрудник, выбранный через поиск по ФИО; если он не выбран,
+            # сотрудник определяется по ФИО при сохранении
+            self.fields['employee'] = forms.ModelChoiceField(
+                queryset=get_visible_employees(user),
+                required=False,
+                widget=forms.HiddenInput
+            )
+            self.fields['full_name'].widget.attrs.update(
+                list='employee-suggestions', autocomplete='off'
+            )
 
     def clean(self):
         """
         Проверка валидности данных формы. Убедитесь, что
         дата предыдущей проверки и предыдущая группа электробезопасности
-        указаны, если одно из полей заполнено.
+        указаны, если одно из полей заполнено, а выбранный сотрудник
+        относится к организации аттестуемого.
         """
         cleaned_data = super().clean()
-        previous_check_date = cleaned_data.get('previous_check_date')
-        previous_safety_group = cleaned_data.get('previous_safety_group')
+        for field, error in check_previous_check(cleaned_data).items():
+            self.add_error(field, error)
 
-        if previous_check_date and not previous_safety_group:
-            self.add_error('previous_safety_group',
-                           "Предыдущая группа электробезопасности обязательна"
-                           "при указании даты предыдущей проверки.")
-
-        if previous_safety_group and not previous_check_date:
-            self.add_error('previous_check_date',
-                           "Дата проведения предыдущей проверки обязательна"
-                           "при указании предыдущей группы"
-                           "электробезопасности.")
+        employee = cleaned_data.get('employee')
+        author = cleaned_data.get('user') or self.user
+        if employee and author and (
+                employee.organization_id != author.organization_id):
+            self.add_error('full_name',
+                           "Выбранный сотрудник относится к другой "
+                           "организации.")
 
     def save(self, commit=True):
         """
-        Сохраняет запись о проверке, создает объекты Examined и Commission
-        для текущей проверки.
+        Сохраняет запись о проверке, создает объект Examined и выбирает
+        или создает объект Commission для текущей проверки.
         """
         instance = super(ExaminationCreateForm, self).save(commit=False)
 
@@ -159,6 +195,7 @@ class ExaminationCreateForm(forms.ModelForm):
             previous_safety_group=self.cleaned_data['previous_safety_group'],
             safety_group=self.cleaned_data['safety_group'],
             work_experience=self.cleaned_data['work_experience'],
+            employee=self.cleaned_data.get('employee'),
             user=self.user
         )
 
@@ -171,23 +208,14 @@ class ExaminationCreateForm(forms.ModelForm):
 
         examined.save()
 
-        commission = Commission(
-            chairman_name=self.cleaned_data['chairman_name'],
-            chairman_position=self.cleaned_data['chairman_position'],
-            member1_name=self.cleaned_data['member1_name'],
-            member1_position=self.cleaned_data['member1_position'],
-            member2_name=self.cleaned_data['member2_name'],
-            member2_position=self.cleaned_data['member2_position'],
-            safety_officer_name=self.cleaned_data['safety_officer_name'],
-            safety_officer_position=self.cleaned_data[
-                'safety_officer_position'
-            ]
-        )
-
-        commission.save()
+        # Комиссия с тем же составом используется повторно
+        commission, _ = Commission.objects.get_or_create_by_members(**{
+            name: self.cleaned_data[name] for name in Commission.MEMBER_FIELDS
+        })
 
         instance.examined = examined
         instance.commission = commission
+        instance.organization = examined.company_name
         instance.save()
         return instance
 
@@ -247,6 +275,11 @@ class ExaminationUpdateForm(forms.ModelForm):
         label="Должность ответственного за электробезопасность"
     )
 
+    EXAMINED_FIELDS = (
+        'full_name', 'position', 'brigade', 'previous_safety_group',
+        'safety_group', 'work_experience',
+    )
+
     def __init__(self, *args, **kwargs):
         """
         Инициализирует форму обновления проверки, заполняя поля начальными
@@ -290,59 +323,132 @@ class ExaminationUpdateForm(forms.ModelForm):
         необходимости.
         """
         cleaned_data = super().clean()
-        previous_check_date = cleaned_data.get('previous_check_date')
-        previous_safety_group = cleaned_data.get('previous_safety_group')
-
-        if previous_check_date and not previous_safety_group:
-            self.add_error('previous_safety_group',
-                           "Предыдущая группа электробезопасности обязательна"
-                           "при указании даты предыдущей проверки.")
-
-        if previous_safety_group and not previous_check_date:
-            self.add_error('previous_check_date',
-                           "Дата проведения предыдущей проверки обязательна"
-                           "при указании предыдущей группы"
-                           "электробезопасности.")
+        for field, error in check_previous_check(cleaned_data).items():
+            self.add_error(field, error)
 
     def save(self, commit=True):
         """
-        Сохраняет изменения в записи о проверке и обновляет объекты Examined
-        и Commission.
+        Сохраняет изменения в записи о проверке. Записываются только поля,
+        изменённые в форме: аттестуемый обновляется, если изменились его
+        данные, комиссия выбирается заново, только если изменился её
+        состав, а проверка не записывается, если не изменилось ни одно её
+        поле. При изменении ФИО заново выбирается и сотрудник аттестуемого
+        и проверки. При commit=True изменения записываются в одной
+        транзакции, при commit=False в базу ничего не записывается: данные
+        аттестуемого, сотрудника и комиссию записывает save_m2m.
         """
+        changed = set(self.changed_data)
         examination = super().save(commit=False)
-        examined_data = {
-            'full_name': self.cleaned_data['full_name'],
-            'position': self.cleaned_data['position'],
-            'brigade': self.cleaned_data['brigade'],
-            'previous_safety_group': self.cleaned_data.get(
-                'previous_safety_group'
-            ),
-            'safety_group': self.cleaned_data['safety_group'],
-            'work_experience': self.cleaned_data['work_experience'],
-        }
-        commission_data = {
-            'chairman_name': self.cleaned_data['chairman_name'],
-            'chairman_position': self.cleaned_data['chairman_position'],
-            'member1_name': self.cleaned_data['member1_name'],
-            'member1_position': self.cleaned_data['member1_position'],
-            'member2_name': self.cleaned_data['member2_name'],
-            'member2_position': self.cleaned_data['member2_position'],
-            'safety_officer_name': self.cleaned_data['safety_officer_name'],
-            'safety_officer_position': self.cleaned_data[
-                'safety_officer_position'
-            ],
-        }
-
-        if examination.examined:
-            for key, value in examined_data.items():
-                setattr(examination.examined, key, value)
-            examination.examined.save()
-
-        if examination.commission:
-            for key, value in commission_data.items():
-                setattr(examination.commission, key, value)
-            examination.commission.save()
+        self._examined_fields = [
+            name for name in self.EXAMINED_FIELDS if name in changed
+        ]
+        self._commission_changed = bool(
+            changed.intersection(Commission.MEMBER_FIELDS)
+        )
+        self._employee_changed = 'full_name' in changed
+        for name in self._examined_fields:
+            setattr(examination.examined, name, self.cleaned_data[name])
+        update_fields = [
+            name for name in self._meta.fields if name in changed
+        ]
+        if examination.organization_id != (
+                examination.examined.company_name_id):
+            examination.organization_id = examination.examined.company_name_id
+            update_fields.append('organization')
 
         if commit:
-            examination.save()
+            with transaction.atomic(savepoint=False):
+                if self.replace_commission(examination):
+                    update_fields.append('commission')
+                if self.replace_employee(examination):
+                    update_fields.append('employee')
+                if update_fields:
+                    examination.save(update_fields=update_fields)
+                self._save_m2m()
         return examination
+
+    def replace_commission(self, examination):
+        """
+        Заменяет комиссию проверки комиссией с составом из формы, если
+        состав изменился. Комиссия может быть общей для нескольких
+        проверок, поэтому она не изменяется, а заменяется. Выполняется
+        один раз; возвращает True, если комиссия проверки изменилась.
+        """
+        if not self._commission_changed:
+            return False
+        self._commission_changed = False
+        commission, _ = Commission.objects.get_or_create_by_members(
+            **{name: self.cleaned_data[name]
+               for name in Commission.MEMBER_FIELDS}
+        )
+        if commission.pk == examination.commission_id:
+            return False
+        examination.commission = commission
+        return True
+
+    def replace_employee(self, examination):
+        """
+        Выбирает сотрудника по новому ФИО аттестуемого (см.
+        EmployeeManager.get_for_name) и назначает его аттестуемому и
+        проверке, чтобы текущие проверки, сводка и уведомления не
+        относились к сотруднику с прежним ФИО. Выполняется один раз;
+        возвращает True, если сотрудник проверки изменился.
+        """
+        if not self._employee_changed:
+            return False
+        self._employee_changed = False
+        examined = examination.examined
+        employee = Employee.objects.get_for_name(
+            examined.company_name_id, examined.full_name
+        )
+        if employee.pk == examined.employee_id == examination.employee_id:
+            return False
+        examined.employee = employee
+        examination.employee = employee
+        self._examined_fields.append('employee')
+        return True
+
+    def _save_m2m(self):
+        """
+        Записывает изменённые поля аттестуемого после проверки, а после
+        сохранения с commit=False — и комиссию с новым составом и
+        сотрудника с новым ФИО.
+        """
+        super()._save_m2m()
+        update_fields = []
+        if self.replace_commission(self.instance):
+            update_fields.append('commission')
+        if self.replace_employee(self.instance):
+            update_fields.append('employee')
+        if update_fields:
+            self.instance.save(update_fields=update_fields)
+        if self._examined_fields:
+            self.instance.examined.save(update_fields=self._examined_fields)
+
+
+class ExaminationImportForm(forms.Form):
+    """
+    Форма загрузки файла CSV или XLSX с проверками (см. модуль importer).
+    Суперпользователь выбирает организацию аттестуемых, остальные
+    пользователи загружают записи своей организации.
+    """
+    file = forms.FileField(
+        label="Файл",
+        help_text="Файл CSV или XLSX со столбцами, как в выгрузке проверок",
+        validators=[FileExtensionValidator(['csv', 'xlsx'])]
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Только проверить",
+        help_text="Проверить строки файла, не сохраняя записи"
+    )
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user and user.is_superuser:
+            self.fields['company_name'] = forms.ModelChoiceField(
+                queryset=Organization.objects.all(),
+                label="Наименование компании",
+                help_text="Укажите компанию аттестуемых"
+            )
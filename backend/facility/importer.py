@@ -0,0 +1,552 @@
+"""
+Модуль импорта проверок из файлов CSV и XLSX.
+
+Столбцы файла определяются по заголовкам первой строки. Заголовки те же,
+что в выгрузке (модуль export), поэтому выгруженный файл можно загрузить
+обратно; столбец «Дата записи» при импорте пропускается.
+
+Каждая строка проверяется по тем же правилам, что и в форме
+ExaminationCreateForm: полями формы и общим правилом
+check_previous_check. Инструктаж выбирается по наименованию, программа
+обучения — по номеру и наименованию среди существующих записей;
+справочники загружаются в память один раз на весь файл. Комиссии
+выбираются по отпечатку состава, а сотрудники — по ФИО в организации:
+существующие используются повторно, а новые создаются один раз на весь
+файл.
+
+Файл читается построчно, а допустимые строки записываются пакетами по
+EXAMINATION_IMPORT_BATCH_SIZE строк: каждый пакет записывается одной
+транзакцией запросами bulk_create (комиссии, сотрудники, аттестуемые,
+проверки) вместо нескольких INSERT на каждую строку. bulk_create не
+вызывает сигналы, поэтому текущие проверки сотрудников (модуль latest) и
+поисковые документы (модуль search) пакета обновляются явно. Строки с
+ошибками пропускаются и возвращаются в результате импорта.
+"""
+import csv
+import io
+import os
+import posixpath
+import zipfile
+from datetime import timedelta
+from itertools import chain
+from xml.etree import ElementTree
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .caching import bump_generation_on_commit
+from .export import COLUMNS, EXCEL_EPOCH
+from .forms import ExaminationCreateForm, check_previous_check
+from .latest import refresh_latest_examinations
+from .models import (Briefing, Commission, Course, Employee, Examination,
+                     Examined, make_fingerprint, normalize_text)
+from .search import update_search_documents
+
+EXAMINED_FIELDS = (
+    'full_name', 'position', 'brigade', 'previous_safety_group',
+    'safety_group', 'work_experience',
+)
+EXAMINATION_FIELDS = (
+    'previous_check_date', 'current_check_date', 'next_check_date',
+    'protocol_number', 'reason', 'certificate_number',
+)
+
+# Поля строки импорта, которые отличаются от последней части поля выгрузки
+IMPORT_FIELDS = {
+    'briefing__name': 'briefing',
+    'course__course_number': 'course_number',
+    'course__course_name': 'course_name',
+}
+# Поля строки импорта по заголовкам столбцов
+COLUMN_FIELDS = {
+    title: IMPORT_FIELDS.get(field, field.split('__')[-1])
+    for title, field in COLUMNS if field != 'created_at'
+}
+FIELD_TITLES = {field: title for title, field in COLUMN_FIELDS.items()}
+
+# Количество ошибок строк, сохраняемых в результате импорта
+MAX_ERRORS = 100
+# Объём начала CSV-файла, по которому определяется кодировка
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = (
+    '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+)
+PACKAGE_REL_NS = (
+    '{http://schemas.openxmlformats.org/package/2006/relationships}'
+)
+
+
+class ImportFileError(ValueError):
+    """Файл импорта не удаётся прочитать или в нём нет нужных столбцов."""
+
+
+def get_row_fields():
+    """
+    Возвращает поля формы для проверки строки: поля формы
+    ExaminationCreateForm, где вместо выбора инструктажа и программы
+    обучения указываются их наименование и номер.
+    """
+    fields = {
+        name: field
+        for name, field in ExaminationCreateForm.base_fields.items()
+        if name not in ('briefing', 'course')
+    }
+    fields['briefing'] = Briefing._meta.get_field('name').formfield()
+    for name in ('course_number', 'course_name'):
+        fields[name] = Course._meta.get_field(name).formfield()
+    return fields
+
+
+ROW_FIELDS = get_row_fields()
+
+
+class Lookups:
+    """
+    Справочники импорта в памяти.
+
+    Атрибуты:
+        briefings (dict): Идентификаторы инструктажей по наименованию.
+        courses (dict): Идентификаторы программ обучения по номеру и
+            наименованию.
+        commissions (dict): Идентификаторы комиссий по отпечатку состава,
+            найденные или созданные при импорте.
+        employees (dict): Идентификаторы сотрудников организации по ФИО для
+            поиска, найденные или созданные при импорте.
+
+    При совпадающих записях выбирается созданная первой.
+    """
+
+    def __init__(self):
+        self.commissions = {}
+        self.employees = {}
+        self.briefings = {}
+        for pk, name in Briefing.objects.order_by('pk').values_list(
+            'pk', 'name'
+        ):
+            self.briefings.setdefault(name, pk)
+        self.courses = {}
+        for pk, number, name in Course.objects.order_by('pk').values_list(
+            'pk', 'course_number', 'course_name'
+        ):
+            self.courses.setdefault((number, name), pk)
+
+
+class ImportResult:
+    """
+    Результат импорта.
+
+    Атрибуты:
+        rows (int): Количество непустых строк данных.
+        valid (int): Количество строк без ошибок.
+        created (int): Количество созданных проверок.
+        error_count (int): Количество строк с ошибками.
+        errors (list): Первые MAX_ERRORS ошибок: номер строки и сообщения
+            по заголовкам столбцов.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.valid = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((number, {
+                FIELD_TITLES[name]: messages
+                for name, messages in errors.items()
+            }))
+
+
+def prepare_value(field, value):
+    """
+    Приводит значение ячейки XLSX к виду, который принимает поле формы:
+    число в поле даты — к дате, остальные числа — к строке.
+    """
+    if not isinstance(value, float):
+        return value
+    if isinstance(field, forms.DateField):
+        return EXCEL_EPOCH.date() + timedelta(days=int(value))
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def clean_row(values, lookups):
+    """
+    Проверяет значения строки по полям формы и правилам
+    ExaminationCreateForm.clean и определяет инструктаж и программу
+    обучения. Возвращает очищенные данные и ошибки по полям.
+    """
+    cleaned_data = {}
+    errors = {}
+    for name, field in ROW_FIELDS.items():
+        try:
+            cleaned_data[name] = field.clean(
+                prepare_value(field, values.get(name, ''))
+            )
+        except ValidationError as error:
+            errors[name] = error.messages
+    for name, error in check_previous_check(cleaned_data).items():
+        errors.setdefault(name, []).append(error)
+
+    if 'briefing' in cleaned_data:
+        cleaned_data['briefing_id'] = lookups.briefings.get(
+            cleaned_data['briefing']
+        )
+        if cleaned_data['briefing_id'] is None:
+            errors['briefing'] = [
+                f'Инструктаж «{cleaned_data["briefing"]}» не найден.'
+            ]
+    if 'course_number' in cleaned_data and 'course_name' in cleaned_data:
+        course = (cleaned_data['course_number'], cleaned_data['course_name'])
+        cleaned_data['course_id'] = lookups.courses.get(course)
+        if cleaned_data['course_id'] is None:
+            errors['course_number'] = [
+                'Программа обучения «{} {}» не найдена.'.format(*course)
+            ]
+    return cleaned_data, errors
+
+
+def get_columns(header):
+    """
+    Возвращает номера столбцов и поля строки по заголовкам. Если нет
+    столбца обязательного поля, вызывает ImportFileError.
+    """
+    columns = [
+        (index, COLUMN_FIELDS[str(title).strip()])
+        for index, title in enumerate(header)
+        if str(title).strip() in COLUMN_FIELDS
+    ]
+    found = {name for _, name in columns}
+    missing = [
+        FIELD_TITLES[name] for name, field in ROW_FIELDS.items()
+        if field.required and name not in found
+    ]
+    if missing:
+        raise ImportFileError(f'В файле нет столбцов: {", ".join(missing)}.')
+    return columns
+
+
+def resolve_commissions(batch, lookups):
+    """
+    Находит или создаёт комиссии пакета и возвращает их отпечатки в
+    порядке строк.
+    """
+    new_commissions = {}
+    keys = []
+    for data in batch:
+        members = {name: data[name] for name in Commission.MEMBER_FIELDS}
+        key = make_fingerprint(members.values())
+        if key not in lookups.commissions and key not in new_commissions:
+            new_commissions[key] = Commission(fingerprint=key, **members)
+        keys.append(key)
+    if new_commissions:
+        # Комиссия могла быть создана раньше или параллельно другим
+        # запросом, поэтому конфликты пропускаются, а идентификаторы
+        # читаются по отпечаткам
+        Commission.objects.bulk_create(
+            new_commissions.values(), ignore_conflicts=True
+        )
+        lookups.commissions.update(Commission.objects.filter(
+            fingerprint__in=new_commissions
+        ).values_list('fingerprint', 'pk'))
+    return keys
+
+
+def resolve_employees(batch, organization, lookups):
+    """
+    Находит сотрудников организации по ФИО или создаёт новых и
+    возвращает ФИО для поиска в порядке строк.
+    """
+    keys = [normalize_text(data['full_name']) for data in batch]
+    missing = {
+        key: data['full_name'] for key, data in zip(keys, batch)
+        if key not in lookups.employees
+    }
+    if missing:
+        for pk, name_key in Employee.objects.filter(
+            organization=organization, name_key__in=missing
+        ).order_by('pk').values_list('pk', 'name_key'):
+            lookups.employees.setdefault(name_key, pk)
+        # bulk_create не вызывает Employee.save, поэтому ФИО для поиска
+        # указывается явно
+        new_employees = Employee.objects.bulk_create([
+            Employee(
+                full_name=full_name, name_key=key, organization=organization
+            )
+            for key, full_name in missing.items()
+            if key not in lookups.employees
+        ])
+        lookups.employees.update(
+            (employee.name_key, employee.pk) for employee in new_employees
+        )
+    return keys
+
+
+def write_batch(batch, user, organization, lookups):
+    """
+    Записывает пакет проверенных строк одной транзакцией и возвращает
+    количество созданных проверок.
+    """
+    with transaction.atomic():
+        commission_keys = resolve_commissions(batch, lookups)
+        employee_keys = resolve_employees(batch, organization, lookups)
+        # bulk_create не вызывает Examined.save, поэтому организация и
+        # сотрудник указываются явно
+        examined = Examined.objects.bulk_create([
+            Examined(
+                company_name=organization,
+                user=user,
+                employee_id=lookups.employees[key],
+                **{name: data[name] for name in EXAMINED_FIELDS}
+            )
+            for data, key in zip(batch, employee_keys)
+        ])
+        examinations = Examination.objects.bulk_create([
+            Examination(
+                examined=person,
+                commission_id=lookups.commissions[commission_key],
+                employee_id=person.employee_id,
+                organization=organization,
+                briefing_id=data['briefing_id'],
+                course_id=data['course_id'],
+                **{name: data[name] for name in EXAMINATION_FIELDS}
+            )
+            for data, person, commission_key in zip(
+                batch, examined, commission_keys
+            )
+        ])
+        refresh_latest_examinations(
+            {person.employee_id for person in examined}
+        )
+        update_search_documents(Examination.objects.filter(
+            pk__in=[examination.pk for examination in examinations]
+        ))
+    return len(batch)
+
+
+def import_examinations(rows, user, organization=None, batch_size=None,
+                        dry_run=False):
+    """
+    Импортирует проверки из строк файла и возвращает ImportResult.
+
+    Параметры:
+    - rows (iterable): Строки файла; первая строка — заголовки.
+    - user (User): Пользователь, от имени которого создаются записи.
+    - organization (Organization): Организация аттестуемых; по умолчанию
+        организация пользователя.
+    - batch_size (int): Количество строк в одной транзакции; по умолчанию
+        EXAMINATION_IMPORT_BATCH_SIZE.
+    - dry_run (bool): Только проверить строки, не записывая их.
+    """
+    if organization is None:
+        organization = user.organization
+    batch_size = batch_size or settings.EXAMINATION_IMPORT_BATCH_SIZE
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError('Файл пуст.')
+    columns = get_columns(header)
+
+    lookups = Lookups()
+    result = ImportResult()
+    batch = []
+    for number, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+        result.rows += 1
+        data, errors = clean_row(
+            {name: row[index] for index, name in columns if index < len(row)},
+            lookups
+        )
+        if errors:
+            result.add_error(number, errors)
+            continue
+        result.valid += 1
+        if dry_run:
+            continue
+        batch.append(data)
+        if len(batch) >= batch_size:
+            result.created += write_batch(batch, user, organization, lookups)
+            batch = []
+    if batch:
+        result.created += write_batch(batch, user, organization, lookups)
+    if result.created:
+        # bulk_create не отправляет сигналы, поэтому кэш списка
+        # сбрасывается явно
+        bump_generation_on_commit(organization.pk if organization else None)
+    return result
+
+
+def detect_encoding(sample):
+    """
+    Определяет кодировку CSV-файла по его началу: UTF-8 (в том числе с
+    меткой BOM) или Windows-1251, в которой сохраняет CSV русский Excel.
+    """
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as error:
+        # Начало файла может обрываться посреди многобайтового символа
+        if error.start < len(sample) - 3:
+            return 'cp1251'
+    return 'utf-8-sig'
+
+
+def read_csv(file):
+    """
+    Читает строки CSV-файла. Разделитель — запятая, точка с запятой или
+    табуляция — определяется по строке заголовков.
+    """
+    encoding = detect_encoding(file.read(ENCODING_SAMPLE_SIZE))
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding=encoding, newline='')
+    header = text.readline()
+    delimiter = max(',;\t', key=header.count)
+    return csv.reader(chain([header], text), delimiter=delimiter)
+
+
+def get_text(element):
+    """
+    Возвращает текст строки XLSX: элемент t или фрагменты r/t без
+    фонетических подсказок.
+    """
+    parts = []
+    for child in element:
+        if child.tag == f'{NS}t':
+            parts.append(child.text or '')
+        elif child.tag == f'{NS}r':
+            parts.extend(
+                node.text or '' for node in child if node.tag == f'{NS}t'
+            )
+    return ''.join(parts)
+
+
+def read_shared_strings(archive):
+    """Читает общие строки книги XLSX."""
+    try:
+        source = archive.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f'{NS}si':
+                strings.append(get_text(element))
+                element.clear()
+    return strings
+
+
+def get_first_sheet(archive):
+    """Возвращает имя части архива с первым листом книги XLSX."""
+    try:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        relations = ElementTree.fromstring(
+            archive.read('xl/_rels/workbook.xml.rels')
+        )
+    except KeyError:
+        raise ImportFileError('Файл не является книгой XLSX.')
+    sheet = workbook.find(f'{NS}sheets/{NS}sheet')
+    relation_id = sheet.get(f'{REL_NS}id') if sheet is not None else None
+    for relation in relations.iter(f'{PACKAGE_REL_NS}Relationship'):
+        if relation.get('Id') == relation_id:
+            target = relation.get('Target')
+            if target.startswith('/'):
+                return target[1:]
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise ImportFileError('В книге XLSX нет листов.')
+
+
+def column_index(reference):
+    """Возвращает номер столбца от нуля по ссылке на ячейку ('AB12')."""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord('A') + 1
+    return index - 1
+
+
+def cell_value(cell, strings):
+    """
+    Возвращает значение ячейки XLSX: строку или число. Даты хранятся в
+    книге числами и приводятся к дате при проверке строки.
+    """
+    kind = cell.get('t', 'n')
+    value = None
+    # Дочерние элементы перебираются напрямую: поиск по пути заметно
+    # медленнее на сотнях тысяч ячеек
+    for child in cell:
+        if child.tag == f'{NS}v':
+            value = child.text
+        elif child.tag == f'{NS}is':
+            return get_text(child)
+    if value is None:
+        return ''
+    if kind == 's':
+        return strings[int(value)]
+    if kind == 'n':
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def read_sheet(source, strings):
+    """
+    Читает строки листа XLSX по мере разбора XML, не загружая лист
+    целиком. Пропущенные в листе пустые строки возвращаются пустыми,
+    чтобы номера строк совпадали с номерами в Excel.
+    """
+    number = 0
+    for _, element in ElementTree.iterparse(source):
+        if element.tag != f'{NS}row':
+            continue
+        number += 1
+        row_number = int(element.get('r', number))
+        while number < row_number:
+            number += 1
+            yield []
+        row = []
+        for cell in element.iter(f'{NS}c'):
+            reference = cell.get('r')
+            index = column_index(reference) if reference else len(row)
+            row.extend([''] * (index - len(row)))
+            row.append(cell_value(cell, strings))
+        element.clear()
+        yield row
+
+
+def read_xlsx(file):
+    """Читает строки первого листа книги XLSX."""
+    with zipfile.ZipFile(file) as archive:
+        strings = read_shared_strings(archive)
+        with archive.open(get_first_sheet(archive)) as source:
+            yield from read_sheet(source, strings)
+
+
+READERS = {
+    'csv': read_csv,
+    'xlsx': read_xlsx,
+}
+
+
+def import_file(file, name, user, organization=None, **kwargs):
+    """
+    Импортирует проверки из файла CSV или XLSX; формат определяется по
+    расширению имени файла. Остальные параметры — как у
+    import_examinations.
+    """
+    reader = READERS.get(os.path.splitext(name)[1][1:].lower())
+    if reader is None:
+        raise ImportFileError('Поддерживаются файлы CSV и XLSX.')
+    try:
+        return import_examinations(reader(file), user, organization, **kwargs)
+    except (UnicodeDecodeError, csv.Error, zipfile.BadZipFile,
+            ElementTree.ParseError) as error:
+        raise ImportFileError(f'Не удалось прочитать файл: {error}')
@@ -0,0 +1,106 @@
+"""
+Модуль поддержки таблицы текущих проверок сотрудников.
+
+Текущая проверка сотрудника по программе обучения — последняя по дате
+проверка из его проверок по этой программе (из проверок в один день —
+добавленная последней). Вычислять её на лету пришлось бы по всей истории
+проверок, поэтому текущие проверки хранятся в таблице LatestExamination,
+а отчёты о сроках (см. модули dashboard и notifications) и фильтр
+«только текущие» главной страницы читают её.
+
+Таблица пересчитывается для сотрудников, проверки которых изменились:
+обработчиками сигналов при сохранении и удалении проверки, а при
+массовой записи в обход сигналов (импорт, заполнение базы, перенос
+проверок к другому сотруднику) — явным вызовом refresh_latest_examinations.
+Полностью таблицу перестраивает команда rebuild_latest_examinations.
+"""
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from .models import Employee, Examination, LatestExamination
+
+# Поля проверки, от которых зависит таблица текущих проверок
+LATEST_FIELDS = frozenset({
+    'employee', 'course', 'current_check_date', 'next_check_date',
+    'organization',
+})
+BATCH_SIZE = 1000
+
+
+def get_current_examinations(queryset):
+    """
+    Оставляет в наборе только текущие проверки: проверки, после которых у
+    того же сотрудника не было проверки по той же программе обучения.
+    Более поздние проверки ищутся по индексу examination_emp_course_idx.
+    """
+    newer = Examination.objects.filter(
+        Q(current_check_date__gt=OuterRef('current_check_date'))
+        | Q(current_check_date=OuterRef('current_check_date'),
+            pk__gt=OuterRef('pk')),
+        employee=OuterRef('employee'),
+        course=OuterRef('course'),
+    )
+    return queryset.filter(~Exists(newer))
+
+
+def refresh_latest_examinations(employee_ids):
+    """
+    Пересчитывает текущие проверки указанных сотрудников: записывает
+    текущие проверки по каждой программе обучения и удаляет остальные
+    записи этих сотрудников. Записи обновляются вставкой с заменой по паре
+    сотрудник — программа, поэтому одновременный пересчёт одного
+    сотрудника не нарушает уникальность.
+    """
+    employee_ids = {pk for pk in employee_ids if pk is not None}
+    if not employee_ids:
+        return
+    current = [
+        LatestExamination(
+            employee_id=employee_id,
+            course_id=course_id,
+            examination_id=examination_id,
+            organization_id=organization_id,
+            next_check_date=next_check_date,
+        )
+        for examination_id, employee_id, course_id, organization_id,
+        next_check_date in get_current_examinations(
+            Examination.objects.filter(employee__in=employee_ids)
+        ).values_list(
+            'pk', 'employee', 'course', 'organization', 'next_check_date'
+        )
+    ]
+    with transaction.atomic(savepoint=False):
+        LatestExamination.objects.bulk_create(
+            current,
+            update_conflicts=True,
+            unique_fields=['employee', 'course'],
+            update_fields=['examination', 'organization', 'next_check_date'],
+        )
+        # Удаляются и записи, проверка которых осталась текущей, но уже
+        # относится к другому сотруднику или программе обучения
+        LatestExamination.objects.filter(
+            employee__in=employee_ids
+        ).exclude(
+            examination__in=[latest.examination_id for latest in current],
+            employee=F('examination__employee'),
+            course=F('examination__course'),
+        ).delete()
+
+
+def rebuild_latest_examinations(batch_size=None):
+    """
+    Перестраивает таблицу текущих проверок для всех сотрудников пакетами
+    по batch_size сотрудников и возвращает количество сотрудников.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    last_pk = 0
+    count = 0
+    while True:
+        employee_ids = list(Employee.objects.filter(
+            pk__gt=last_pk
+        ).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not employee_ids:
+            return count
+        last_pk = employee_ids[-1]
+        count += len(employee_ids)
+        refresh_latest_examinations(employee_ids)
@@ -0,0 +1,119 @@
+"""
+Команда замера потоковой выгрузки списка проверок.
+
+Выполняет выгрузку через представление ExaminationExportView от имени
+пользователя организации и выводит время до первого байта, общее время,
+размер файла и прирост потребляемой процессом памяти (RSS).
+
+Пример:
+    python manage.py seed_examinations --count 500000 --organizations 1
+    python manage.py benchmark_export --organization 1 --format xlsx
+"""
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import reverse
+from facility.export import STREAMS
+from facility.filters import get_filtered_examinations
+from facility.views import ExaminationExportView
+from users.models import Organization, User
+
+
+def get_rss():
+    """Возвращает текущий объём памяти процесса (RSS) в мегабайтах."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Вне Linux доступен только пиковый объём памяти
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время до первого байта, общее время и прирост памяти '
+            'при потоковой выгрузке проверок организации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization', type=int,
+            help='Идентификатор организации (по умолчанию первая).'
+        )
+        parser.add_argument(
+            '--format', choices=[*STREAMS, 'all'], default='all',
+            help='Формат выгрузки.'
+        )
+        parser.add_argument(
+            '--baseline', action='store_true',
+            help='Дополнительно замерить загрузку всех записей в память.'
+        )
+
+    def handle(self, *args, **options):
+        organization = (
+            Organization.objects.filter(pk=options['organization']).first()
+            if options['organization']
+            else Organization.objects.order_by('pk').first()
+        )
+        user = User.objects.filter(organization=organization).first()
+        if user is None:
+            raise CommandError('Не найден пользователь организации.')
+        formats = (
+            list(STREAMS) if options['format'] == 'all'
+            else [options['format']]
+        )
+        self.stdout.write(
+            f'Организация: {organization}, записей: '
+            f'{get_filtered_examinations(user, {}).count()}'
+        )
+        for file_format in formats:
+            self.benchmark(user, file_format)
+        if options['baseline']:
+            self.benchmark_baseline(user)
+
+    def benchmark(self, user, file_format):
+        """Замеряет выгрузку в одном формате."""
+        request = RequestFactory().get(
+            reverse('facility:export_examinations', args=[file_format])
+        )
+        request.user = user
+        rss_before = peak = get_rss()
+        started = time.perf_counter()
+        response = ExaminationExportView.as_view()(
+            request, file_format=file_format
+        )
+        first_byte = None
+        size = 0
+        for chunk in response.streaming_content:
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+            peak = max(peak, get_rss())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.MIGRATE_HEADING(file_format.upper()))
+        self.stdout.write(
+            f'  до первого байта: {first_byte * 1000:.1f} мс\n'
+            f'  всего: {elapsed:.2f} с\n'
+            f'  размер: {size / 1024 / 1024:.1f} МБ\n'
+            f'  RSS: {rss_before:.1f} МБ -> пик {peak:.1f} МБ '
+            f'(+{peak - rss_before:.1f} МБ)'
+        )
+
+    def benchmark_baseline(self, user):
+        """Замеряет загрузку всех записей в память для сравнения."""
+        rss_before = get_rss()
+        started = time.perf_counter()
+        rows = list(get_filtered_examinations(user, {}).select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        ))
+        elapsed = time.perf_counter() - started
+        peak = get_rss()
+        self.stdout.write(self.style.MIGRATE_HEADING('Без потоковой выдачи'))
+        self.stdout.write(
+            f'  записей: {len(rows)}, всего: {elapsed:.2f} с\n'
+            f'  RSS: {rss_before:.1f} МБ -> {peak:.1f} МБ '
+            f'(+{peak - rss_before:.1f} МБ)'
+        )
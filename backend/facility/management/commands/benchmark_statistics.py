@@ -0,0 +1,96 @@
+"""
+Команда замера статистики проверок организации.
+
+Вычисляет статистику проверок организации без кэша и из кэша (см. модуль
+statistics) и выводит время, количество запросов к базе и планы
+выполнения (EXPLAIN) агрегатных запросов.
+
+Пример:
+    python manage.py seed_examinations --count 2000000 --organizations 5
+    python manage.py benchmark_statistics --organization 1 --explain
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from facility.caching import get_statistics_key
+from facility.filters import get_visible_examinations
+from facility.statistics import (build_statistics, get_monthly_counts,
+                                 get_statistics)
+from users.models import Organization, User
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время вычисления статистики проверок организации без '
+            'кэша и из кэша.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization', type=int,
+            help='Идентификатор организации (по умолчанию первая).'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Количество повторений замера без кэша.'
+        )
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Вывести планы выполнения агрегатных запросов.'
+        )
+
+    def handle(self, *args, **options):
+        organization = (
+            Organization.objects.filter(pk=options['organization']).first()
+            if options['organization']
+            else Organization.objects.order_by('pk').first()
+        )
+        user = User.objects.filter(organization=organization).first()
+        if user is None:
+            raise CommandError('Не найден пользователь организации.')
+        queryset = get_visible_examinations(user)
+        today = timezone.localdate()
+        self.stdout.write(
+            f'Организация: {organization}, записей: {queryset.count()}'
+        )
+
+        timings = []
+        for _ in range(options['repeat']):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                build_statistics(queryset, today)
+                timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'Без кэша: {min(timings) * 1000:.1f} мс '
+            f'(лучшее из {len(timings)}), запросов: {len(queries)}'
+        )
+
+        cache.delete(get_statistics_key(user, None, today))
+        get_statistics(user)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            get_statistics(user)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Из кэша: {elapsed * 1000:.2f} мс, запросов: {len(queries)}'
+        )
+
+        if options['explain']:
+            plans = {
+                'По месяцам': get_monthly_counts(
+                    queryset, today, settings.STATISTICS_MONTHS
+                ),
+                'По программам обучения': queryset.values(
+                    'course__course_number', 'course__course_name'
+                ).annotate(count=Count('pk')).order_by(),
+                'По цехам': queryset.values(
+                    'examined__brigade'
+                ).annotate(count=Count('pk')).order_by(),
+            }
+            for title, plan_queryset in plans.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(title))
+                self.stdout.write(plan_queryset.explain())
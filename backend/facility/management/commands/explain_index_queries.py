@@ -0,0 +1,92 @@
+"""
+Команда вывода планов выполнения запросов страницы списка проверок.
+
+Используется вместе с seed_examinations для проверки того, что фильтры и
+сортировки главной страницы используют индексы.
+
+Пример:
+    python manage.py seed_examinations --count 1000000
+    python manage.py explain_index_queries --organization 1
+"""
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from facility.models import Examination
+from users.models import Organization
+
+
+class Command(BaseCommand):
+    help = ('Выводит планы выполнения (EXPLAIN) и время запросов страницы '
+            'списка проверок для указанной организации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization', type=int,
+            help='Идентификатор организации (по умолчанию первая).'
+        )
+
+    def handle(self, *args, **options):
+        organization = (
+            Organization.objects.get(pk=options['organization'])
+            if options['organization']
+            else Organization.objects.order_by('pk').first()
+        )
+        base = Examination.objects.select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        ).filter(organization=organization)
+        page = settings.DISPLAY_COUNT
+        # Позиция глубокой страницы для сравнения OFFSET и ключевой пагинации
+        deep = base.order_by('-created_at', '-pk')[
+            page * 1000:page * 1000 + 1
+        ].first()
+        queries = {
+            'Список организации по дате записи': (
+                base.order_by('-created_at')[:page]
+            ),
+            'Фильтр по дате текущей проверки': (
+                base.filter(current_check_date=date(2020, 1, 15))
+                .order_by('-created_at')[:page]
+            ),
+            'Фильтр по дате следующей проверки': (
+                base.filter(next_check_date=date(2021, 1, 15))
+                .order_by('-created_at')[:page]
+            ),
+            'Фильтр по цеху (icontains)': (
+                base.filter(examined__brigade__icontains='№12')
+                .order_by('-created_at')[:page]
+            ),
+            'Фильтр по программе обучения (icontains)': (
+                base.filter(course__course_name__icontains='обучения 7')
+                .order_by('-created_at')[:page]
+            ),
+            'Сортировка по номеру протокола': (
+                base.order_by('protocol_number')[:page]
+            ),
+            'Глубокая страница (OFFSET)': (
+                base.order_by('-created_at', '-pk')[
+                    page * 1000:page * 1001
+                ]
+            ),
+        }
+        if deep is not None:
+            queries['Глубокая страница (курсор)'] = base.filter(
+                Q(created_at__lt=deep.created_at)
+                | Q(created_at=deep.created_at, pk__lt=deep.pk)
+            ).order_by('-created_at', '-pk')[:page]
+        explain_options = (
+            {'analyze': True, 'buffers': True}
+            if connection.vendor == 'postgresql' else {}
+        )
+        for title, queryset in queries.items():
+            started = time.perf_counter()
+            list(queryset)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{title}: {elapsed:.1f} мс'
+            ))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
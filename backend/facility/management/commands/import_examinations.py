@@ -0,0 +1,71 @@
+"""
+Команда импорта проверок из файла CSV или XLSX.
+
+Пример:
+    python manage.py import_examinations examinations.xlsx --user ivanov
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from facility.importer import ImportFileError, import_file
+from users.models import Organization, User
+
+
+class Command(BaseCommand):
+    help = ('Импортирует проверки из файла CSV или XLSX со столбцами '
+            'выгрузки, записывая строки пакетами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу CSV или XLSX.')
+        parser.add_argument(
+            '--user', required=True,
+            help='Имя пользователя, от имени которого создаются записи.'
+        )
+        parser.add_argument(
+            '--organization', type=int,
+            help='Идентификатор организации аттестуемых (по умолчанию '
+                 'организация пользователя).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только проверить строки, не записывая их.'
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f'Пользователь {options["user"]} не найден.')
+        organization = None
+        if options['organization']:
+            organization = Organization.objects.filter(
+                pk=options['organization']
+            ).first()
+            if organization is None:
+                raise CommandError('Организация не найдена.')
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_file(
+                    file, options['path'], user, organization,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run']
+                )
+        except (OSError, ImportFileError) as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - started
+
+        for number, errors in result.errors:
+            self.stdout.write(f'Строка {number}: ' + '; '.join(
+                f'{title} — {" ".join(messages)}'
+                for title, messages in errors.items()
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {result.rows}, без ошибок: {result.valid}, '
+            f'с ошибками: {result.error_count}, '
+            f'добавлено проверок: {result.created} за {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,78 @@
+"""
+Команда рассылки уведомлений о приближении сроков проверок.
+
+Отправляет авторам записей письма о проверках, срок следующей проверки
+которых наступает в ближайшие EXAMINATION_NOTIFY_DAYS дней (см. модуль
+notifications). О каждой проверке письмо отправляется один раз, поэтому
+команду можно запускать по расписанию (cron) хоть каждый час. С ключом
+--loop команда сама повторяет рассылку с периодом --interval, пока не
+будет остановлена (Ctrl+C или SIGTERM).
+
+Пример:
+    python manage.py notify_due_examinations
+    python manage.py notify_due_examinations --days 14 --dry-run
+    python manage.py notify_due_examinations --loop --interval 3600
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from facility.notifications import send_notifications
+
+
+class Command(BaseCommand):
+    help = ('Отправляет авторам записей письма о проверках с приближающимся '
+            'сроком следующей проверки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='За сколько дней до следующей проверки уведомлять '
+                 '(по умолчанию EXAMINATION_NOTIFY_DAYS).'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Подсчитать письма, не отправляя их.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Повторять рассылку, пока команда не будет остановлена.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=24 * 60 * 60,
+            help='Период повторения рассылки с ключом --loop, в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.notify(options)
+            return
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        try:
+            while not stopping:
+                close_old_connections()
+                try:
+                    self.notify(options)
+                except Exception as error:
+                    # Ошибка почтового сервера или базы не должна
+                    # останавливать рассылку до следующего запуска
+                    self.stderr.write(f'Ошибка рассылки: {error}')
+                deadline = time.monotonic() + options['interval']
+                while not stopping and time.monotonic() < deadline:
+                    time.sleep(min(1, options['interval']))
+        except KeyboardInterrupt:
+            pass
+
+    def notify(self, options):
+        """Выполняет одну рассылку и выводит её результат."""
+        result = send_notifications(
+            days=options['days'], dry_run=options['dry_run']
+        )
+        action = 'будет отправлено' if options['dry_run'] else 'отправлено'
+        self.stdout.write(
+            f'Проверок с наступающим сроком: {result.examinations}, '
+            f'{action} писем: {result.sent} (проверок: {result.notified}), '
+            f'пропущено проверок без адреса автора: {result.skipped}.'
+        )
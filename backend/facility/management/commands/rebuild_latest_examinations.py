@@ -0,0 +1,39 @@
+"""
+Команда перестроения таблицы текущих проверок сотрудников.
+
+Таблица LatestExamination поддерживается при изменении проверок (см.
+модуль latest), поэтому команда нужна только после изменения данных в
+обход приложения, например прямыми запросами к базе.
+
+Пример:
+    python manage.py rebuild_latest_examinations --batch-size 5000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from facility.caching import bump_generation
+from facility.latest import BATCH_SIZE, rebuild_latest_examinations
+from users.models import Organization
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает таблицу текущих проверок сотрудников по всем '
+            'проверкам пакетами сотрудников.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество сотрудников в пакете.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_latest_examinations(options['batch_size'])
+        # Сводки сроков могли быть вычислены по устаревшей таблице
+        bump_generation(
+            None, *Organization.objects.values_list('pk', flat=True)
+        )
+        self.stdout.write(
+            f'Пересчитаны текущие проверки сотрудников: {count} '
+            f'за {time.perf_counter() - started:.1f} с.'
+        )
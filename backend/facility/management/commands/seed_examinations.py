@@ -0,0 +1,184 @@
+"""
+Команда заполнения базы синтетическими проверками для нагрузочных замеров.
+
+Пример:
+    python manage.py seed_examinations --count 1000000 --organizations 20
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from facility.caching import bump_generation
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined, LatestExamination)
+from facility.search import update_search_documents
+from users.models import Organization, User
+
+BRIEFINGS = ['Вводный', 'Первичный', 'Повторный', 'Внеплановый']
+REASONS = ['Первичная', 'Повторная', 'Внеочередная']
+SAFETY_GROUPS = ['I', 'II', 'III', 'IV', 'V']
+POSITIONS = ['Инженер', 'Мастер', 'Электромонтёр', 'Машинист', 'Слесарь']
+
+
+class Command(BaseCommand):
+    help = ('Создаёт заданное количество синтетических проверок, '
+            'распределённых по организациям, пакетными вставками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=100000,
+            help='Количество создаваемых проверок.'
+        )
+        parser.add_argument(
+            '--organizations', type=int, default=10,
+            help='Количество организаций.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Размер пакета вставки.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        started = time.monotonic()
+        organizations, users = self.create_organizations(
+            options['organizations']
+        )
+        briefings = [
+            Briefing.objects.get_or_create(name=name)[0] for name in BRIEFINGS
+        ]
+        courses = [
+            Course.objects.get_or_create(
+                course_number=f'{number:03}',
+                course_name=f'Программа обучения {number}'
+            )[0]
+            for number in range(1, 21)
+        ]
+        commissions = [
+            Commission(
+                chairman_name=f'Председатель {i}',
+                chairman_position='Главный инженер',
+                member1_name=f'Член комиссии {i}-1',
+                member1_position='Инженер по охране труда',
+                member2_name=f'Член комиссии {i}-2',
+                member2_position='Энергетик',
+                safety_officer_name=f'Ответственный {i}',
+                safety_officer_position='Инженер-электрик',
+            )
+            for i in range(max(1, options['count'] // 50))
+        ]
+        for commission in commissions:
+            commission.fingerprint = commission.get_fingerprint()
+        Commission.objects.bulk_create(
+            commissions, batch_size=options['batch_size'],
+            ignore_conflicts=True
+        )
+        commissions = list(Commission.objects.filter(
+            fingerprint__in=[commission.fingerprint
+                             for commission in commissions]
+        ))
+
+        created = 0
+        while created < options['count']:
+            size = min(options['batch_size'], options['count'] - created)
+            with transaction.atomic():
+                self.create_batch(
+                    rnd, created, size, organizations, users, briefings,
+                    courses, commissions, options['batch_size']
+                )
+            created += size
+            self.stdout.write(f'Создано проверок: {created}')
+
+        bump_generation(*(organization.id for organization in organizations))
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с.'
+        ))
+
+    @staticmethod
+    def create_organizations(count):
+        """Создаёт организации и по одному пользователю в каждой."""
+        organizations = []
+        users = []
+        for i in range(count):
+            organization, _ = Organization.objects.get_or_create(
+                name=f'Организация {i}'
+            )
+            user, _ = User.objects.get_or_create(
+                username=f'seed_user_{i}',
+                defaults={
+                    'email': f'seed_user_{i}@example.com',
+                    'organization': organization,
+                }
+            )
+            organizations.append(organization)
+            users.append(user)
+        return organizations, users
+
+    @staticmethod
+    def create_batch(rnd, offset, size, organizations, users, briefings,
+                     courses, commissions, batch_size):
+        """Создаёт пакет сотрудников, аттестуемых и их проверок."""
+        owners = [rnd.randrange(len(organizations)) for _ in range(size)]
+        employees = Employee.objects.bulk_create([
+            Employee(
+                full_name=f'Сотрудник {offset + i}',
+                name_key=f'сотрудник {offset + i}',
+                organization=organizations[owner],
+            )
+            for i, owner in enumerate(owners)
+        ], batch_size=batch_size)
+        examined = Examined.objects.bulk_create([
+            Examined(
+                full_name=employees[i].full_name,
+                employee=employees[i],
+                position=rnd.choice(POSITIONS),
+                brigade=f'Цех №{rnd.randint(1, 40)}',
+                company_name=organizations[owner],
+                safety_group=rnd.choice(SAFETY_GROUPS),
+                work_experience=f'{rnd.randint(1, 30)} лет',
+                user=users[owner],
+            )
+            for i, owner in enumerate(owners)
+        ], batch_size=batch_size)
+        start = date(2015, 1, 1)
+        examinations = []
+        for i, person in enumerate(examined):
+            current = start + timedelta(days=rnd.randrange(3650))
+            reason = rnd.choice(REASONS)
+            examinations.append(Examination(
+                previous_check_date=(
+                    None if reason == 'Первичная'
+                    else current - timedelta(days=rnd.randint(300, 400))
+                ),
+                current_check_date=current,
+                next_check_date=current + timedelta(days=365),
+                protocol_number=f'{offset + i}/{current.year}',
+                reason=reason,
+                commission=rnd.choice(commissions),
+                examined=person,
+                employee_id=person.employee_id,
+                organization_id=person.company_name_id,
+                briefing=rnd.choice(briefings),
+                course=rnd.choice(courses),
+            ))
+        Examination.objects.bulk_create(examinations, batch_size=batch_size)
+        update_search_documents(Examination.objects.filter(
+            pk__in=[examination.pk for examination in examinations]
+        ))
+        # У каждого созданного сотрудника одна проверка, она и текущая
+        LatestExamination.objects.bulk_create([
+            LatestExamination(
+                employee_id=examination.employee_id,
+                course_id=examination.course_id,
+                examination=examination,
+                organization_id=examination.organization_id,
+                next_check_date=examination.next_check_date,
+            )
+            for examination in examinations
+        ], batch_size=batch_size)
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.16 on 2026-10-17 11:24
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Триграммные GIN-индексы для фильтров icontains: Django формирует условие
+# UPPER("column"::text) LIKE UPPER(%s), поэтому индексируется то же выражение.
+# Индексы создаются только в PostgreSQL, в SQLite операция пропускается.
+TRIGRAM_INDEXES = [
+    ('course_number_trgm_idx', 'facility_course', 'course_number'),
+    ('course_name_trgm_idx', 'facility_course', 'course_name'),
+    ('examined_brigade_trgm_idx', 'facility_examined', 'brigade'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0002_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['-created_at'], name='examination_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['current_check_date'], name='examination_current_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['next_check_date'], name='examination_next_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['protocol_number'], name='examination_protocol_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examined',
+            index=models.Index(fields=['company_name', 'brigade'], name='examined_company_brigade_idx'),
+        ),
+    ]
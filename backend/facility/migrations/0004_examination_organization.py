@@ -0,0 +1,62 @@
+# Generated by Django 4.2.16 on 2026-10-17 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def backfill_organization(apps, schema_editor):
+    """
+    Заполняет организацию проверок из организации аттестуемого. Записи
+    обновляются пакетами по диапазонам первичного ключа, каждый пакет в
+    своей транзакции, чтобы не держать блокировки большой таблицы.
+    """
+    Examination = apps.get_model('facility', 'Examination')
+    Examined = apps.get_model('facility', 'Examined')
+    db_alias = schema_editor.connection.alias
+    organization = Subquery(
+        Examined.objects.using(db_alias).filter(
+            pk=OuterRef('examined_id')
+        ).values('company_name')[:1]
+    )
+    last_pk = Examination.objects.using(db_alias).aggregate(
+        last_pk=Max('pk')
+    )['last_pk'] or 0
+    for start in range(0, last_pk, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            Examination.objects.using(db_alias).filter(
+                pk__gt=start,
+                pk__lte=start + BATCH_SIZE,
+                organization__isnull=True,
+            ).update(organization=organization)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('facility', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examination',
+            name='organization',
+            field=models.ForeignKey(blank=True, help_text='Организация аттестуемого (заполняется автоматически)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='users.organization', verbose_name='Организация'),
+        ),
+        migrations.RunPython(
+            backfill_organization, migrations.RunPython.noop, elidable=True
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', '-created_at'], name='examination_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', 'next_check_date'], name='examination_org_next_idx'),
+        ),
+    ]
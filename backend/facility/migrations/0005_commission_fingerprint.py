@@ -0,0 +1,101 @@
+# Generated by Django 4.2.16 on 2026-10-17 17:40
+
+import hashlib
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, Value, When
+
+BATCH_SIZE = 1000
+MEMBER_FIELDS = (
+    'chairman_name', 'chairman_position', 'member1_name', 'member1_position',
+    'member2_name', 'member2_position', 'safety_officer_name',
+    'safety_officer_position',
+)
+
+
+def make_fingerprint(values):
+    """
+    Копия facility.models.make_fingerprint на момент миграции: миграция
+    не должна зависеть от последующих изменений кода моделей.
+    """
+    return hashlib.sha256('\x1f'.join(
+        ' '.join((value or '').split()).casefold() for value in values
+    ).encode()).hexdigest()
+
+
+def deduplicate_commissions(apps, schema_editor):
+    """
+    Заполняет отпечатки комиссий и объединяет комиссии с одинаковым
+    составом. Комиссии обрабатываются пакетами по возрастанию первичного
+    ключа, каждый пакет в своей транзакции: первая комиссия с данным
+    отпечатком остаётся, проверки остальных переносятся на неё, а сами
+    дубликаты удаляются. Отпечаток дубликата не записывается, поэтому
+    отпечатки в таблице не повторяются ни на одном шаге.
+    """
+    Commission = apps.get_model('facility', 'Commission')
+    Examination = apps.get_model('facility', 'Examination')
+    db_alias = schema_editor.connection.alias
+    commissions = Commission.objects.using(db_alias)
+    last_pk = 0
+    while True:
+        batch = list(
+            commissions.filter(pk__gt=last_pk).order_by('pk').only(
+                *MEMBER_FIELDS
+            )[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for commission in batch:
+            commission.fingerprint = make_fingerprint(
+                getattr(commission, name) for name in MEMBER_FIELDS
+            )
+        keep = dict(commissions.filter(
+            fingerprint__in={commission.fingerprint for commission in batch}
+        ).values_list('fingerprint', 'pk'))
+        unique = []
+        duplicates = {}
+        for commission in batch:
+            # При повторном запуске прерванной миграции комиссия может
+            # найти собственный отпечаток
+            keep_pk = keep.setdefault(commission.fingerprint, commission.pk)
+            if keep_pk != commission.pk:
+                duplicates[commission.pk] = keep_pk
+            else:
+                unique.append(commission)
+
+        with transaction.atomic(using=db_alias):
+            commissions.bulk_update(unique, ['fingerprint'])
+            if duplicates:
+                Examination.objects.using(db_alias).filter(
+                    commission_id__in=duplicates
+                ).update(commission_id=Case(*(
+                    When(commission_id=pk, then=Value(keep_pk))
+                    for pk, keep_pk in duplicates.items()
+                )))
+                commissions.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('facility', '0004_examination_organization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commission',
+            name='fingerprint',
+            field=models.CharField(editable=False, help_text='Хэш ФИО и должностей членов комиссии (заполняется автоматически)', max_length=64, null=True, verbose_name='Отпечаток состава комиссии'),
+        ),
+        migrations.RunPython(
+            deduplicate_commissions, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='commission',
+            name='fingerprint',
+            field=models.CharField(editable=False, help_text='Хэш ФИО и должностей членов комиссии (заполняется автоматически)', max_length=64, unique=True, verbose_name='Отпечаток состава комиссии'),
+        ),
+    ]
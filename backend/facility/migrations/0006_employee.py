@@ -0,0 +1,153 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def normalize_text(value):
+    """
+    Копия facility.models.normalize_text на момент миграции: миграция не
+    должна зависеть от последующих изменений кода моделей.
+    """
+    return ' '.join((value or '').split()).casefold()
+
+
+def link_examined(Employee, Examined, db_alias):
+    """
+    Связывает записи аттестуемых с сотрудниками: записи одной организации
+    с одинаковым ФИО (без учёта пробелов и регистра) относятся к одному
+    сотруднику. Записи обрабатываются пакетами по возрастанию первичного
+    ключа, каждый пакет в своей транзакции.
+    """
+    last_pk = 0
+    while True:
+        batch = list(
+            Examined.objects.using(db_alias).filter(
+                pk__gt=last_pk
+            ).order_by('pk').only('full_name', 'company_name', 'employee')[
+                :BATCH_SIZE
+            ]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        batch = [examined for examined in batch if examined.employee_id is None]
+        keys = {
+            (examined.company_name_id, normalize_text(examined.full_name))
+            for examined in batch
+        }
+        employees = {}
+        for pk, organization_id, name_key in Employee.objects.using(
+            db_alias
+        ).filter(
+            name_key__in={name_key for _, name_key in keys}
+        ).order_by('pk').values_list('pk', 'organization_id', 'name_key'):
+            employees.setdefault((organization_id, name_key), pk)
+
+        new_employees = {}
+        for examined in batch:
+            key = (examined.company_name_id, normalize_text(examined.full_name))
+            if key not in employees and key not in new_employees:
+                new_employees[key] = Employee(
+                    full_name=' '.join(examined.full_name.split()),
+                    name_key=key[1],
+                    organization_id=key[0],
+                )
+        with transaction.atomic(using=db_alias):
+            Employee.objects.using(db_alias).bulk_create(
+                new_employees.values()
+            )
+            employees.update(
+                (key, employee.pk) for key, employee in new_employees.items()
+            )
+            for examined in batch:
+                examined.employee_id = employees[(
+                    examined.company_name_id,
+                    normalize_text(examined.full_name)
+                )]
+            Examined.objects.using(db_alias).bulk_update(
+                batch, ['employee'], batch_size=1000
+            )
+
+
+def backfill_examinations(Examined, Examination, db_alias):
+    """
+    Заполняет сотрудника проверок из записи аттестуемого пакетами по
+    диапазонам первичного ключа.
+    """
+    employee = Subquery(
+        Examined.objects.using(db_alias).filter(
+            pk=OuterRef('examined_id')
+        ).values('employee')[:1]
+    )
+    last_pk = Examination.objects.using(db_alias).aggregate(
+        last_pk=Max('pk')
+    )['last_pk'] or 0
+    for start in range(0, last_pk, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            Examination.objects.using(db_alias).filter(
+                pk__gt=start,
+                pk__lte=start + BATCH_SIZE,
+                employee__isnull=True,
+            ).update(employee=employee)
+
+
+def link_employees(apps, schema_editor):
+    """Создаёт сотрудников по записям аттестуемых и связывает проверки."""
+    Employee = apps.get_model('facility', 'Employee')
+    Examined = apps.get_model('facility', 'Examined')
+    Examination = apps.get_model('facility', 'Examination')
+    db_alias = schema_editor.connection.alias
+    link_examined(Employee, Examined, db_alias)
+    backfill_examinations(Examined, Examination, db_alias)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('facility', '0005_commission_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Employee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(help_text='Введите фамилию, имя и отчество сотрудника', max_length=255, verbose_name='ФИО сотрудника')),
+                ('name_key', models.CharField(editable=False, help_text='ФИО без лишних пробелов в нижнем регистре (заполняется автоматически)', max_length=255, verbose_name='ФИО для поиска')),
+                ('organization', models.ForeignKey(blank=True, help_text='Организация сотрудника', null=True, on_delete=django.db.models.deletion.SET_NULL, to='users.organization', verbose_name='Организация')),
+            ],
+            options={
+                'verbose_name': 'Сотрудник',
+                'verbose_name_plural': 'Сотрудники',
+                'ordering': ['name_key'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'name_key'], name='employee_org_name_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddField(
+            model_name='examined',
+            name='employee',
+            field=models.ForeignKey(blank=True, help_text='Сотрудник, к которому относится запись (по умолчанию определяется по ФИО)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='examined', to='facility.employee', verbose_name='Сотрудник'),
+        ),
+        migrations.AddField(
+            model_name='examination',
+            name='employee',
+            field=models.ForeignKey(blank=True, help_text='Сотрудник аттестуемого (заполняется автоматически)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='examinations', to='facility.employee', verbose_name='Сотрудник'),
+        ),
+        migrations.RunPython(
+            link_employees, migrations.RunPython.noop, elidable=True
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['employee', '-current_check_date'], name='examination_employee_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0006_employee'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['employee', 'course', '-current_check_date'], name='examination_emp_course_idx'),
+        ),
+    ]
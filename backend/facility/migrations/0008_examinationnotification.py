@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('facility', '0007_examination_emp_course_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExaminationNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_check_date', models.DateField(help_text='Дата следующей проверки на момент уведомления', verbose_name='Дата следующей проверки')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата и время отправки')),
+                ('examination', models.ForeignKey(help_text='Проверка, о сроке которой отправлено уведомление', on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='facility.examination', verbose_name='Проверка')),
+                ('recipient', models.ForeignKey(blank=True, help_text='Пользователь, которому отправлено уведомление', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Уведомление о сроке проверки',
+                'verbose_name_plural': 'Уведомления о сроках проверок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='examinationnotification',
+            constraint=models.UniqueConstraint(fields=('examination', 'next_check_date'), name='notification_unique'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:44
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+from django.db.models import Exists, OuterRef, Q
+
+BATCH_SIZE = 1000
+
+
+def populate_latest(apps, schema_editor):
+    """
+    Заполняет таблицу текущих проверок пакетами сотрудников по возрастанию
+    первичного ключа, каждый пакет в своей транзакции. Копия
+    facility.latest.rebuild_latest_examinations на момент миграции.
+    """
+    Employee = apps.get_model('facility', 'Employee')
+    Examination = apps.get_model('facility', 'Examination')
+    LatestExamination = apps.get_model('facility', 'LatestExamination')
+    db_alias = schema_editor.connection.alias
+    newer = Examination.objects.using(db_alias).filter(
+        Q(current_check_date__gt=OuterRef('current_check_date'))
+        | Q(current_check_date=OuterRef('current_check_date'),
+            pk__gt=OuterRef('pk')),
+        employee=OuterRef('employee'),
+        course=OuterRef('course'),
+    )
+    last_pk = 0
+    while True:
+        employee_ids = list(
+            Employee.objects.using(db_alias).filter(
+                pk__gt=last_pk
+            ).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not employee_ids:
+            return
+        last_pk = employee_ids[-1]
+        current = [
+            LatestExamination(
+                employee_id=employee_id,
+                course_id=course_id,
+                examination_id=examination_id,
+                organization_id=organization_id,
+                next_check_date=next_check_date,
+            )
+            for examination_id, employee_id, course_id, organization_id,
+            next_check_date in Examination.objects.using(db_alias).filter(
+                ~Exists(newer), employee__in=employee_ids
+            ).values_list(
+                'pk', 'employee', 'course', 'organization', 'next_check_date'
+            )
+        ]
+        with transaction.atomic(using=db_alias):
+            LatestExamination.objects.using(db_alias).bulk_create(
+                current,
+                update_conflicts=True,
+                unique_fields=['employee', 'course'],
+                update_fields=[
+                    'examination', 'organization', 'next_check_date'
+                ],
+            )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('facility', '0008_examinationnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestExamination',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_check_date', models.DateField(verbose_name='Дата проведения следующей проверки')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='facility.course', verbose_name='Программа обучения')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_examinations', to='facility.employee', verbose_name='Сотрудник')),
+                ('examination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest', to='facility.examination', verbose_name='Проверка')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='users.organization', verbose_name='Организация')),
+            ],
+            options={
+                'verbose_name': 'Текущая проверка сотрудника',
+                'verbose_name_plural': 'Текущие проверки сотрудников',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='latestexamination',
+            constraint=models.UniqueConstraint(fields=('employee', 'course'), name='latest_unique'),
+        ),
+        migrations.RunPython(
+            populate_latest, migrations.RunPython.noop, elidable=True
+        ),
+        migrations.AddIndex(
+            model_name='latestexamination',
+            index=models.Index(fields=['organization', 'next_check_date'], name='latest_org_next_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='latestexamination',
+            index=models.Index(fields=['next_check_date'], name='latest_next_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0009_latestexamination'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', 'current_check_date'], name='examination_org_current_idx'),
+        ),
+    ]
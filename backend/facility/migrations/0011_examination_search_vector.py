@@ -0,0 +1,131 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:13
+
+from functools import reduce
+from operator import add
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, transaction
+from django.db.models import Func, Max, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Replace
+
+BATCH_SIZE = 10000
+
+# Копии facility.search.SEARCH_TABLE, SEARCH_CONFIG и SEARCH_FIELDS на
+# момент миграции: миграция не должна зависеть от последующих изменений
+SEARCH_TABLE = 'facility_examination_search'
+SEARCH_CONFIG = 'russian'
+SEARCH_FIELDS = (
+    ('examined__full_name', 'A'),
+    ('protocol_number', 'A'),
+    ('examined__position', 'B'),
+    ('examined__brigade', 'B'),
+    ('course__course_name', 'B'),
+    ('commission__chairman_name', 'C'),
+    ('commission__member1_name', 'C'),
+    ('commission__member2_name', 'C'),
+    ('commission__safety_officer_name', 'C'),
+)
+
+
+def create_search_table(apps, schema_editor):
+    """Создаёт таблицу FTS5 поисковых документов в SQLite."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING '
+            f"fts5(document, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    """Удаляет таблицу FTS5 поисковых документов в SQLite."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def fill_search_documents(apps, schema_editor):
+    """
+    Заполняет поисковые документы проверок пакетами по диапазонам
+    первичного ключа, каждый пакет в своей транзакции: в PostgreSQL —
+    столбец search_vector, в SQLite — таблицу FTS5.
+    """
+    Examination = apps.get_model('facility', 'Examination')
+    connection = schema_editor.connection
+    db_alias = connection.alias
+    if connection.vendor == 'postgresql':
+        document = Subquery(
+            Examination.objects.using(db_alias).filter(
+                pk=OuterRef('pk')
+            ).annotate(document=reduce(add, (
+                SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+                for field, weight in SEARCH_FIELDS
+            ))).values('document')[:1]
+        )
+    else:
+        document = Func(
+            *(Coalesce(field, Value('')) for field, _ in SEARCH_FIELDS),
+            template='%(expressions)s', arg_joiner=" || ' ' || ",
+            output_field=TextField()
+        )
+        for letter, replacement in (('ё', 'е'), ('Ё', 'Е')):
+            document = Replace(
+                document, Value(letter), Value(replacement),
+                output_field=TextField()
+            )
+    last_pk = Examination.objects.using(db_alias).aggregate(
+        last_pk=Max('pk')
+    )['last_pk'] or 0
+    for start in range(0, last_pk, BATCH_SIZE):
+        batch = Examination.objects.using(db_alias).filter(
+            pk__gt=start, pk__lte=start + BATCH_SIZE
+        )
+        with transaction.atomic(using=db_alias):
+            if connection.vendor == 'postgresql':
+                batch.update(search_vector=document)
+                continue
+            sql, params = batch.annotate(document=document).values_list(
+                'pk', 'document'
+            ).order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, document) '
+                    f'{sql}',
+                    params
+                )
+
+
+def create_search_index(apps, schema_editor):
+    """Создаёт индекс GIN поисковых документов в PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS examination_search_idx ON '
+            'facility_examination USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    """Удаляет индекс GIN поисковых документов в PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS examination_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('facility', '0010_examination_org_current_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examination',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый документ'),
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+        migrations.RunPython(
+            fill_search_documents, migrations.RunPython.noop, elidable=True
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0011_examination_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='examination',
+            name='commission',
+            field=models.ForeignKey(help_text='Комиссия, проводящая проверку', on_delete=django.db.models.deletion.PROTECT, to='facility.commission', verbose_name='Комиссия'),
+        ),
+    ]
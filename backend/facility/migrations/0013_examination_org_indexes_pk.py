@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0012_examination_commission_protect'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='examination',
+            name='examination_org_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='examination',
+            name='examination_org_next_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='examination',
+            name='examination_org_current_idx',
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='examination_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', 'next_check_date', 'id'], name='examination_org_next_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examination',
+            index=models.Index(fields=['organization', 'current_check_date', 'id'], name='examination_org_current_idx'),
+        ),
+    ]
@@ -1,12 +1,58 @@
 """
 Модуль моделей управления проверками.
 """
+import hashlib
+
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.db import models
 from users.models import Organization, User
 
 
+def normalize_text(value):
+    """
+    Приводит ФИО или должность к виду для сравнения: без лишних пробелов и
+    без учёта регистра.
+    """
+    return ' '.join((value or '').split()).casefold()
+
+
+def make_fingerprint(values):
+    """Возвращает отпечаток состава комиссии по значениям MEMBER_FIELDS."""
+    return hashlib.sha256(
+        '\x1f'.join(normalize_text(value) for value in values).encode()
+    ).hexdigest()
+
+
+class CommissionManager(models.Manager):
+    """Менеджер комиссий с поиском по составу."""
+
+    def get_or_create_by_members(self, **members):
+        """
+        Возвращает комиссию с тем же составом или создаёт новую. Составы
+        сравниваются по отпечатку, поэтому различия в пробелах и регистре
+        не приводят к созданию новой записи.
+        """
+        return self.get_or_create(
+            fingerprint=make_fingerprint(
+                members.get(name) for name in Commission.MEMBER_FIELDS
+            ),
+            defaults=members
+        )
+
+
 class Commission(models.Model):
-    """Модель комиссии."""
+    """
+    Модель комиссии. Один и тот же состав комиссии хранится одной записью,
+    общей для всех проверок, которые она проводила: уникальный отпечаток
+    состава (fingerprint) вычисляется при сохранении.
+    """
+    MEMBER_FIELDS = (
+        'chairman_name', 'chairman_position', 'member1_name',
+        'member1_position', 'member2_name', 'member2_position',
+        'safety_officer_name', 'safety_officer_position',
+    )
+
     chairman_name = models.CharField(
         max_length=255,
         verbose_name="ФИО председателя комиссии",
@@ -48,17 +94,136 @@ class Commission(models.Model):
         verbose_name="Должность ответственного за электробезопасность",
         help_text="Введите должность ответственного за электробезопасность"
     )
+    fingerprint = models.CharField(
+        max_length=64,
+        unique=True,
+        editable=False,
+        verbose_name="Отпечаток состава комиссии",
+        help_text="Хэш ФИО и должностей членов комиссии "
+                  "(заполняется автоматически)"
+    )
+
+    objects = CommissionManager()
 
     class Meta:
         verbose_name = "Комиссия"
         verbose_name_plural = "Комиссии"
 
+    def get_fingerprint(self):
+        """Вычисляет отпечаток текущего состава комиссии."""
+        return make_fingerprint(
+            getattr(self, name) for name in self.MEMBER_FIELDS
+        )
+
+    def clean(self):
+        """Проверяет, что такого же состава комиссии ещё нет."""
+        if Commission.objects.filter(
+            fingerprint=self.get_fingerprint()
+        ).exclude(pk=self.pk).exists():
+            raise ValidationError("Комиссия с таким составом уже существует.")
+
+    def save(self, *args, **kwargs):
+        # bulk_create не вызывает save, поэтому при пакетной вставке
+        # отпечаток нужно заполнять явно
+        self.fingerprint = self.get_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fingerprint' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'fingerprint']
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Комиссия: {self.chairman_name}"
 
 
+class EmployeeManager(models.Manager):
+    """Менеджер сотрудников с поиском по ФИО."""
+
+    def get_for_name(self, organization_id, full_name):
+        """
+        Возвращает сотрудника организации с тем же ФИО (без учёта пробелов
+        и регистра) или создаёт нового. Из однофамильцев с полностью
+        совпадающим ФИО выбирается созданный первым.
+        """
+        name_key = normalize_text(full_name)
+        employee = self.filter(
+            organization_id=organization_id, name_key=name_key
+        ).order_by('pk').first()
+        if employee is None:
+            employee = self.create(
+                organization_id=organization_id, full_name=full_name
+            )
+        return employee
+
+
+class Employee(models.Model):
+    """
+    Модель сотрудника — аттестуемого, общего для всех его проверок.
+    Данные аттестуемого на момент каждой проверки (должность, группа,
+    стаж) хранятся в Examined, который ссылается на сотрудника, поэтому
+    история проверок сотрудника выбирается по индексу, а не по совпадению
+    ФИО.
+    """
+    full_name = models.CharField(
+        max_length=255,
+        verbose_name="ФИО сотрудника",
+        help_text="Введите фамилию, имя и отчество сотрудника"
+    )
+    name_key = models.CharField(
+        max_length=255,
+        editable=False,
+        verbose_name="ФИО для поиска",
+        help_text="ФИО без лишних пробелов в нижнем регистре "
+                  "(заполняется автоматически)"
+    )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Организация",
+        help_text="Организация сотрудника"
+    )
+
+    objects = EmployeeManager()
+
+    class Meta:
+        verbose_name = "Сотрудник"
+        verbose_name_plural = "Сотрудники"
+        ordering = ['name_key']
+        indexes = [
+            # Классы операторов нужны PostgreSQL для поиска по началу
+            # строки (LIKE 'текст%') при любой сортировке базы; в SQLite
+            # они не используются
+            models.Index(
+                fields=['organization', 'name_key'],
+                name='employee_org_name_idx',
+                opclasses=['int8_ops', 'varchar_pattern_ops']
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_text(self.full_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name_key' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'name_key']
+        super().save(*args, **kwargs)
+
+    def get_latest_examination(self):
+        """Возвращает последнюю по дате проверку сотрудника."""
+        return self.examinations.select_related('examined').order_by(
+            '-current_check_date', '-pk'
+        ).first()
+
+    def __str__(self):
+        return self.full_name
+
+
 class Examined(models.Model):
-    """Модель аттестуемого."""
+    """
+    Модель аттестуемого: данные сотрудника на момент проверки. Каждая
+    проверка хранит свою запись, чтобы документы прежних проверок
+    заполнялись прежними должностью и группой.
+    """
     full_name = models.CharField(
         max_length=255,
         verbose_name="ФИО проверяемого",
@@ -106,16 +271,36 @@ class Examined(models.Model):
         verbose_name="Пользователь",
         help_text="Пользователь, создавший запись"
     )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='examined',
+        verbose_name="Сотрудник",
+        help_text="Сотрудник, к которому относится запись "
+                  "(по умолчанию определяется по ФИО)"
+    )
 
     class Meta:
         verbose_name = "Аттестуемый"
         verbose_name_plural = "Аттестуемые"
         ordering = ['brigade']
+        indexes = [
+            models.Index(
+                fields=['company_name', 'brigade'],
+                name='examined_company_brigade_idx'
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.pk:  # on creation
             self.company_name = (
                 self.user.organization) if self.user.organization else None
+            if self.employee_id is None:
+                self.employee = Employee.objects.get_for_name(
+                    self.company_name_id, self.full_name
+                )
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -203,7 +388,7 @@ class Examination(models.Model):
 
     commission = models.ForeignKey(
         Commission,
-        on_delete=models.CASCADE,
+        on_delete=models.PROTECT,
         verbose_name="Комиссия",
         help_text="Комиссия, проводящая проверку"
     )
@@ -225,11 +410,180 @@ class Examination(models.Model):
         verbose_name="Программа обучения",
         help_text="Выберите программу обучения"
     )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Организация",
+        help_text="Организация аттестуемого (заполняется автоматически)"
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='examinations',
+        verbose_name="Сотрудник",
+        help_text="Сотрудник аттестуемого (заполняется автоматически)"
+    )
+    # Поисковый документ проверки в PostgreSQL (см. модуль search). Индекс
+    # GIN создаётся миграцией только в PostgreSQL, а в SQLite документы
+    # хранятся в отдельной таблице FTS5.
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый документ"
+    )
 
     class Meta:
         verbose_name = "Проверка"
         verbose_name_plural = "Проверки"
         ordering = ['current_check_date', 'next_check_date']
+        indexes = [
+            models.Index(
+                fields=['-created_at'], name='examination_created_idx'
+            ),
+            models.Index(
+                fields=['current_check_date'], name='examination_current_idx'
+            ),
+            models.Index(
+                fields=['next_check_date'], name='examination_next_idx'
+            ),
+            models.Index(
+                fields=['protocol_number'], name='examination_protocol_idx'
+            ),
+            models.Index(
+                fields=['organization', '-created_at', '-id'],
+                name='examination_org_created_idx'
+            ),
+            models.Index(
+                fields=['organization', 'next_check_date', 'id'],
+                name='examination_org_next_idx'
+            ),
+            models.Index(
+                fields=['organization', 'current_check_date', 'id'],
+                name='examination_org_current_idx'
+            ),
+            models.Index(
+                fields=['employee', '-current_check_date'],
+                name='examination_employee_idx'
+            ),
+            models.Index(
+                fields=['employee', 'course', '-current_check_date'],
+                name='examination_emp_course_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.pk:  # on creation
+            if self.organization_id is None:
+                self.organization_id = self.examined.company_name_id
+            if self.employee_id is None:
+                self.employee_id = self.examined.employee_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Проверка {self.protocol_number}"
+
+
+class LatestExamination(models.Model):
+    """
+    Модель текущей проверки сотрудника по программе обучения: последней
+    по дате проверки из проверок сотрудника по этой программе. Таблица
+    поддерживается при изменении проверок (см. модуль latest) и хранит
+    организацию и дату следующей проверки текущей проверки, поэтому
+    сроки проверок выбираются по её индексам без обхода истории.
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='latest_examinations',
+        verbose_name="Сотрудник"
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        verbose_name="Программа обучения"
+    )
+    examination = models.ForeignKey(
+        Examination,
+        on_delete=models.CASCADE,
+        related_name='latest',
+        verbose_name="Проверка"
+    )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Организация"
+    )
+    next_check_date = models.DateField(
+        verbose_name="Дата проведения следующей проверки"
+    )
+
+    class Meta:
+        verbose_name = "Текущая проверка сотрудника"
+        verbose_name_plural = "Текущие проверки сотрудников"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee', 'course'], name='latest_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['organization', 'next_check_date'],
+                name='latest_org_next_idx'
+            ),
+            models.Index(fields=['next_check_date'], name='latest_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Текущая проверка {self.examination_id}"
+
+
+class ExaminationNotification(models.Model):
+    """
+    Модель уведомления о приближении срока следующей проверки. Запись
+    хранит дату следующей проверки, о которой отправлено уведомление,
+    поэтому при очередном запуске рассылки (см. модуль notifications)
+    уведомление повторно не отправляется, а после изменения даты
+    отправляется снова.
+    """
+    examination = models.ForeignKey(
+        Examination,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Проверка",
+        help_text="Проверка, о сроке которой отправлено уведомление"
+    )
+    next_check_date = models.DateField(
+        verbose_name="Дата следующей проверки",
+        help_text="Дата следующей проверки на момент уведомления"
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Получатель",
+        help_text="Пользователь, которому отправлено уведомление"
+    )
+    sent_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата и время отправки"
+    )
+
+    class Meta:
+        verbose_name = "Уведомление о сроке проверки"
+        verbose_name_plural = "Уведомления о сроках проверок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['examination', 'next_check_date'],
+                name='notification_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Уведомление о проверке {self.examination_id}"
@@ -0,0 +1,145 @@
+"""
+Модуль рассылки уведомлений о приближении сроков проверок.
+
+При каждом запуске рассылки одним запросом выбираются текущие проверки
+(см. модуль latest), срок следующей проверки которых наступает в
+ближайшие EXAMINATION_NOTIFY_DAYS дней и о которых ещё не отправлено
+уведомление. Выборка идёт по таблице LatestExamination с индексом
+latest_next_idx и ограничена окном рассылки, а отправленные уведомления
+исключаются по уникальному индексу ExaminationNotification, поэтому
+стоимость запуска не растёт вместе с историей проверок.
+
+Проверки группируются по автору записи: каждый автор получает одно
+письмо со списком своих проверок. Все письма запуска отправляются через
+одно соединение с почтовым сервером, а отправленные уведомления
+записываются в ExaminationNotification, чтобы не повторяться при
+следующем запуске.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import ExaminationNotification, LatestExamination
+
+SUBJECT = "Приближаются сроки проверок: {count}"
+
+
+class NotificationResult:
+    """
+    Результат рассылки уведомлений.
+
+    Атрибуты:
+        examinations (int): Количество проверок с наступающим сроком без
+            отправленного уведомления.
+        sent (int): Количество отправленных писем.
+        notified (int): Количество проверок, о которых отправлены письма.
+        skipped (int): Количество проверок, автор которых не указал
+            адрес электронной почты или заблокирован.
+    """
+
+    def __init__(self):
+        self.examinations = 0
+        self.sent = 0
+        self.notified = 0
+        self.skipped = 0
+
+
+def get_pending_examinations(today, days):
+    """
+    Возвращает текущие проверки сотрудников (LatestExamination) со сроком
+    следующей проверки от today до today + days, о которых ещё не
+    отправлено уведомление, вместе с проверкой, аттестуемым, автором
+    записи и программой обучения.
+    """
+    notified = ExaminationNotification.objects.filter(
+        examination=OuterRef('examination'),
+        next_check_date=OuterRef('next_check_date'),
+    )
+    return LatestExamination.objects.filter(
+        next_check_date__gte=today,
+        next_check_date__lte=today + timedelta(days=days),
+    ).filter(~Exists(notified)).select_related(
+        'examination__examined__user', 'examination__course'
+    ).order_by('next_check_date', 'examination')
+
+
+def group_by_recipient(examinations, result):
+    """
+    Группирует проверки по автору записи. Проверки авторов без адреса
+    электронной почты учитываются в result.skipped.
+    """
+    recipients = {}
+    for examination in examinations:
+        user = examination.examined.user
+        if not user.email or not user.is_active:
+            result.skipped += 1
+            continue
+        recipients.setdefault(user, []).append(examination)
+    return recipients
+
+
+def make_digest(user, examinations, today):
+    """Возвращает письмо автору записи со списком его проверок."""
+    return EmailMessage(
+        subject=SUBJECT.format(count=len(examinations)),
+        body=render_to_string('facility/emails/due_digest.txt', {
+            'user': user,
+            'examinations': examinations,
+            'today': today,
+        }),
+        to=[user.email],
+    )
+
+
+def send_notifications(today=None, days=None, dry_run=False,
+                       connection=None):
+    """
+    Отправляет авторам записей письма о проверках с наступающим сроком и
+    запоминает отправленные уведомления. При dry_run письма не
+    отправляются, а только подсчитываются. Если отправка прервалась
+    ошибкой, уведомления уже отправленных писем сохраняются.
+    """
+    today = today or timezone.localdate()
+    if days is None:
+        days = settings.EXAMINATION_NOTIFY_DAYS
+    result = NotificationResult()
+    examinations = [
+        latest.examination
+        for latest in get_pending_examinations(today, days)
+    ]
+    result.examinations = len(examinations)
+    recipients = group_by_recipient(examinations, result)
+    if dry_run:
+        result.sent = len(recipients)
+        result.notified = sum(map(len, recipients.values()))
+        return result
+    if not recipients:
+        return result
+
+    notifications = []
+    connection = connection or get_connection()
+    try:
+        with connection:
+            for user, user_examinations in recipients.items():
+                connection.send_messages([
+                    make_digest(user, user_examinations, today)
+                ])
+                result.sent += 1
+                result.notified += len(user_examinations)
+                notifications.extend(
+                    ExaminationNotification(
+                        examination=examination,
+                        next_check_date=examination.next_check_date,
+                        recipient=user,
+                    )
+                    for examination in user_examinations
+                )
+    finally:
+        ExaminationNotification.objects.bulk_create(
+            notifications, ignore_conflicts=True
+        )
+    return result
@@ -0,0 +1,210 @@
+"""
+Модуль ключевой (курсорной) пагинации списка проверок.
+
+В отличие от стандартного Paginator, страница выбирается условием по
+значению поля сортировки и первичному ключу последней показанной записи,
+а не смещением OFFSET, поэтому стоимость запроса любой страницы равна
+стоимости первой. Общее количество записей не требуется; при
+необходимости его можно получить приближённо из оценки планировщика
+PostgreSQL.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(ordering, values):
+    """Кодирует позицию в списке в строку курсора."""
+    data = json.dumps({'o': ordering, 'v': values}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """
+    Декодирует строку курсора. Возвращает None, если курсор повреждён или
+    создан для другой сортировки.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data['o'] != ordering:
+            return None
+        value, pk, direction = data['v']
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+    if direction not in ('next', 'previous'):
+        return None
+    return value, pk, direction
+
+
+def approximate_count(queryset, threshold=10000):
+    """
+    Возвращает количество записей. В PostgreSQL используется оценка
+    планировщика (EXPLAIN), а точный COUNT(*) выполняется, только если
+    оценка меньше threshold. В остальных СУБД выполняется точный подсчёт.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.explain(format='json'))
+    estimate = plan[0]['Plan']['Plan Rows']
+    if estimate < threshold:
+        return queryset.count()
+    return estimate
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Постраничный пагинатор, получающий общее количество записей через
+    approximate_count.
+    """
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list)
+
+
+class CursorPage:
+    """
+    Страница ключевой пагинации. Не содержит ссылок на запрос, поэтому
+    может храниться в кэше.
+
+    Атрибуты:
+        object_list (list): Записи страницы.
+        next_cursor (str): Курсор следующей страницы или None.
+        previous_cursor (str): Курсор предыдущей страницы или None.
+        count (int): Общее (возможно, приближённое) количество записей
+            или None, если оно не запрашивалось.
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor,
+                 count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинатор, выбирающий страницы по значению поля сортировки и
+    первичному ключу.
+
+    Параметры:
+        queryset: Отфильтрованный список записей.
+        per_page (int): Количество записей на странице.
+        ordering (str): Поле сортировки, при убывании — с префиксом '-'.
+            Поле может быть связанным (например, 'course__course_name')
+            и не должно принимать значение NULL.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+
+    def get_value(self, obj):
+        """Возвращает значение поля сортировки записи."""
+        value = obj
+        for attr in self.field.split('__'):
+            value = getattr(value, attr)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def make_cursor(self, obj, direction):
+        return encode_cursor(
+            self.ordering, [self.get_value(obj), obj.pk, direction]
+        )
+
+    def get_position(self, cursor):
+        """
+        Возвращает позицию курсора (значение поля сортировки, первичный ключ
+        и направление) или None, если курсора нет, он повреждён или его
+        значения не подходят к полю сортировки и первичному ключу.
+        """
+        position = decode_cursor(cursor, self.ordering) if cursor else None
+        if position is None:
+            return None
+        value, pk = position[:2]
+        try:
+            # Значения приводятся к типам полей при построении условия
+            self.queryset.filter(**{f'{self.field}__gt': value, 'pk__gt': pk})
+        except (ValidationError, ValueError, TypeError):
+            return None
+        return position
+
+    def get_queryset(self, position):
+        """
+        Возвращает запрос записей после позиции курсора в порядке обхода.
+        Для перехода назад запрос выполняется в обратном порядке.
+
+        Кроме условия по паре (значение поля, первичный ключ) добавляется
+        избыточное нестрогое условие по полю сортировки: без него условие
+        с OR не используется как граница диапазона индекса, и база
+        просматривает и сортирует все записи до позиции курсора.
+        """
+        forward = position is None or position[2] == 'next'
+        descending = self.descending == forward
+        queryset = self.queryset.order_by(
+            f'-{self.field}' if descending else self.field,
+            '-pk' if descending else 'pk'
+        )
+        if position is None:
+            return queryset
+        value, pk = position[:2]
+        lookup = 'lt' if descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.field}__{lookup}e': value}),
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, cursor=None, with_count=False):
+        """
+        Возвращает страницу, следующую за курсором (или предшествующую ему
+        для курсора предыдущей страницы). Без курсора или с повреждённым
+        курсором возвращается первая страница.
+        """
+        position = self.get_position(cursor)
+        forward = position is None or position[2] == 'next'
+        queryset = self.get_queryset(position)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        has_next = has_more if forward else True
+        has_previous = position is not None and (forward or has_more)
+        return CursorPage(
+            rows,
+            self.make_cursor(rows[-1], 'next')
+            if rows and has_next else None,
+            self.make_cursor(rows[0], 'previous')
+            if rows and has_previous else None,
+            approximate_count(self.queryset) if with_count else None,
+        )
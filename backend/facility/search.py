@@ -0,0 +1,153 @@
+"""
+Модуль полнотекстового поиска проверок.
+
+Поиск идёт одной строкой по ФИО, должности и цеху (участку) аттестуемого,
+номеру протокола, наименованию программы обучения и ФИО членов комиссии.
+Для каждой проверки хранится поисковый документ из этих полей:
+
+- в PostgreSQL — столбец Examination.search_vector (tsvector с русской
+  конфигурацией и весами полей) с индексом GIN examination_search_idx,
+  запрос разбирается функцией websearch_to_tsquery;
+- в SQLite, используемой при локальной разработке, — таблица FTS5
+  facility_examination_search, строки которой совпадают с проверками по
+  rowid; слова запроса ищутся по началу слова, что заменяет морфологию.
+
+Документы обновляются одним запросом на набор проверок обработчиками
+сигналов при изменении проверок, аттестуемых, программ обучения и
+комиссий (см. модуль signals), а при массовой записи в обход сигналов
+(импорт, заполнение базы) — явным вызовом update_search_documents.
+"""
+from functools import reduce
+from operator import add
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Func, OuterRef, Subquery, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Replace
+
+SEARCH_TABLE = 'facility_examination_search'
+SEARCH_CONFIG = 'russian'
+YO_REPLACEMENTS = (('ё', 'е'), ('Ё', 'Е'))
+
+# Поля поискового документа проверки и их вес в PostgreSQL
+SEARCH_FIELDS = (
+    ('examined__full_name', 'A'),
+    ('protocol_number', 'A'),
+    ('examined__position', 'B'),
+    ('examined__brigade', 'B'),
+    ('course__course_name', 'B'),
+    ('commission__chairman_name', 'C'),
+    ('commission__member1_name', 'C'),
+    ('commission__member2_name', 'C'),
+    ('commission__safety_officer_name', 'C'),
+)
+# Поля моделей, при изменении которых документ проверки обновляется
+EXAMINATION_SEARCH_FIELDS = frozenset({
+    'protocol_number', 'examined', 'course', 'commission',
+})
+EXAMINED_SEARCH_FIELDS = frozenset({'full_name', 'position', 'brigade'})
+COURSE_SEARCH_FIELDS = frozenset({'course_name'})
+COMMISSION_SEARCH_FIELDS = frozenset({
+    'chairman_name', 'member1_name', 'member2_name', 'safety_officer_name',
+})
+
+
+def is_postgresql(using):
+    """Проверяет, является ли база данных using базой PostgreSQL."""
+    return connections[using].vendor == 'postgresql'
+
+
+def get_search_vector():
+    """Возвращает выражение поискового документа проверки PostgreSQL."""
+    return reduce(add, (
+        SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        for field, weight in SEARCH_FIELDS
+    ))
+
+
+def get_search_text():
+    """
+    Возвращает выражение текста поискового документа проверки SQLite.
+    Токенизатор FTS5 не отождествляет «ё» и «е», поэтому «ё» заменяется
+    в документе и в запросе (см. make_match_query).
+    """
+    text = Func(
+        *(Coalesce(field, Value('')) for field, _ in SEARCH_FIELDS),
+        template='%(expressions)s', arg_joiner=" || ' ' || ",
+        output_field=TextField()
+    )
+    for letter, replacement in YO_REPLACEMENTS:
+        text = Replace(
+            text, Value(letter), Value(replacement), output_field=TextField()
+        )
+    return text
+
+
+def update_search_documents(queryset):
+    """
+    Обновляет поисковые документы проверок набора queryset одним запросом
+    к базе: в PostgreSQL — обновлением столбца search_vector из связанных
+    записей, в SQLite — вставкой с заменой в таблицу FTS5.
+    """
+    if is_postgresql(queryset.db):
+        model = queryset.model
+        queryset.update(search_vector=Subquery(
+            model.objects.filter(pk=OuterRef('pk')).annotate(
+                document=get_search_vector()
+            ).values('document')[:1]
+        ))
+        return
+    sql, params = queryset.annotate(
+        document=get_search_text()
+    ).values_list('pk', 'document').order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, document) {sql}',
+            params
+        )
+
+
+def delete_search_documents(pks, using=DEFAULT_DB_ALIAS):
+    """
+    Удаляет поисковые документы удалённых проверок. В PostgreSQL документ
+    удаляется вместе со строкой проверки.
+    """
+    if is_postgresql(using) or not pks:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN '
+            f'({", ".join(["%s"] * len(pks))})',
+            list(pks)
+        )
+
+
+def make_match_query(text):
+    """
+    Возвращает запрос FTS5 по словам текста: каждое слово ищется как
+    начало слова документа, кавычки внутри слов экранируются, «ё»
+    заменяется на «е».
+    """
+    for letter, replacement in YO_REPLACEMENTS:
+        text = text.replace(letter, replacement)
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in text.split()
+    )
+
+
+def search_examinations(queryset, text):
+    """
+    Оставляет в наборе проверки, поисковый документ которых содержит все
+    слова текста. Пустой текст набор не меняет.
+    """
+    if not text or not text.split():
+        return queryset
+    if is_postgresql(queryset.db):
+        return queryset.filter(search_vector=SearchQuery(
+            text, config=SEARCH_CONFIG, search_type='websearch'
+        ))
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        [make_match_query(text)]
+    ))
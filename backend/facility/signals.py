@@ -0,0 +1,172 @@
+"""
+Модуль обработчиков сигналов, сбрасывающих кэш списка проверок после
+фиксации транзакции при изменении проверок, аттестуемых, комиссий и
+программ обучения, в том числе через Django Admin, пересчитывающих текущие
+проверки сотрудников при изменении проверок (см. модуль latest) и
+обновляющих поисковые документы проверок (см. модуль search).
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_generation_on_commit
+from .latest import LATEST_FIELDS, refresh_latest_examinations
+from .models import Commission, Course, Examination, Examined
+from .search import (COMMISSION_SEARCH_FIELDS, COURSE_SEARCH_FIELDS,
+                     EXAMINATION_SEARCH_FIELDS, EXAMINED_SEARCH_FIELDS,
+                     delete_search_documents, update_search_documents)
+
+# Поля, прежние значения которых нужны обработчикам после сохранения:
+# организация — для сброса кэша, сотрудник — для пересчёта его текущих
+# проверок
+PREVIOUS_FIELDS = {
+    Examined: ('company_name',),
+    Examination: ('organization', 'employee'),
+}
+# Поля связанных с проверкой моделей, входящие в поисковый документ
+# проверки, и связь проверки с моделью
+RELATED_SEARCH_FIELDS = {
+    Examined: (EXAMINED_SEARCH_FIELDS, 'examined'),
+    Course: (COURSE_SEARCH_FIELDS, 'course'),
+    Commission: (COMMISSION_SEARCH_FIELDS, 'commission'),
+}
+
+
+@receiver(pre_save, sender=Examined)
+@receiver(pre_save, sender=Examination)
+def remember_previous_values(sender, instance, update_fields, **kwargs):
+    """
+    Запоминает организацию, к которой запись относилась до изменения,
+    чтобы сбросить кэш и прежней, и новой организации, а для проверки — и
+    прежнего сотрудника. Если сохраняются только поля, не включающие
+    организацию и сотрудника, они не могли измениться и запрос не
+    выполняется.
+    """
+    instance._previous_organization_id = None
+    instance._previous_employee_id = None
+    fields = PREVIOUS_FIELDS[sender]
+    if instance.pk is None or (
+            update_fields is not None and update_fields.isdisjoint(fields)):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list(
+        *fields
+    ).first()
+    if previous is not None:
+        instance._previous_organization_id = previous[0]
+        if sender is Examination:
+            instance._previous_employee_id = previous[1]
+
+
+@receiver(post_save, sender=Examination)
+@receiver(post_delete, sender=Examination)
+def invalidate_examination(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш списка при изменении или удалении проверки после
+    фиксации транзакции.
+    """
+    bump_generation_on_commit(
+        instance.organization_id,
+        getattr(instance, '_previous_organization_id', None)
+    )
+
+
+@receiver(post_save, sender=Examination)
+def refresh_latest_on_save(sender, instance, update_fields, **kwargs):
+    """
+    Пересчитывает текущие проверки сотрудника проверки и прежнего
+    сотрудника, если изменились поля, от которых они зависят.
+    """
+    if update_fields is not None and update_fields.isdisjoint(LATEST_FIELDS):
+        return
+    refresh_latest_examinations({
+        instance.employee_id,
+        getattr(instance, '_previous_employee_id', None),
+    })
+
+
+@receiver(post_delete, sender=Examination)
+def refresh_latest_on_delete(sender, instance, **kwargs):
+    """Пересчитывает текущие проверки сотрудника удалённой проверки."""
+    refresh_latest_examinations({instance.employee_id})
+
+
+@receiver(post_save, sender=Examination)
+def update_search_on_save(sender, instance, update_fields, using, **kwargs):
+    """
+    Обновляет поисковый документ проверки, если изменились поля, от
+    которых он зависит.
+    """
+    if update_fields is not None and update_fields.isdisjoint(
+            EXAMINATION_SEARCH_FIELDS):
+        return
+    update_search_documents(
+        Examination.objects.using(using).filter(pk=instance.pk)
+    )
+
+
+@receiver(post_delete, sender=Examination)
+def delete_search_on_delete(sender, instance, using, **kwargs):
+    """Удаляет поисковый документ удалённой проверки."""
+    delete_search_documents([instance.pk], using)
+
+
+@receiver(post_save, sender=Examined)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Commission)
+def update_related_search(sender, instance, created, update_fields, using,
+                          **kwargs):
+    """
+    Обновляет поисковые документы проверок изменённого аттестуемого,
+    программы обучения или комиссии, если изменились поля, входящие в
+    документ. Новая запись ещё не связана с проверками.
+    """
+    fields, lookup = RELATED_SEARCH_FIELDS[sender]
+    if created or (
+            update_fields is not None and update_fields.isdisjoint(fields)):
+        return
+    update_search_documents(
+        Examination.objects.using(using).filter(**{lookup: instance})
+    )
+
+
+@receiver(post_save, sender=Examined)
+def invalidate_examined(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш списка при изменении аттестуемого. Новый аттестуемый
+    ещё не связан с проверками, а удаление каскадно удаляет проверки,
+    обработчик которых сбрасывает кэш сам.
+    """
+    if created:
+        return
+    bump_generation_on_commit(
+        instance.company_name_id,
+        getattr(instance, '_previous_organization_id', None)
+    )
+
+
+@receiver(post_save, sender=Commission)
+def invalidate_commission(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш списка организаций, проверки которых проводила
+    изменённая комиссия.
+    """
+    if created:
+        return
+    organization_ids = Examination.objects.filter(
+        commission=instance
+    ).values_list('organization', flat=True).distinct()
+    bump_generation_on_commit(*organization_ids)
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш списка, сводки и статистики организаций, проверки
+    которых относятся к изменённой программе обучения: отчёты группируют
+    проверки по её наименованию.
+    """
+    if created:
+        return
+    organization_ids = Examination.objects.filter(
+        course=instance
+    ).values_list('organization', flat=True).distinct()
+    bump_generation_on_commit(*organization_ids)
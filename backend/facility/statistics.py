@@ -0,0 +1,186 @@
+"""
+Модуль статистики проверок организации.
+
+Статистика показывает количество проверок по месяцам за последние
+STATISTICS_MONTHS месяцев, по программам обучения и по цехам (участкам),
+а также периодичность проверок: сколько проверок повторные, средний
+фактический интервал между предыдущей и текущей проверкой и средний срок
+до следующей проверки, в днях. Все числа вычисляются агрегатными
+запросами в базе данных (по одному запросу на таблицу статистики), поэтому
+объём передаваемых данных не зависит от количества проверок. Проверки по
+месяцам выбираются по индексу examination_org_current_idx (организация и
+дата текущей проверки).
+
+Вычисленная статистика хранится в кэше под ключом с поколением
+организации и текущим месяцем (см. модуль caching), поэтому она
+пересчитывается после изменения проверок организации и при смене месяца.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, FloatField, Func, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .caching import get_statistics_key
+from .filters import get_visible_examinations
+
+
+class DaysBetween(Func):
+    """
+    Количество дней от второй даты до первой. В PostgreSQL разность дат
+    уже выражается в днях, а в SQLite она вычисляется встроенной функцией
+    julianday вместо функции Python, которой Django вычитает даты: агрегат
+    по сотням тысяч строк иначе вызывает её для каждой строки.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    arity = 2
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        clone = self.copy()
+        clone.set_source_expressions([
+            Func(expression, function='julianday')
+            for expression in self.get_source_expressions()
+        ])
+        return super(DaysBetween, clone).as_sql(
+            compiler, connection, **extra_context
+        )
+
+
+# Агрегаты таблиц статистики: количество проверок и сотрудников
+COUNTS = {
+    'count': Count('pk'),
+    'employees': Count('employee', distinct=True),
+}
+# Агрегаты периодичности проверок
+CADENCE = {
+    'renewals': Count('pk', filter=Q(previous_check_date__isnull=False)),
+    'interval': Avg(DaysBetween('current_check_date', 'previous_check_date')),
+    'validity': Avg(DaysBetween('next_check_date', 'current_check_date')),
+}
+
+
+def add_months(day, months):
+    """
+    Возвращает первый день месяца, отстоящего от месяца даты day на months
+    месяцев.
+    """
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_monthly_counts(queryset, today, months):
+    """
+    Возвращает запрос количества проверок и сотрудников по месяцам текущей
+    проверки за последние months месяцев, включая месяц даты today.
+    """
+    return queryset.filter(
+        current_check_date__gte=add_months(today, 1 - months),
+        current_check_date__lt=add_months(today, 1),
+    ).annotate(
+        month=TruncMonth('current_check_date')
+    ).values('month').annotate(**COUNTS).order_by()
+
+
+def get_months(queryset, today, months):
+    """
+    Возвращает количество проверок и сотрудников по месяцам текущей
+    проверки за последние months месяцев, включая месяцы без проверок.
+    """
+    rows = {
+        row['month']: row
+        for row in get_monthly_counts(queryset, today, months)
+    }
+    return [
+        rows.get(month, {'month': month, 'count': 0, 'employees': 0})
+        for month in (add_months(today, index)
+                      for index in range(1 - months, 1))
+    ]
+
+
+def weighted_average(rows, field, weight):
+    """
+    Возвращает среднее значений field строк статистики, взвешенное
+    количеством weight, по которому вычислено каждое значение, или None,
+    если значений нет.
+    """
+    rows = [row for row in rows if row[field] is not None]
+    total = sum(row[weight] for row in rows)
+    if not total:
+        return None
+    return sum(row[field] * row[weight] for row in rows) / total
+
+
+def get_totals(queryset, courses):
+    """
+    Возвращает итоги статистики. Количество проверок и средние значения
+    складываются из строк программ обучения, поэтому отдельный запрос
+    нужен только для количества сотрудников: один сотрудник может
+    проходить проверки по нескольким программам.
+    """
+    return {
+        'count': sum(row['count'] for row in courses),
+        'employees': queryset.aggregate(
+            employees=COUNTS['employees']
+        )['employees'],
+        'renewals': sum(row['renewals'] for row in courses),
+        'interval': weighted_average(courses, 'interval', 'renewals'),
+        'validity': weighted_average(courses, 'validity', 'count'),
+    }
+
+
+def build_statistics(queryset, today, months=None):
+    """
+    Вычисляет статистику проверок набора queryset на дату today: итоги,
+    проверки по месяцам, по программам обучения и по цехам. Возвращает
+    словарь с таблицами статистики и наибольшими значениями столбцов для
+    масштаба диаграмм.
+    """
+    if months is None:
+        months = settings.STATISTICS_MONTHS
+    monthly = get_months(queryset, today, months)
+    courses = list(queryset.values(
+        'course__course_number', 'course__course_name'
+    ).annotate(**COUNTS, **CADENCE).order_by(
+        '-count', 'course__course_number'
+    ))
+    totals = get_totals(queryset, courses)
+    brigades = list(queryset.values(
+        'examined__brigade'
+    ).annotate(**COUNTS).order_by('-count', 'examined__brigade'))
+    return {
+        'today': today,
+        'totals': totals,
+        'months': monthly,
+        'courses': courses,
+        'brigades': brigades,
+        'max_month': max(row['count'] for row in monthly),
+        'max_course': courses[0]['count'] if courses else 0,
+        'max_brigade': brigades[0]['count'] if brigades else 0,
+    }
+
+
+def get_statistics(user, organization_id=None):
+    """
+    Возвращает статистику проверок, доступных пользователю, из кэша или
+    вычисляет её. Суперпользователь может ограничить статистику одной
+    организацией.
+    """
+    today = timezone.localdate()
+    queryset = get_visible_examinations(user)
+    if user.is_superuser and organization_id is not None:
+        queryset = queryset.filter(organization=organization_id)
+    else:
+        organization_id = None
+    cache_key = get_statistics_key(user, organization_id, today)
+    statistics = cache.get(cache_key) if cache_key else None
+    if statistics is None:
+        statistics = build_statistics(queryset, today)
+        if cache_key:
+            cache.set(
+                cache_key, statistics, timeout=settings.STATISTICS_CACHE_TTL
+            )
+    return statistics
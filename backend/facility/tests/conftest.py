@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+from facility.models import Briefing, Commission, Course, Examination, Examined
+
+
+@pytest.fixture
+def commission(db):
+    """Фикстура создания комиссии."""
+    return Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+
+
+@pytest.fixture
+def make_examination(db, commission):
+    """
+    Фикстура создания проверки нового аттестуемого пользователя user с
+    указанным ФИО или существующего аттестуемого examined.
+
+    Программа обучения course задаётся объектом Course или номером; по
+    номеру программа создаётся при первом использовании с наименованием
+    course_name или «Программа <номер>». Дата следующей проверки по
+    умолчанию — через год после текущей.
+    """
+    briefing = Briefing.objects.create(name="Первичный")
+
+    def make(user=None, full_name="Антонио Фагундес", next_check_date=None,
+             *, examined=None, current_check_date=date(2024, 1, 15),
+             previous_check_date=None, course='001', course_name=None,
+             position="Инженер", brigade="Цех №1"):
+        if not isinstance(course, Course):
+            course, _ = Course.objects.get_or_create(
+                course_number=course,
+                defaults={'course_name': course_name or f"Программа {course}"}
+            )
+        if examined is None:
+            examined = Examined.objects.create(
+                full_name=full_name, position=position, brigade=brigade,
+                safety_group='III', work_experience="5 лет", user=user
+            )
+        return Examination.objects.create(
+            previous_check_date=previous_check_date,
+            current_check_date=current_check_date,
+            next_check_date=(
+                next_check_date or current_check_date + timedelta(days=365)
+            ),
+            protocol_number=f'{Examination.objects.count() + 1}/2024',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        )
+    return make
@@ -0,0 +1,157 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+from facility.models import (Briefing, Commission, Course, Examination,
+                             Examined, LatestExamination)
+from users.models import Organization, User
+
+
+@pytest.fixture
+def superuser(db):
+    """Фикстура суперпользователя."""
+    return User.objects.create_superuser(
+        username='admin',
+        email='admin@example.com',
+        password='adminpassword'
+    )
+
+
+@pytest.fixture
+def examination(db):
+    """Фикстура тестовой проверки."""
+    organization = Organization.objects.create(name='Test organization')
+    user = User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=organization
+    )
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    examined = Examined.objects.create(
+        full_name="Антонио Фагундес",
+        position="Инженер",
+        brigade="Цех №1",
+        safety_group='III',
+        work_experience="5 лет",
+        user=user
+    )
+    return Examination.objects.create(
+        current_check_date=date(2024, 1, 15),
+        next_check_date=date(2025, 1, 15),
+        protocol_number='123/2024',
+        reason="Повторная",
+        briefing=Briefing.objects.create(name="Первичный"),
+        course=Course.objects.create(
+            course_number='001', course_name="Машинист крана автомобильного"
+        ),
+        commission=commission,
+        examined=examined,
+    )
+
+
+@pytest.mark.django_db
+def test_examined_company_change_moves_examinations(client, superuser,
+                                                    examination):
+    """
+    Тестирование переноса проверок в новую организацию при смене компании
+    аттестуемого через Django Admin.
+    """
+    other = Organization.objects.create(name='Other organization')
+    examined = examination.examined
+    client.login(username=superuser.username, password='adminpassword')
+    response = client.post(
+        reverse('admin:facility_examined_change', args=[examined.id]),
+        {
+            'full_name': examined.full_name,
+            'position': examined.position,
+            'brigade': examined.brigade,
+            'company_name': other.id,
+            'previous_safety_group': '',
+            'safety_group': examined.safety_group,
+            'work_experience': examined.work_experience,
+            'user': examined.user_id,
+        }
+    )
+    assert response.status_code == 302
+    examination.refresh_from_db()
+    assert examination.organization == other
+
+
+@pytest.mark.django_db
+def test_examination_admin_sets_organization(client, superuser, examination):
+    """
+    Тестирование установки организации проверки из данных аттестуемого
+    при сохранении через Django Admin.
+    """
+    Examination.objects.filter(pk=examination.pk).update(organization=None)
+    client.login(username=superuser.username, password='adminpassword')
+    response = client.post(
+        reverse('admin:facility_examination_change', args=[examination.id]),
+        {
+            'current_check_date': '2024-01-15',
+            'next_check_date': '2025-01-15',
+            'protocol_number': '456/2024',
+            'reason': examination.reason,
+            'certificate_number': '',
+            'commission': examination.commission_id,
+            'examined': examination.examined_id,
+            'briefing': examination.briefing_id,
+            'course': examination.course_id,
+        }
+    )
+    assert response.status_code == 302
+    examination.refresh_from_db()
+    assert examination.protocol_number == '456/2024'
+    assert examination.organization == examination.examined.company_name
+
+
+@pytest.mark.django_db
+def test_examination_admin_moves_to_other_examined(client, superuser,
+                                                   examination):
+    """
+    Тестирование смены аттестуемого проверки через Django Admin: проверка
+    переходит к сотруднику нового аттестуемого вместе с текущими
+    проверками обоих сотрудников.
+    """
+    previous = examination.employee
+    other = Examined.objects.create(
+        full_name="Жозе Майер",
+        position="Мастер",
+        brigade="Цех №2",
+        safety_group='IV',
+        work_experience="7 лет",
+        user=examination.examined.user
+    )
+    assert LatestExamination.objects.get().employee == previous
+    client.login(username=superuser.username, password='adminpassword')
+    response = client.post(
+        reverse('admin:facility_examination_change', args=[examination.id]),
+        {
+            'current_check_date': '2024-01-15',
+            'next_check_date': '2025-01-15',
+            'protocol_number': examination.protocol_number,
+            'reason': examination.reason,
+            'certificate_number': '',
+            'commission': examination.commission_id,
+            'examined': other.id,
+            'briefing': examination.briefing_id,
+            'course': examination.course_id,
+        }
+    )
+    assert response.status_code == 302
+    examination.refresh_from_db()
+    assert examination.employee == other.employee != previous
+    latest = LatestExamination.objects.get()
+    assert (latest.employee, latest.examination) == (
+        other.employee, examination
+    )
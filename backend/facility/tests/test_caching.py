@@ -0,0 +1,297 @@
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from facility.caching import ALL_SCOPE, get_generation, organization_scope
+from facility.forms import ExaminationCreateForm, ExaminationUpdateForm
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from users.models import Organization, User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура очистки кэша перед каждым тестом."""
+    cache.clear()
+
+
+@pytest.fixture
+def organization(db):
+    """Фикстура тестовой организации."""
+    return Organization.objects.create(name='Test organization')
+
+
+@pytest.fixture
+def user(organization):
+    """Фикстура пользователя тестовой организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=organization
+    )
+
+
+@pytest.fixture
+def superuser(db):
+    """Фикстура суперпользователя."""
+    return User.objects.create_superuser(
+        username='admin',
+        email='admin@example.com',
+        password='adminpassword'
+    )
+
+
+@pytest.fixture
+def briefing(db):
+    """Фикстура инструктажа."""
+    return Briefing.objects.create(name="Первичный")
+
+
+@pytest.fixture
+def course(db):
+    """Фикстура программы обучения."""
+    return Course.objects.create(
+        course_number='001', course_name="Машинист крана автомобильного"
+    )
+
+
+@pytest.fixture
+def examination(user, briefing, course):
+    """Фикстура тестовой проверки."""
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    examined = Examined.objects.create(
+        full_name="Антонио Фагундес",
+        position="Инженер",
+        brigade="Цех №1",
+        safety_group='III',
+        work_experience="5 лет",
+        user=user
+    )
+    return Examination.objects.create(
+        current_check_date=date(2024, 1, 15),
+        next_check_date=date(2025, 1, 15),
+        protocol_number='123/2024',
+        reason="Повторная",
+        briefing=briefing,
+        course=course,
+        commission=commission,
+        examined=examined,
+    )
+
+
+@pytest.fixture
+def form_data(briefing, course):
+    """Фикстура данных формы проверки."""
+    return {
+        'previous_check_date': date(2023, 1, 15),
+        'current_check_date': date(2024, 1, 15),
+        'next_check_date': date(2025, 1, 15),
+        'protocol_number': '777/2024',
+        'reason': "Повторная",
+        'briefing': briefing.id,
+        'course': course.id,
+        'certificate_number': 'ABC123',
+        'full_name': "Флавио Кортес",
+        'position': "Мастер",
+        'brigade': "Цех №3",
+        'previous_safety_group': 'III',
+        'safety_group': 'IV',
+        'work_experience': "7 лет",
+        'chairman_name': "Иван Иванов",
+        'chairman_position': "Начальник отдела",
+        'member1_name': "Сидор Сидоров",
+        'member1_position': "Мастер",
+        'member2_name': "Анна Алексеева",
+        'member2_position': "Техник",
+        'safety_officer_name': "Дмитрий Дмитриев",
+        'safety_officer_position': "Инженер-электрик"
+    }
+
+
+def get_protocol_numbers(client):
+    """Возвращает номера протоколов на первой странице списка проверок."""
+    response = client.get(reverse('facility:index'))
+    assert response.status_code == 200
+    return [item.protocol_number for item in response.context['examinations']]
+
+
+@pytest.mark.django_db
+def test_cached_page_skips_database(client, user, examination,
+                                    django_assert_num_queries):
+    """
+    Тестирование повторного отображения страницы из кэша без запросов
+    к таблицам проверок.
+    """
+    client.login(username=user.username, password='password123')
+    assert get_protocol_numbers(client) == ['123/2024']
+    # Остаются только запросы сессии и пользователя.
+    with django_assert_num_queries(2):
+        assert get_protocol_numbers(client) == ['123/2024']
+
+
+@pytest.mark.django_db
+def test_create_form_save_visible(client, user, examination, form_data,
+                                  django_capture_on_commit_callbacks):
+    """
+    Тестирование отображения записи, созданной ExaminationCreateForm,
+    при следующем запросе списка.
+    """
+    client.login(username=user.username, password='password123')
+    assert get_protocol_numbers(client) == ['123/2024']
+
+    form = ExaminationCreateForm(data=form_data, user=user)
+    assert form.is_valid()
+    with django_capture_on_commit_callbacks(execute=True):
+        form.save()
+
+    assert '777/2024' in get_protocol_numbers(client)
+
+
+@pytest.mark.django_db
+def test_update_form_save_visible(client, user, examination, form_data,
+                                  django_capture_on_commit_callbacks):
+    """
+    Тестирование отображения изменений, сохранённых ExaminationUpdateForm,
+    при следующем запросе списка.
+    """
+    client.login(username=user.username, password='password123')
+    assert get_protocol_numbers(client) == ['123/2024']
+
+    form = ExaminationUpdateForm(data=form_data, instance=examination)
+    assert form.is_valid()
+    with django_capture_on_commit_callbacks(execute=True):
+        form.save()
+
+    response = client.get(reverse('facility:index'))
+    cached_examination = response.context['examinations'][0]
+    assert cached_examination.protocol_number == '777/2024'
+    assert cached_examination.examined.full_name == "Флавио Кортес"
+
+
+@pytest.mark.django_db
+def test_delete_visible(client, user, examination,
+                        django_capture_on_commit_callbacks):
+    """Тестирование исчезновения удалённой записи из списка."""
+    client.login(username=user.username, password='password123')
+    assert get_protocol_numbers(client) == ['123/2024']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        examination.delete()
+
+    assert get_protocol_numbers(client) == []
+
+
+@pytest.mark.django_db
+def test_admin_change_visible(client, user, superuser, examination,
+                              django_capture_on_commit_callbacks):
+    """
+    Тестирование отображения изменений аттестуемого, сделанных через
+    Django Admin, при следующем запросе списка.
+    """
+    client.login(username=superuser.username, password='adminpassword')
+    response = client.get(reverse('facility:index'))
+    assert response.context['examinations'][0].examined.full_name == (
+        "Антонио Фагундес"
+    )
+
+    examined = examination.examined
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            reverse('admin:facility_examined_change', args=[examined.id]),
+            {
+                'full_name': "Жозе Майер",
+                'position': examined.position,
+                'brigade': examined.brigade,
+                'company_name': examined.company_name_id,
+                'previous_safety_group': '',
+                'safety_group': examined.safety_group,
+                'work_experience': examined.work_experience,
+                'user': user.id,
+            }
+        )
+    assert response.status_code == 302
+
+    response = client.get(reverse('facility:index'))
+    assert response.context['examinations'][0].examined.full_name == (
+        "Жозе Майер"
+    )
+
+
+@pytest.mark.django_db
+def test_commission_change_visible(client, user, examination,
+                                   django_capture_on_commit_callbacks):
+    """Тестирование отображения изменений комиссии в списке."""
+    client.login(username=user.username, password='password123')
+    client.get(reverse('facility:index'))
+
+    commission = examination.commission
+    commission.chairman_name = "Сергей Сергеев"
+    with django_capture_on_commit_callbacks(execute=True):
+        commission.save()
+
+    response = client.get(reverse('facility:index'))
+    assert response.context['examinations'][0].commission.chairman_name == (
+        "Сергей Сергеев"
+    )
+
+
+@pytest.mark.django_db
+def test_write_bumps_only_related_scopes(user, examination,
+                                         django_capture_on_commit_callbacks):
+    """
+    Тестирование увеличения поколения только у организации изменённой
+    записи и у общей области суперпользователя.
+    """
+    other = Organization.objects.create(name='Other organization')
+    organization_generation = get_generation(
+        organization_scope(user.organization_id)
+    )
+    other_generation = get_generation(organization_scope(other.id))
+    all_generation = get_generation(ALL_SCOPE)
+
+    examination.reason = "Внеочередная"
+    with django_capture_on_commit_callbacks(execute=True):
+        examination.save()
+
+    assert get_generation(
+        organization_scope(user.organization_id)
+    ) > organization_generation
+    assert get_generation(ALL_SCOPE) > all_generation
+    assert get_generation(organization_scope(other.id)) == other_generation
+
+
+@pytest.mark.django_db
+def test_bump_deferred_until_commit(user, examination,
+                                    django_capture_on_commit_callbacks):
+    """
+    Тестирование сброса кэша после фиксации транзакции: до фиксации
+    поколение не меняется, чтобы параллельный запрос не закэшировал
+    прежние данные под новым поколением.
+    """
+    scope = organization_scope(user.organization_id)
+    generation = get_generation(scope)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        examination.reason = "Внеочередная"
+        examination.save()
+        examination.examined.full_name = "Жозе Майер"
+        examination.examined.save()
+        examination.commission.chairman_name = "Сергей Сергеев"
+        examination.commission.save()
+        assert get_generation(scope) == generation
+    assert get_generation(scope) == generation
+
+    assert len(callbacks) == 3
+    for callback in callbacks:
+        callback()
+    assert get_generation(scope) > generation
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from facility.dashboard import OVERDUE, build_dashboard, get_dashboard
+from facility.models import LatestExamination
+from users.models import Organization, User
+
+TODAY = date(2024, 6, 1)
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.mark.django_db
+def test_build_dashboard(user, make_examination):
+    """
+    Тестирование сводки: проверки делятся по периодам и группируются по
+    программам и цехам, прежние проверки сотрудника и проверки со сроком
+    позже последнего периода не учитываются.
+    """
+    # Прежняя проверка продлена проверкой по той же программе
+    make_examination(
+        user, "Сотрудник 1", TODAY - timedelta(days=200),
+        current_check_date=date(2023, 1, 15)
+    )
+    make_examination(user, "Сотрудник 1", TODAY + timedelta(days=10))
+    # По другой программе у того же сотрудника срок прошёл
+    make_examination(
+        user, "Сотрудник 1", TODAY - timedelta(days=1), course='002'
+    )
+    make_examination(
+        user, "Сотрудник 2", TODAY + timedelta(days=45), brigade="Цех №2"
+    )
+    make_examination(user, "Сотрудник 3", TODAY + timedelta(days=90))
+    make_examination(user, "Сотрудник 4", TODAY + timedelta(days=91))
+
+    dashboard = build_dashboard(LatestExamination.objects.all(), TODAY)
+
+    assert dashboard['totals'] == [1, 1, 1, 1]
+    assert dashboard['total'] == 4
+    assert dashboard['courses'] == [
+        {'name': "001 Программа 001", 'counts': [0, 1, 1, 1], 'total': 3},
+        {'name': "002 Программа 002", 'counts': [1, 0, 0, 0], 'total': 1},
+    ]
+    assert [group['name'] for group in dashboard['brigades']] == [
+        "Цех №1", "Цех №2"
+    ]
+    examinations = dashboard['examinations']
+    assert [row['full_name'] for row in examinations] == [
+        "Сотрудник 1", "Сотрудник 1", "Сотрудник 2", "Сотрудник 3"
+    ]
+    assert examinations[0]['due'] == OVERDUE
+    assert examinations[0]['employee'] == examinations[1]['employee']
+    assert len(build_dashboard(
+        LatestExamination.objects.all(), TODAY, limit=2
+    )['examinations']) == 2
+
+
+@pytest.mark.django_db
+def test_dashboard_cache(user, make_examination, django_assert_num_queries,
+                         django_capture_on_commit_callbacks):
+    """
+    Тестирование кэша сводки: повторная сводка не обращается к базе, а
+    после изменения проверок организации пересчитывается.
+    """
+    cache.clear()
+    make_examination(user, "Сотрудник 1", timezone.localdate())
+    assert get_dashboard(user)['total'] == 1
+    with django_assert_num_queries(0):
+        assert get_dashboard(user)['total'] == 1
+    with django_capture_on_commit_callbacks(execute=True):
+        make_examination(user, "Сотрудник 2", timezone.localdate())
+    assert get_dashboard(user)['total'] == 2
+
+
+@pytest.mark.django_db
+def test_dashboard_view(client, user, make_examination):
+    """
+    Тестирование страницы сводки: пользователь видит проверки своей
+    организации, суперпользователь выбирает организацию.
+    """
+    cache.clear()
+    other = User.objects.create_user(
+        username='otheruser',
+        email='otheruser@example.com',
+        organization=Organization.objects.create(name='Other')
+    )
+    make_examination(user, "Сотрудник 1", timezone.localdate())
+    make_examination(other, "Сотрудник 2", timezone.localdate())
+    url = reverse('facility:dashboard')
+
+    client.login(username='testuser', password='password123')
+    response = client.get(url, {'organization': other.organization_id})
+    assert response.status_code == 200
+    examinations = response.context['dashboard']['examinations']
+    assert [row['full_name'] for row in examinations] == [
+        "Сотрудник 1"
+    ]
+    assert 'Новая проверка' in response.content.decode()
+
+    User.objects.create_superuser(username='admin', password='adminpassword')
+    client.login(username='admin', password='adminpassword')
+    assert client.get(url).context['dashboard']['total'] == 2
+    response = client.get(url, {'organization': other.organization_id})
+    examinations = response.context['dashboard']['examinations']
+    assert [row['full_name'] for row in examinations] == [
+        "Сотрудник 2"
+    ]
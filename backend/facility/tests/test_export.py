@@ -0,0 +1,181 @@
+import csv
+import io
+import zipfile
+from datetime import date
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from facility.export import column_letter
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from users.models import Organization, User
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.fixture
+def superuser(db):
+    """Фикстура создания суперпользователя."""
+    return User.objects.create_superuser(
+        username='admin',
+        email='admin@example.com',
+        password='adminpassword'
+    )
+
+
+@pytest.fixture
+def examinations(user):
+    """
+    Фикстура создания проверок пользователя и проверки другой
+    организации.
+    """
+    briefing = Briefing.objects.create(name='Первичный')
+    course = Course.objects.create(
+        course_number='001', course_name='Машинист крана автомобильного'
+    )
+    commission = Commission.objects.create(
+        chairman_name='Иван Иванов',
+        chairman_position='Директор',
+        member1_name='Пётр Петров',
+        member1_position='Главный инженер',
+        member2_name='Николай Сидоров',
+        member2_position='Техник',
+        safety_officer_name='Анна Алексеева',
+        safety_officer_position='Электрик'
+    )
+    other = User.objects.create_user(
+        username='other',
+        password='password123',
+        organization=Organization.objects.create(name='Other organization')
+    )
+    for i, owner in enumerate([user, user, user, other]):
+        examined = Examined.objects.create(
+            full_name=f'Тестируемый {i}',
+            position='Инженер',
+            brigade=f'Цех №{i}',
+            safety_group='III',
+            work_experience='5 лет',
+            user=owner
+        )
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15 + i),
+            next_check_date=date(2025, 1, 15 + i),
+            protocol_number=f'{i}/2024',
+            reason='Повторная <&>',
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        )
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+def read_xlsx(response):
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    assert archive.testzip() is None
+    sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    return [
+        [
+            cell.findtext('x:is/x:t', namespaces=NS)
+            or cell.findtext('x:v', namespaces=NS)
+            for cell in row.findall('x:c', NS)
+        ]
+        for row in sheet.findall('x:sheetData/x:row', NS)
+    ]
+
+
+@pytest.mark.django_db
+def test_export_csv_filtered_and_ordered(client, user, examinations,
+                                         django_assert_num_queries):
+    """
+    Тестирование выгрузки в CSV с фильтрами и сортировкой главной страницы
+    и только записями организации пользователя.
+    """
+    client.login(username=user.username, password='password123')
+    url = reverse('facility:export_examinations', args=['csv'])
+    response = client.get(url, {'order_by': 'protocol_number'})
+    assert isinstance(response, StreamingHttpResponse)
+    assert response['Content-Type'].startswith('text/csv')
+    assert 'attachment' in response['Content-Disposition']
+    with django_assert_num_queries(1):
+        rows = read_csv(response)
+    assert rows[0][0] == 'Номер протокола'
+    assert [row[0] for row in rows[1:]] == ['0/2024', '1/2024', '2/2024']
+    assert rows[1][2] == '15.01.2024'
+
+    response = client.get(url, {'brigade': '№1'})
+    assert [row[0] for row in read_csv(response)[1:]] == ['1/2024']
+
+
+@pytest.mark.django_db
+def test_export_xlsx(client, superuser, examinations):
+    """
+    Тестирование выгрузки в XLSX: файл является корректным архивом, лист
+    содержит все записи и столбец организации для суперпользователя.
+    """
+    client.login(username=superuser.username, password='adminpassword')
+    response = client.get(
+        reverse('facility:export_examinations', args=['xlsx']),
+        {'order_by': '-protocol_number'}
+    )
+    assert response.status_code == 200
+    rows = read_xlsx(response)
+    assert rows[0][:2] == ['Номер протокола', 'Компания']
+    assert [row[0] for row in rows[1:]] == [
+        '3/2024', '2/2024', '1/2024', '0/2024'
+    ]
+    assert rows[1][1] == 'Other organization'
+    assert 'Повторная <&>' in rows[1]
+    # Дата текущей проверки хранится как число дней от 30.12.1899
+    assert rows[4][3] == str((date(2024, 1, 15) - date(1899, 12, 30)).days)
+
+
+@pytest.mark.django_db
+def test_export_requires_login(client, examinations):
+    """Тестирование перенаправления неавторизованного пользователя."""
+    response = client.get(
+        reverse('facility:export_examinations', args=['csv'])
+    )
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_export_unknown_format(client, user):
+    """Тестирование ответа 404 для неподдерживаемого формата."""
+    client.login(username=user.username, password='password123')
+    response = client.get(
+        reverse('facility:export_examinations', args=['pdf'])
+    )
+    assert response.status_code == 404
+
+
+def test_column_letter():
+    """Тестирование обозначений столбцов листа."""
+    assert [column_letter(i) for i in (0, 25, 26, 701, 702)] == [
+        'A', 'Z', 'AA', 'ZZ', 'AAA'
+    ]
+
+
+@pytest.mark.django_db
+def test_benchmark_export_command(user, examinations):
+    """Тестирование команды замера выгрузки."""
+    out = io.StringIO()
+    call_command('benchmark_export', stdout=out)
+    assert 'CSV' in out.getvalue() and 'XLSX' in out.getvalue()
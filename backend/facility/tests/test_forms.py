@@ -2,7 +2,8 @@ from datetime import date
 
 from django.test import TestCase
 from facility.forms import ExaminationCreateForm, ExaminationUpdateForm
-from facility.models import Briefing, Commission, Course, Examination, Examined
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined)
 from users.models import Organization, User
 
 
@@ -82,6 +83,57 @@ class ExaminationCreateFormTest(TestCase):
             self.assertEqual(
                 examination.commission.chairman_name, "Иван Иванов"
             )
+            self.assertEqual(examination.organization, self.organization)
+
+    def test_save_reuses_commission(self):
+        """
+        Тестирование повторного использования комиссии с тем же составом.
+        """
+        for protocol_number in ('123/2024', '124/2024'):
+            data = {**self.valid_data, 'protocol_number': protocol_number}
+            form = ExaminationCreateForm(data=data, user=self.user)
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+        self.assertEqual(Examination.objects.count(), 2)
+        self.assertEqual(Commission.objects.count(), 1)
+
+    def test_save_links_selected_employee(self):
+        """
+        Тестирование привязки проверки к сотруднику, выбранному поиском,
+        даже если ФИО в форме записано иначе.
+        """
+        employee = Employee.objects.create(
+            full_name="Фагундес Антонио", organization=self.organization
+        )
+        data = {**self.valid_data, 'employee': employee.pk}
+        form = ExaminationCreateForm(data=data, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        examination = form.save()
+        self.assertEqual(examination.examined.employee, employee)
+        self.assertEqual(examination.employee, employee)
+
+    def test_employee_of_other_organization(self):
+        """
+        Тестирование запрета выбора сотрудника другой организации: обычный
+        пользователь не видит чужих сотрудников, а суперпользователь не
+        может привязать сотрудника к записи автора из другой организации.
+        """
+        employee = Employee.objects.create(
+            full_name="Антонио Фагундес",
+            organization=Organization.objects.create(name='Other')
+        )
+        data = {**self.valid_data, 'employee': employee.pk}
+        form = ExaminationCreateForm(data=data, user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('employee', form.errors)
+
+        superuser = User.objects.create_superuser(
+            username='admin', password='adminpassword'
+        )
+        data.update(company_name=self.organization.pk, user=self.user.pk)
+        form = ExaminationCreateForm(data=data, user=superuser)
+        self.assertFalse(form.is_valid())
+        self.assertIn('full_name', form.errors)
 
 
 class ExaminationUpdateFormTest(TestCase):
@@ -175,3 +227,158 @@ class ExaminationUpdateFormTest(TestCase):
             self.assertEqual(
                 updated_examination.commission.chairman_name, "Сергей Сергеев"
             )
+
+    def test_form_keeps_shared_commission(self):
+        """
+        Тестирование изменения состава комиссии, общей для нескольких
+        проверок: проверке назначается другая комиссия, а общая комиссия
+        не изменяется.
+        """
+        other = Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number='124/2024',
+            reason="Повторная",
+            commission=self.commission,
+            examined=self.examined,
+            briefing=self.briefing,
+            course=self.course
+        )
+        form = ExaminationUpdateForm(instance=self.examination)
+        data = {**form.initial, 'chairman_name': "Сергей Сергеев"}
+        data['previous_check_date'] = date(2023, 1, 15)
+        data['briefing'] = self.briefing.id
+        data['course'] = self.course.id
+        form = ExaminationUpdateForm(data=data, instance=self.examination)
+        self.assertTrue(form.is_valid(), form.errors)
+        examination = form.save()
+        self.assertNotEqual(examination.commission, self.commission)
+        other.commission.refresh_from_db()
+        self.assertEqual(other.commission.chairman_name, "Пётр Петров")
+        self.assertEqual(Commission.objects.count(), 2)
+
+    def get_data(self, **values):
+        """Возвращает данные формы с исходными значениями записи."""
+        self.examination.previous_check_date = date(2023, 1, 15)
+        self.examination.save(update_fields=['previous_check_date'])
+        form = ExaminationUpdateForm(instance=self.examination)
+        return {**form.initial, **values}
+
+    def test_form_skips_unchanged_data(self):
+        """
+        Тестирование сохранения формы без изменений: в базу ничего не
+        записывается.
+        """
+        form = ExaminationUpdateForm(
+            data=self.get_data(), instance=self.examination
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.assertNumQueries(0):
+            form.save()
+
+    def test_form_updates_changed_fields(self):
+        """
+        Тестирование записи только изменённых полей: изменение поля
+        проверки или аттестуемого, не входящего в поисковый документ,
+        записывается одним запросом UPDATE.
+        """
+        for values, query in [
+            ({'certificate_number': 'ABC123'}, 'facility_examination'),
+            ({'work_experience': "6 лет"}, 'facility_examined'),
+        ]:
+            form = ExaminationUpdateForm(
+                data=self.get_data(**values), instance=self.examination
+            )
+            self.assertTrue(form.is_valid(), form.errors)
+            with self.assertNumQueries(1) as context:
+                form.save()
+            sql = context.captured_queries[0]['sql']
+            self.assertTrue(sql.startswith(f'UPDATE "{query}"'), sql)
+            self.assertEqual(sql.count('='), 2, sql)
+        self.examination.refresh_from_db()
+        self.assertEqual(self.examination.certificate_number, 'ABC123')
+        self.assertEqual(self.examination.examined.work_experience, "6 лет")
+        self.assertEqual(self.examination.commission, self.commission)
+
+    def test_form_save_without_commit(self):
+        """
+        Тестирование сохранения без записи: данные аттестуемого
+        записываются методом save_m2m после сохранения проверки.
+        """
+        form = ExaminationUpdateForm(
+            data=self.get_data(position="Мастер", reason="Первичная"),
+            instance=self.examination
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.assertNumQueries(0):
+            examination = form.save(commit=False)
+        examination.save()
+        position = Examined.objects.values_list('position', flat=True)
+        self.assertEqual(position.get(pk=self.examined.pk), "Инженер")
+        form.save_m2m()
+        self.assertEqual(position.get(pk=self.examined.pk), "Мастер")
+
+    def test_form_save_without_commit_defers_commission(self):
+        """
+        Тестирование сохранения без записи при изменении состава комиссии:
+        новая комиссия создаётся и назначается проверке методом save_m2m.
+        """
+        form = ExaminationUpdateForm(
+            data=self.get_data(chairman_name="Олег Смирнов"),
+            instance=self.examination
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.assertNumQueries(0):
+            examination = form.save(commit=False)
+        self.assertEqual(Commission.objects.count(), 1)
+        examination.save()
+        form.save_m2m()
+        self.examination.refresh_from_db()
+        self.assertNotEqual(self.examination.commission, self.commission)
+        self.assertEqual(
+            self.examination.commission.chairman_name, "Олег Смирнов"
+        )
+        self.assertEqual(Commission.objects.count(), 2)
+
+    def test_form_changes_employee_with_full_name(self):
+        """
+        Тестирование исправления ФИО: аттестуемому и проверке назначается
+        сотрудник с новым ФИО, а текущие проверки пересчитываются для
+        прежнего и нового сотрудника.
+        """
+        previous = self.examination.employee
+        self.assertEqual(previous.latest_examinations.count(), 1)
+        form = ExaminationUpdateForm(
+            data=self.get_data(full_name="Иван Иваненко"),
+            instance=self.examination
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.examination.refresh_from_db()
+        employee = self.examination.employee
+        self.assertNotEqual(employee, previous)
+        self.assertEqual(employee.full_name, "Иван Иваненко")
+        self.assertEqual(self.examination.examined.employee, employee)
+        self.assertFalse(previous.latest_examinations.exists())
+        self.assertEqual(
+            list(employee.latest_examinations.values_list(
+                'examination', flat=True
+            )),
+            [self.examination.pk]
+        )
+
+    def test_form_keeps_employee_for_same_name(self):
+        """
+        Тестирование изменения ФИО только в регистре и пробелах: сотрудник
+        не меняется.
+        """
+        previous = self.examination.employee
+        form = ExaminationUpdateForm(
+            data=self.get_data(full_name="иван  ИВАНОВ"),
+            instance=self.examination
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.examination.refresh_from_db()
+        self.assertEqual(self.examination.employee, previous)
+        self.assertEqual(self.examination.examined.full_name, "иван  ИВАНОВ")
@@ -0,0 +1,268 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from facility.caching import get_generation, organization_scope
+from facility.export import COLUMNS, stream_xlsx
+from facility.importer import ImportFileError, import_file
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined, LatestExamination)
+from users.models import Organization, User
+
+HEADER = [title for title, field in COLUMNS if field != 'created_at']
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации и справочников."""
+    Briefing.objects.create(name='Первичный')
+    Course.objects.create(course_number='001', course_name='Машинист крана')
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+def make_row(number, **values):
+    """Возвращает строку файла импорта по заголовкам столбцов."""
+    row = {
+        'Номер протокола': f'{number}/2024',
+        'Дата текущей проверки': '15.01.2024',
+        'Дата следующей проверки': '15.01.2025',
+        'ФИО аттестуемого': f'Сотрудник {number}',
+        'Должность аттестуемого': 'Инженер',
+        'Цех, участок аттестуемого': 'Цех №1',
+        'ФИО председателя комиссии': 'Иван Иванов',
+        'Должность председателя комиссии': 'Директор',
+        'ФИО первого члена комиссии': 'Пётр Петров',
+        'Должность первого члена комиссии': 'Главный инженер',
+        'ФИО второго члена комиссии': 'Николай Сидоров',
+        'Должность второго члена комиссии': 'Техник',
+        'ФИО ответственного за электро-безопасность': 'Анна Алексеева',
+        'Должность ответственного за электро-безопасность': 'Электрик',
+        'Причина проверки знаний': 'Повторная',
+        'Вид проводимого инструктажа': 'Первичный',
+        '№ программы обучения': '001',
+        'Наименование программы обучения': 'Машинист крана',
+        'Группа по ЭБ': 'III',
+        'Стаж работы': '5 лет',
+    }
+    row.update(values)
+    return [row.get(title, '') for title in HEADER]
+
+
+def make_csv(rows, delimiter=',', encoding='utf-8-sig'):
+    """Возвращает содержимое CSV-файла с заголовками и строками."""
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=delimiter)
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return output.getvalue().encode(encoding)
+
+
+@pytest.mark.django_db
+def test_import_csv(user, django_assert_max_num_queries):
+    """
+    Тестирование импорта CSV-файла: строки записываются пакетами, а
+    одинаковые составы комиссии сохраняются одной записью.
+    """
+    content = make_csv([make_row(i) for i in range(5)])
+    # Два запроса справочников и не больше одиннадцати запросов (вместе с
+    # пересчётом текущих проверок) на каждый из трёх пакетов, независимо
+    # от количества строк в пакете
+    with django_assert_max_num_queries(2 + 11 * 3):
+        result = import_file(
+            io.BytesIO(content), 'examinations.csv', user, batch_size=2
+        )
+    assert (result.rows, result.valid, result.created) == (5, 5, 5)
+    assert Commission.objects.count() == 1
+    assert LatestExamination.objects.count() == 5
+    examination = Examination.objects.select_related('examined').get(
+        protocol_number='3/2024'
+    )
+    assert examination.current_check_date == date(2024, 1, 15)
+    assert examination.organization == user.organization
+    assert examination.examined.company_name == user.organization
+    assert examination.examined.user == user
+    assert examination.examined.full_name == 'Сотрудник 3'
+
+
+@pytest.mark.django_db
+def test_import_reuses_commission(user):
+    """Тестирование импорта с комиссией, уже сохранённой в базе."""
+    commission = Commission.objects.create(
+        chairman_name='Иван Иванов',
+        chairman_position='Директор',
+        member1_name='Пётр Петров',
+        member1_position='Главный инженер',
+        member2_name='Николай Сидоров',
+        member2_position='Техник',
+        safety_officer_name='Анна Алексеева',
+        safety_officer_position='Электрик'
+    )
+    content = make_csv([make_row(1), make_row(2)])
+    import_file(io.BytesIO(content), 'examinations.csv', user)
+    assert Commission.objects.get() == commission
+    assert Examination.objects.filter(commission=commission).count() == 2
+
+
+@pytest.mark.django_db
+def test_import_links_employees(user):
+    """
+    Тестирование привязки импортированных проверок к сотрудникам: ФИО
+    сотрудника, уже сохранённого в базе, и повторяющиеся ФИО файла
+    относятся к одному сотруднику.
+    """
+    employee = Employee.objects.create(
+        full_name='Сотрудник 1', organization=user.organization
+    )
+    content = make_csv([
+        make_row(1, **{'ФИО аттестуемого': ' сотрудник  1'}),
+        make_row(2),
+        make_row(3, **{'ФИО аттестуемого': 'Сотрудник 2'}),
+    ])
+    import_file(io.BytesIO(content), 'examinations.csv', user)
+    assert Employee.objects.count() == 2
+    other = Employee.objects.exclude(pk=employee.pk).get()
+    assert other.name_key == 'сотрудник 2'
+    assert list(Examination.objects.order_by('protocol_number').values_list(
+        'employee', flat=True
+    )) == [employee.pk, other.pk, other.pk]
+    assert not Examined.objects.filter(employee__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_import_errors(user):
+    """
+    Тестирование пропуска строк с ошибками: правила формы создания
+    проверки и неизвестные инструктаж и программа обучения.
+    """
+    content = make_csv([
+        make_row(1),
+        make_row(2, **{'Дата предыдущей проверки': '15.01.2023'}),
+        make_row(3, **{'Вид проводимого инструктажа': 'Неизвестный'}),
+        make_row(4, **{'Наименование программы обучения': 'Другая'}),
+        make_row(5, **{'Дата текущей проверки': '2024'}),
+        [''] * len(HEADER),
+    ])
+    result = import_file(io.BytesIO(content), 'examinations.csv', user)
+    assert (result.rows, result.created, result.error_count) == (5, 1, 4)
+    errors = dict(result.errors)
+    assert list(errors) == [3, 4, 5, 6]
+    assert 'Предыдущая группа по ЭБ' in errors[3]
+    assert 'Вид проводимого инструктажа' in errors[4]
+    assert '№ программы обучения' in errors[5]
+    assert 'Дата текущей проверки' in errors[6]
+    assert Examination.objects.get().protocol_number == '1/2024'
+
+
+@pytest.mark.django_db
+def test_import_dry_run(user):
+    """Тестирование проверки файла без записи."""
+    content = make_csv([make_row(1), make_row(2)])
+    result = import_file(
+        io.BytesIO(content), 'examinations.csv', user, dry_run=True
+    )
+    assert (result.valid, result.created) == (2, 0)
+    assert not Examined.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_excel_csv(user):
+    """
+    Тестирование CSV-файла русского Excel: кодировка Windows-1251 и
+    разделитель «;».
+    """
+    content = make_csv([make_row(1)], delimiter=';', encoding='cp1251')
+    result = import_file(io.BytesIO(content), 'examinations.CSV', user)
+    assert result.created == 1
+    assert Examined.objects.get().full_name == 'Сотрудник 1'
+
+
+@pytest.mark.django_db
+def test_import_xlsx(user):
+    """Тестирование импорта книги XLSX, сформированной выгрузкой."""
+    row = make_row(1, **{'Дата предыдущей проверки': date(2023, 1, 15),
+                         'Предыдущая группа по ЭБ': 'II',
+                         'Дата текущей проверки': date(2024, 1, 15)})
+    columns = [column for column in COLUMNS if column[1] != 'created_at']
+    content = b''.join(stream_xlsx(columns, [row]))
+    result = import_file(io.BytesIO(content), 'examinations.xlsx', user)
+    assert result.created == 1, result.errors
+    examination = Examination.objects.get()
+    assert examination.previous_check_date == date(2023, 1, 15)
+    assert examination.current_check_date == date(2024, 1, 15)
+    assert examination.examined.previous_safety_group == 'II'
+
+
+@pytest.mark.django_db
+def test_import_missing_columns(user):
+    """Тестирование ошибки файла без обязательных столбцов."""
+    with pytest.raises(ImportFileError, match='ФИО аттестуемого'):
+        import_file(
+            io.BytesIO('Номер протокола\n1\n'.encode()), 'file.csv', user
+        )
+    with pytest.raises(ImportFileError):
+        import_file(io.BytesIO(b'not a zip'), 'file.xlsx', user)
+
+
+@pytest.mark.django_db
+def test_import_view(client, user, django_capture_on_commit_callbacks):
+    """
+    Тестирование загрузки файла через страницу импорта: записи
+    добавляются, а кэш списка организации сбрасывается.
+    """
+    cache.clear()
+    generation = get_generation(organization_scope(user.organization_id))
+    client.login(username='testuser', password='password123')
+    upload = SimpleUploadedFile(
+        'examinations.csv', make_csv([make_row(1), make_row(2)])
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            reverse('facility:import_examinations'), {'file': upload}
+        )
+    assert response.status_code == 200
+    assert response.context['result'].created == 2
+    assert Examination.objects.filter(
+        organization=user.organization
+    ).count() == 2
+    assert get_generation(
+        organization_scope(user.organization_id)
+    ) != generation
+
+
+@pytest.mark.django_db
+def test_import_view_invalid_file(client, user):
+    """Тестирование ошибки загрузки файла без нужных столбцов."""
+    client.login(username='testuser', password='password123')
+    response = client.post(
+        reverse('facility:import_examinations'),
+        {'file': SimpleUploadedFile('file.csv', b'a,b\n1,2\n')}
+    )
+    assert response.status_code == 200
+    assert response.context['form'].errors['file']
+    assert not Examination.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path, user):
+    """Тестирование команды импорта проверок."""
+    path = tmp_path / 'examinations.csv'
+    path.write_bytes(make_csv([
+        make_row(1), make_row(2, **{'Стаж работы': ''})
+    ]))
+    stdout = io.StringIO()
+    call_command(
+        'import_examinations', str(path), user='testuser', stdout=stdout
+    )
+    assert 'Строка 3: Стаж работы' in stdout.getvalue()
+    assert 'добавлено проверок: 1' in stdout.getvalue()
+    assert Examination.objects.count() == 1
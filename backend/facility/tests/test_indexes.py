@@ -0,0 +1,106 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from facility.dashboard import get_due_examinations
+from facility.models import Examination, LatestExamination
+from facility.notifications import get_pending_examinations
+from facility.statistics import get_monthly_counts
+from users.models import Organization
+
+
+@pytest.fixture
+def seeded(db):
+    """Фикстура базы, заполненной синтетическими проверками."""
+    call_command(
+        'seed_examinations', count=200, organizations=2, batch_size=100,
+        stdout=StringIO()
+    )
+
+
+@pytest.mark.django_db
+def test_created_at_ordering_uses_index(seeded):
+    """
+    Тестирование использования индекса при сортировке списка по дате
+    создания записи.
+    """
+    plan = Examination.objects.order_by('-created_at')[:4].explain()
+    assert 'examination_created_idx' in plan
+
+
+@pytest.mark.django_db
+def test_organization_list_uses_index(seeded):
+    """
+    Тестирование использования составного индекса организации и даты
+    создания при отображении списка проверок организации.
+    """
+    organization = Organization.objects.order_by('pk').first()
+    plan = Examination.objects.filter(
+        organization=organization
+    ).order_by('-created_at')[:4].explain()
+    assert 'examination_org_created_idx' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field, index', [
+    ('current_check_date', 'examination_current_idx'),
+    ('next_check_date', 'examination_next_idx'),
+    ('protocol_number', 'examination_protocol_idx'),
+])
+def test_filter_uses_index(seeded, field, index):
+    """Тестирование использования индексов фильтрами страницы списка."""
+    value = '1/2020' if field == 'protocol_number' else date(2020, 1, 15)
+    plan = Examination.objects.filter(**{field: value}).explain()
+    assert index in plan
+
+
+@pytest.mark.django_db
+def test_seed_examinations(seeded):
+    """Тестирование заполнения базы командой seed_examinations."""
+    assert Examination.objects.count() == 200
+    assert Examination.objects.filter(
+        examined__company_name__isnull=True
+    ).count() == 0
+
+
+@pytest.mark.django_db
+def test_dashboard_uses_index(seeded):
+    """
+    Тестирование использования индексов сводкой сроков: текущие проверки
+    организации выбираются по диапазону даты следующей проверки.
+    """
+    organization = Organization.objects.order_by('pk').first()
+    plan = get_due_examinations(
+        LatestExamination.objects.filter(organization=organization),
+        date(2020, 1, 15)
+    ).explain()
+    assert 'latest_org_next_idx' in plan
+
+
+@pytest.mark.django_db
+def test_notifications_use_index(seeded):
+    """
+    Тестирование использования индексов рассылкой уведомлений: текущие
+    проверки выбираются по диапазону даты следующей проверки, а
+    отправленные уведомления исключаются по уникальному индексу.
+    """
+    plan = get_pending_examinations(date(2020, 1, 15), 30).explain()
+    assert 'latest_next_idx' in plan
+    assert 'facility_examinationnotification_1' in plan
+    assert 'SCAN' not in plan
+
+
+@pytest.mark.django_db
+def test_statistics_uses_index(seeded):
+    """
+    Тестирование использования индекса статистикой по месяцам: проверки
+    организации выбираются по диапазону даты текущей проверки.
+    """
+    organization = Organization.objects.order_by('pk').first()
+    plan = get_monthly_counts(
+        Examination.objects.filter(organization=organization),
+        date(2020, 1, 15), 24
+    ).explain()
+    assert 'examination_org_current_idx' in plan
@@ -0,0 +1,133 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from facility.models import Course, Examination, Examined, LatestExamination
+from users.models import Organization, User
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.fixture
+def courses(db):
+    """Фикстура создания двух программ обучения."""
+    return [
+        Course.objects.create(
+            course_number=f'00{i}', course_name=f"Программа 00{i}"
+        )
+        for i in range(1, 3)
+    ]
+
+
+@pytest.fixture
+def examined(db, user):
+    """Фикстура создания аттестуемого."""
+    return Examined.objects.create(
+        full_name="Антонио Фагундес", position="Инженер", brigade="Цех №1",
+        safety_group='III', work_experience="5 лет", user=user
+    )
+
+
+def get_latest():
+    """Возвращает текущие проверки в виде пар программа — проверка."""
+    return dict(LatestExamination.objects.values_list(
+        'course', 'examination'
+    ))
+
+
+@pytest.mark.django_db
+def test_latest_on_save(make_examination, examined, courses):
+    """
+    Тестирование пересчёта текущих проверок при сохранении: более поздняя
+    проверка заменяет прежнюю, более ранняя не меняет текущую, а перенос
+    проверки на другую программу пересчитывает обе программы.
+    """
+    first = make_examination(
+        examined=examined, current_check_date=date(2023, 1, 15)
+    )
+    assert get_latest() == {courses[0].pk: first.pk}
+    latest = LatestExamination.objects.get()
+    assert latest.employee_id == examined.employee_id
+    assert latest.organization_id == examined.company_name_id
+    assert latest.next_check_date == date(2024, 1, 15)
+
+    second = make_examination(
+        examined=examined, current_check_date=date(2024, 1, 15)
+    )
+    make_examination(
+        examined=examined, current_check_date=date(2022, 1, 15)
+    )
+    assert get_latest() == {courses[0].pk: second.pk}
+
+    second.course = courses[1]
+    second.save()
+    assert get_latest() == {courses[0].pk: first.pk, courses[1].pk: second.pk}
+
+    second.next_check_date = date(2024, 6, 1)
+    second.save(update_fields=['next_check_date'])
+    assert LatestExamination.objects.get(
+        examination=second
+    ).next_check_date == date(2024, 6, 1)
+
+
+@pytest.mark.django_db
+def test_latest_on_delete(make_examination, examined, courses):
+    """
+    Тестирование пересчёта текущих проверок при удалении: текущей
+    становится предыдущая проверка, а без проверок запись удаляется.
+    """
+    first = make_examination(
+        examined=examined, current_check_date=date(2023, 1, 15)
+    )
+    second = make_examination(
+        examined=examined, current_check_date=date(2024, 1, 15)
+    )
+    second.delete()
+    assert get_latest() == {courses[0].pk: first.pk}
+    first.delete()
+    assert not LatestExamination.objects.exists()
+
+
+@pytest.mark.django_db
+def test_latest_skipped_for_other_fields(make_examination, examined,
+                                         django_assert_num_queries):
+    """
+    Тестирование сохранения полей, не влияющих на текущие проверки: запросы
+    пересчёта не выполняются.
+    """
+    examination = make_examination(
+        examined=examined, current_check_date=date(2023, 1, 15)
+    )
+    examination.certificate_number = 'ABC123'
+    with django_assert_num_queries(1):
+        examination.save(update_fields=['certificate_number'])
+
+
+@pytest.mark.django_db
+def test_rebuild_latest_command(make_examination, examined, courses):
+    """
+    Тестирование перестроения таблицы текущих проверок командой после
+    изменения проверок в обход сигналов.
+    """
+    first = make_examination(
+        examined=examined, current_check_date=date(2023, 1, 15)
+    )
+    second = make_examination(
+        examined=examined, current_check_date=date(2024, 1, 15),
+        course=courses[1]
+    )
+    Examination.objects.filter(pk=second.pk).update(course=courses[0])
+    LatestExamination.objects.filter(examination=first).delete()
+    stdout = StringIO()
+    call_command('rebuild_latest_examinations', batch_size=1, stdout=stdout)
+    assert 'Пересчитаны текущие проверки сотрудников: 1' in stdout.getvalue()
+    assert get_latest() == {courses[0].pk: second.pk}
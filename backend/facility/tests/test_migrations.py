@@ -0,0 +1,334 @@
+from datetime import date
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.db.models import F
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined, LatestExamination)
+from facility.search import SEARCH_TABLE, search_examinations
+from users.models import Organization, User
+
+organization_migration = import_module(
+    'facility.migrations.0004_examination_organization'
+)
+fingerprint_migration = import_module(
+    'facility.migrations.0005_commission_fingerprint'
+)
+employee_migration = import_module('facility.migrations.0006_employee')
+latest_migration = import_module(
+    'facility.migrations.0009_latestexamination'
+)
+search_migration = import_module(
+    'facility.migrations.0011_examination_search_vector'
+)
+
+
+@pytest.mark.django_db
+def test_backfill_organization(monkeypatch):
+    """
+    Тестирование пакетного заполнения организации проверок из данных
+    аттестуемых.
+    """
+    monkeypatch.setattr(organization_migration, 'BATCH_SIZE', 2)
+    organization = Organization.objects.create(name='Test organization')
+    user = User.objects.create_user(
+        username='testuser', organization=organization
+    )
+    briefing = Briefing.objects.create(name="Первичный")
+    course = Course.objects.create(
+        course_number='001', course_name="Машинист крана автомобильного"
+    )
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    for i in range(5):
+        examined = Examined.objects.create(
+            full_name=f"Тестируемый {i}",
+            position="Инженер",
+            brigade="Цех №1",
+            safety_group='III',
+            work_experience="5 лет",
+            user=user
+        )
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=f'{i}/2024',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        )
+    Examination.objects.update(organization=None)
+
+    organization_migration.backfill_organization(
+        apps, SimpleNamespace(connection=connection)
+    )
+
+    assert Examination.objects.filter(organization=organization).count() == 5
+
+
+@pytest.mark.django_db
+def test_deduplicate_commissions(monkeypatch):
+    """
+    Тестирование пакетного объединения одинаковых комиссий: проверки
+    переносятся на первую комиссию, дубликаты удаляются.
+    """
+    monkeypatch.setattr(fingerprint_migration, 'BATCH_SIZE', 2)
+    user = User.objects.create_user(username='testuser')
+    briefing = Briefing.objects.create(name="Первичный")
+    course = Course.objects.create(
+        course_number='001', course_name="Машинист крана автомобильного"
+    )
+    members = {
+        'chairman_position': "Директор",
+        'member1_name': "Пётр Петров",
+        'member1_position': "Главный инженер",
+        'member2_name': "Николай Сидоров",
+        'member2_position': "Техник",
+        'safety_officer_name': "Анна Алексеева",
+        'safety_officer_position': "Электрик",
+    }
+    # Дубликаты вставляются в обход save с временными отпечатками, как
+    # если бы они были созданы до появления отпечатка
+    commissions = Commission.objects.bulk_create([
+        Commission(fingerprint=str(i), chairman_name=name, **members)
+        for i, name in enumerate([
+            "Иван Иванов", "Иван  Иванов", "Сергей Сергеев", "иван иванов",
+            "Сергей Сергеев",
+        ])
+    ])
+    examined = Examined.objects.create(
+        full_name="Тестируемый", position="Инженер", brigade="Цех №1",
+        safety_group='III', work_experience="5 лет", user=user
+    )
+    for i, commission in enumerate(commissions):
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=f'{i}/2024',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        )
+
+    fingerprint_migration.deduplicate_commissions(
+        apps, SimpleNamespace(connection=connection)
+    )
+
+    assert set(Commission.objects.values_list('pk', flat=True)) == {
+        commissions[0].pk, commissions[2].pk
+    }
+    assert list(Examination.objects.order_by('protocol_number').values_list(
+        'commission', flat=True
+    )) == [commissions[i].pk for i in (0, 0, 2, 0, 2)]
+    for commission in Commission.objects.all():
+        assert commission.fingerprint == commission.get_fingerprint()
+
+
+@pytest.mark.django_db
+def test_link_employees(monkeypatch):
+    """
+    Тестирование пакетной привязки аттестуемых и проверок к сотрудникам:
+    записи одной организации с тем же ФИО относятся к одному сотруднику,
+    уже существующие сотрудники используются повторно.
+    """
+    monkeypatch.setattr(employee_migration, 'BATCH_SIZE', 2)
+    organization = Organization.objects.create(name='Test organization')
+    users = [
+        User.objects.create_user(
+            username='testuser', email='testuser@example.com',
+            organization=organization
+        ),
+        User.objects.create_user(
+            username='otheruser', email='otheruser@example.com',
+            organization=Organization.objects.create(name='Other')
+        ),
+    ]
+    briefing = Briefing.objects.create(name="Первичный")
+    course = Course.objects.create(
+        course_number='001', course_name="Машинист крана автомобильного"
+    )
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    for i, (name, user) in enumerate([
+        ("Антонио Фагундес", users[0]),
+        ("Флавио Кортес", users[0]),
+        ("антонио  фагундес", users[0]),
+        ("Антонио Фагундес", users[1]),
+        ("Флавио Кортес", users[0]),
+    ]):
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=f'{i}/2024',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=Examined.objects.create(
+                full_name=name, position="Инженер", brigade="Цех №1",
+                safety_group='III', work_experience="5 лет", user=user
+            ),
+        )
+    # Состояние до миграции: записи без сотрудников и один сотрудник,
+    # созданный раньше
+    Examination.objects.update(employee=None)
+    Examined.objects.update(employee=None)
+    Employee.objects.exclude(full_name="Флавио Кортес").delete()
+    existing = Employee.objects.get()
+
+    employee_migration.link_employees(
+        apps, SimpleNamespace(connection=connection)
+    )
+
+    assert Employee.objects.count() == 3
+    employees = list(Examination.objects.order_by(
+        'protocol_number'
+    ).values_list('employee', flat=True))
+    assert employees == list(Examined.objects.order_by(
+        'examination__protocol_number'
+    ).values_list('employee', flat=True))
+    assert employees[0] == employees[2] != employees[3]
+    assert employees[1] == employees[4] == existing.pk
+    assert Employee.objects.get(
+        pk=employees[3]
+    ).organization == users[1].organization
+
+
+@pytest.mark.django_db
+def test_populate_latest(monkeypatch):
+    """
+    Тестирование пакетного заполнения таблицы текущих проверок: по каждой
+    паре сотрудник — программа записывается последняя по дате проверка.
+    """
+    monkeypatch.setattr(latest_migration, 'BATCH_SIZE', 2)
+    user = User.objects.create_user(
+        username='testuser', email='testuser@example.com',
+        organization=Organization.objects.create(name='Test organization')
+    )
+    briefing = Briefing.objects.create(name="Первичный")
+    courses = [
+        Course.objects.create(
+            course_number=f'00{i}', course_name=f"Программа 00{i}"
+        )
+        for i in range(1, 3)
+    ]
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    expected = set()
+    for i, name in enumerate(["Сотрудник 1", "Сотрудник 2", "Сотрудник 3"]):
+        examined = Examined.objects.create(
+            full_name=name, position="Инженер", brigade="Цех №1",
+            safety_group='III', work_experience="5 лет", user=user
+        )
+        for year, course in [(2023, 0), (2024, 0), (2022, 1)]:
+            examination = Examination.objects.create(
+                current_check_date=date(year, 1, 15),
+                next_check_date=date(year + 1, 1, 15),
+                protocol_number=f'{i}-{year}/{course}',
+                reason="Повторная",
+                briefing=briefing,
+                course=courses[course],
+                commission=commission,
+                examined=examined,
+            )
+            if year != 2023:
+                expected.add(examination.pk)
+    # Состояние до миграции: таблица текущих проверок пуста
+    LatestExamination.objects.all().delete()
+
+    latest_migration.populate_latest(
+        apps, SimpleNamespace(connection=connection)
+    )
+
+    assert set(LatestExamination.objects.values_list(
+        'examination', flat=True
+    )) == expected
+    assert not LatestExamination.objects.exclude(
+        next_check_date=F('examination__next_check_date'),
+        organization=F('examination__organization'),
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_fill_search_documents(monkeypatch):
+    """
+    Тестирование пакетного заполнения поисковых документов проверок,
+    созданных до миграции.
+    """
+    monkeypatch.setattr(search_migration, 'BATCH_SIZE', 2)
+    user = User.objects.create_user(
+        username='testuser', email='testuser@example.com',
+        organization=Organization.objects.create(name='Test organization')
+    )
+    briefing = Briefing.objects.create(name="Первичный")
+    course = Course.objects.create(
+        course_number='001', course_name="Охрана труда"
+    )
+    commission = Commission.objects.create(
+        chairman_name="Иван Иванов",
+        chairman_position="Директор",
+        member1_name="Пётр Петров",
+        member1_position="Главный инженер",
+        member2_name="Николай Сидоров",
+        member2_position="Техник",
+        safety_officer_name="Анна Алексеева",
+        safety_officer_position="Электрик"
+    )
+    for i in range(5):
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=f'{i}/2024',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=Examined.objects.create(
+                full_name=f"Сотрудник {i}", position="Инженер",
+                brigade="Цех №1", safety_group='III',
+                work_experience="5 лет", user=user
+            ),
+        )
+    # Состояние до миграции: поисковых документов нет
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    queryset = Examination.objects.all()
+    assert not search_examinations(queryset, 'охрана').exists()
+
+    search_migration.fill_search_documents(
+        apps, SimpleNamespace(connection=connection)
+    )
+
+    assert search_examinations(queryset, 'охрана').count() == 5
+    assert search_examinations(queryset, '3/2024 инженер').count() == 1
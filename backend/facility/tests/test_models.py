@@ -1,7 +1,10 @@
 from datetime import date
 
+from django.core.exceptions import ValidationError
+from django.db.models import ProtectedError
 from django.test import TestCase
-from facility.models import Briefing, Commission, Course, Examination, Examined
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined)
 from users.models import Organization, User
 
 
@@ -32,6 +35,42 @@ class CommissionModelTest(TestCase):
         """
         self.assertEqual(str(self.commission), "Комиссия: Иван Иванов")
 
+    def test_commission_reused_by_members(self):
+        """
+        Тестирование поиска комиссии по составу без учёта пробелов и
+        регистра.
+        """
+        commission, created = Commission.objects.get_or_create_by_members(
+            chairman_name="  иван   Иванов ",
+            chairman_position="директор",
+            member1_name="Пётр Петров",
+            member1_position="Главный инженер",
+            member2_name="Николай Сидоров",
+            member2_position="Техник",
+            safety_officer_name="Анна Алексеева",
+            safety_officer_position="Электрик"
+        )
+        self.assertFalse(created)
+        self.assertEqual(commission, self.commission)
+
+    def test_commission_fingerprint_updated(self):
+        """
+        Тестирование пересчёта отпечатка при изменении состава и проверки
+        повторяющегося состава.
+        """
+        self.commission.chairman_name = "Сергей Сергеев"
+        self.commission.save(update_fields=['chairman_name'])
+        self.commission.refresh_from_db()
+        self.assertEqual(
+            self.commission.fingerprint, self.commission.get_fingerprint()
+        )
+        duplicate = Commission(**{
+            name: getattr(self.commission, name)
+            for name in Commission.MEMBER_FIELDS
+        })
+        with self.assertRaises(ValidationError):
+            duplicate.full_clean()
+
 
 class ExaminedModelTest(TestCase):
     """Тесты модели Examined."""
@@ -81,6 +120,41 @@ class ExaminedModelTest(TestCase):
         """
         self.assertEqual(str(self.examined), "Антонио Фагундес")
 
+    def test_examined_linked_to_employee(self):
+        """
+        Тестирование привязки записей аттестуемого с тем же ФИО к одному
+        сотруднику организации без учёта пробелов и регистра.
+        """
+        other_user = User.objects.create_user(
+            username='otheruser',
+            organization=Organization.objects.create(name='Other')
+        )
+        same = Examined.objects.create(
+            full_name="  антонио   ФАГУНДЕС ",
+            position="Мастер",
+            brigade="Цех №3",
+            safety_group='IV',
+            work_experience="6 лет",
+            user=self.user
+        )
+        other = Examined.objects.create(
+            full_name="Антонио Фагундес",
+            position="Мастер",
+            brigade="Цех №3",
+            safety_group='IV',
+            work_experience="6 лет",
+            user=other_user
+        )
+        self.assertEqual(same.employee, self.examined.employee)
+        self.assertEqual(
+            self.examined.employee.organization, self.organization
+        )
+        self.assertEqual(
+            self.examined.employee.name_key, "антонио фагундес"
+        )
+        self.assertNotEqual(other.employee, self.examined.employee)
+        self.assertEqual(Employee.objects.count(), 2)
+
 
 class BriefingModelTest(TestCase):
     """Тесты модели Briefing."""
@@ -200,3 +274,30 @@ class ExaminationModelTest(TestCase):
         Тестирование строкового представления Examination.
         """
         self.assertEqual(str(self.examination), "Проверка 123/2024")
+
+    def test_examination_organization(self):
+        """
+        Тестирование присвоения организации аттестуемого при создании
+        новой проверки.
+        """
+        self.assertEqual(self.examination.organization, self.organization)
+
+    def test_commission_with_examinations_protected(self):
+        """
+        Тестирование запрета удаления комиссии, по которой есть проверки:
+        одна комиссия используется проверками разных организаций.
+        """
+        with self.assertRaises(ProtectedError):
+            self.commission.delete()
+        self.assertTrue(Examination.objects.filter(
+            pk=self.examination.pk
+        ).exists())
+
+    def test_examination_employee(self):
+        """
+        Тестирование присвоения сотрудника аттестуемого при создании
+        новой проверки и выбора последней проверки сотрудника.
+        """
+        employee = self.examination.examined.employee
+        self.assertEqual(self.examination.employee, employee)
+        self.assertEqual(employee.get_latest_examination(), self.examination)
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from facility.models import ExaminationNotification
+from facility.notifications import send_notifications
+from users.models import Organization, User
+
+TODAY = date(2024, 6, 1)
+
+
+class CountingBackend(EmailBackend):
+    """Почтовый бэкенд, считающий открытые соединения."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+@pytest.fixture
+def users(db):
+    """Фикстура создания пользователей двух организаций и без адреса."""
+    return [
+        User.objects.create_user(
+            username=f'user{i}',
+            email=f'user{i}@example.com' if i < 2 else '',
+            organization=Organization.objects.create(name=f'Organization {i}')
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_send_notifications(users, make_examination, settings,
+                            django_assert_num_queries):
+    """
+    Тестирование рассылки: каждый автор получает одно письмо о своих
+    проверках с наступающим сроком через общее соединение, а
+    отправленные уведомления не повторяются.
+    """
+    settings.EMAIL_BACKEND = (
+        'facility.tests.test_notifications.CountingBackend'
+    )
+    CountingBackend.opened = 0
+    first = make_examination(users[0], "Сотрудник 1", TODAY)
+    make_examination(users[0], "Сотрудник 2", TODAY + timedelta(days=30))
+    make_examination(users[1], "Сотрудник 3", TODAY + timedelta(days=10))
+    make_examination(users[2], "Сотрудник 4", TODAY + timedelta(days=10))
+    # Срок вне окна рассылки, уже прошёл или продлён новой проверкой
+    make_examination(users[0], "Сотрудник 5", TODAY + timedelta(days=31))
+    make_examination(users[0], "Сотрудник 6", TODAY - timedelta(days=1))
+    make_examination(
+        users[1], "Сотрудник 7", TODAY + timedelta(days=5),
+        current_check_date=date(2023, 1, 15)
+    )
+    make_examination(users[1], "Сотрудник 7", TODAY + timedelta(days=400))
+
+    # Выборка проверок и запись уведомлений
+    with django_assert_num_queries(2):
+        result = send_notifications(today=TODAY, days=30)
+
+    assert (result.examinations, result.sent, result.notified,
+            result.skipped) == (4, 2, 3, 1)
+    assert CountingBackend.opened == 1
+    assert sorted(message.to[0] for message in mail.outbox) == [
+        'user0@example.com', 'user1@example.com'
+    ]
+    body = next(
+        message.body for message in mail.outbox
+        if message.to == ['user0@example.com']
+    )
+    assert "Сотрудник 1" in body and "Сотрудник 2" in body
+    assert "01.06.2024" in body
+    assert ExaminationNotification.objects.count() == 3
+
+    assert send_notifications(today=TODAY, days=30).sent == 0
+    # После переноса срока уведомление отправляется снова
+    first.next_check_date = TODAY + timedelta(days=20)
+    first.save(update_fields=['next_check_date'])
+    result = send_notifications(today=TODAY, days=30)
+    assert (result.sent, result.notified) == (1, 1)
+    assert len(mail.outbox) == 3
+
+
+@pytest.mark.django_db
+def test_notify_command(users, make_examination):
+    """Тестирование команды рассылки, в том числе без отправки писем."""
+    make_examination(users[0], "Сотрудник 1", timezone.localdate())
+    stdout = StringIO()
+    call_command('notify_due_examinations', dry_run=True, stdout=stdout)
+    assert 'будет отправлено писем: 1' in stdout.getvalue()
+    assert not mail.outbox
+    stdout = StringIO()
+    call_command('notify_due_examinations', days=0, stdout=stdout)
+    assert 'отправлено писем: 1' in stdout.getvalue()
+    assert len(mail.outbox) == 1
+    assert ExaminationNotification.objects.get().recipient == users[0]
@@ -0,0 +1,250 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from facility.filters import ORDERING_FIELDS
+from facility.models import Briefing, Commission, Course, Examination, Examined
+from facility.pagination import (ApproximateCountPaginator, CursorPaginator,
+                                 approximate_count, encode_cursor)
+from users.models import Organization, User
+
+PER_PAGE = 3
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура очистки кэша между тестами."""
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+@pytest.fixture
+def examinations(user):
+    """
+    Фикстура создания проверок с повторяющимися значениями полей
+    сортировки, чтобы порядок внутри групп определялся первичным ключом.
+    """
+    briefing = Briefing.objects.create(name='Первичный')
+    courses = [
+        Course.objects.create(
+            course_number=f'00{i}', course_name=f'Программа {i}'
+        )
+        for i in range(3)
+    ]
+    commission = Commission.objects.create(
+        chairman_name='Иван Иванов',
+        chairman_position='Директор',
+        member1_name='Пётр Петров',
+        member1_position='Главный инженер',
+        member2_name='Николай Сидоров',
+        member2_position='Техник',
+        safety_officer_name='Анна Алексеева',
+        safety_officer_position='Электрик'
+    )
+    for i in range(11):
+        examined = Examined.objects.create(
+            full_name=f'Тестируемый {i}',
+            position='Инженер',
+            brigade=f'Цех №{i % 4}',
+            safety_group='III',
+            work_experience='5 лет',
+            user=user
+        )
+        current = date(2024, 1, 1) + timedelta(days=i % 3)
+        Examination.objects.create(
+            current_check_date=current,
+            next_check_date=current + timedelta(days=365),
+            protocol_number=f'{i % 5}/2024',
+            reason='Повторная',
+            briefing=briefing,
+            course=courses[i % 3],
+            commission=commission,
+            examined=examined,
+        )
+    return Examination.objects.select_related('examined', 'course')
+
+
+def walk(paginator, direction='next', cursor=None):
+    """Проходит все страницы в указанном направлении."""
+    pages = []
+    while True:
+        page = paginator.page(cursor)
+        pages.append([examination.pk for examination in page])
+        cursor = getattr(page, f'{direction}_cursor')
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ordering', [
+    prefix + field for field in ORDERING_FIELDS for prefix in ('', '-')
+])
+def test_cursor_pages_match_ordering(examinations, ordering):
+    """
+    Тестирование того, что страницы по курсору в обоих направлениях
+    совпадают с отсортированным списком для всех полей сортировки.
+    """
+    expected = list(
+        examinations.order_by(
+            ordering, '-pk' if ordering.startswith('-') else 'pk'
+        ).values_list('pk', flat=True)
+    )
+    expected_pages = [
+        expected[i:i + PER_PAGE] for i in range(0, len(expected), PER_PAGE)
+    ]
+    paginator = CursorPaginator(examinations, PER_PAGE, ordering)
+    assert walk(paginator) == expected_pages
+
+    last_page = paginator.page()
+    while last_page.has_next():
+        last_page = paginator.page(last_page.next_cursor)
+    backward = walk(paginator, 'previous', last_page.previous_cursor)
+    assert backward == expected_pages[-2::-1]
+
+
+@pytest.mark.django_db
+def test_cursor_page_flags(examinations):
+    """Тестирование признаков наличия соседних страниц."""
+    paginator = CursorPaginator(examinations, PER_PAGE, '-created_at')
+    first = paginator.page()
+    assert first.has_next() and not first.has_previous()
+    second = paginator.page(first.next_cursor)
+    assert second.has_next() and second.has_previous()
+    assert paginator.page(second.previous_cursor).previous_cursor is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', ['invalid', 'e30', '!!!'])
+def test_invalid_cursor_returns_first_page(examinations, cursor):
+    """Тестирование того, что повреждённый курсор ведёт на первую страницу."""
+    paginator = CursorPaginator(examinations, PER_PAGE, 'protocol_number')
+    first = paginator.page()
+    assert list(paginator.page(cursor)) == list(first)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('values', [
+    ['not a date', 1, 'next'],
+    ['2024-01-15', 'abc', 'next'],
+    ['2024-01-15', None, 'previous'],
+    [{'date': '2024-01-15'}, [1], 'next'],
+    ['2024-01-15', 1, 'sideways'],
+    ['2024-01-15', 1],
+])
+def test_cursor_with_wrong_values(client, settings, user, examinations,
+                                  values):
+    """
+    Тестирование курсора с изменёнными значениями: вместо ошибки
+    сервера открывается первая страница.
+    """
+    cursor = encode_cursor('next_check_date', values)
+    paginator = CursorPaginator(examinations, PER_PAGE, 'next_check_date')
+    first = paginator.page()
+    assert list(paginator.page(cursor)) == list(first)
+
+    settings.INDEX_PAGINATION = 'cursor'
+    client.login(username=user.username, password='password123')
+    response = client.get(reverse('facility:index'), {
+        'order_by': 'next_check_date', 'cursor': cursor
+    })
+    assert response.status_code == 200
+    assert not response.context['page_obj'].has_previous()
+
+
+@pytest.mark.django_db
+def test_cursor_of_other_ordering_ignored(examinations):
+    """Тестирование того, что курсор другой сортировки не применяется."""
+    page = CursorPaginator(examinations, PER_PAGE, 'created_at').page()
+    paginator = CursorPaginator(examinations, PER_PAGE, '-created_at')
+    assert list(paginator.page(page.next_cursor)) == list(paginator.page())
+
+
+@pytest.mark.django_db
+def test_approximate_count_falls_back_to_count(examinations):
+    """Тестирование точного подсчёта вне PostgreSQL."""
+    assert approximate_count(examinations) == 11
+    assert ApproximateCountPaginator(examinations, PER_PAGE).num_pages == 4
+
+
+@pytest.mark.django_db
+def test_index_view_cursor_mode(client, settings, user, examinations,
+                                django_assert_max_num_queries):
+    """
+    Тестирование ключевой пагинации главной страницы: переход по курсору
+    сохраняет фильтры и не требует подсчёта записей.
+    """
+    settings.INDEX_PAGINATION = 'cursor'
+    client.login(username=user.username, password='password123')
+    url = reverse('facility:index')
+    response = client.get(url, {'order_by': 'next_check_date'})
+    assert response.status_code == 200
+    assert response.context['cursor_pagination']
+    assert response.context['pagination_query'] == 'order_by=next_check_date'
+    page = response.context['page_obj']
+    assert page.count is None
+    assert f'?cursor={page.next_cursor}&order_by=next_check_date' in (
+        response.content.decode()
+    )
+
+    seen = [examination.pk for examination in page]
+    while page.has_next():
+        with django_assert_max_num_queries(4):
+            response = client.get(url, {
+                'order_by': 'next_check_date', 'cursor': page.next_cursor
+            })
+        page = response.context['page_obj']
+        seen += [examination.pk for examination in page]
+    assert sorted(seen) == sorted(e.pk for e in examinations)
+
+
+@pytest.mark.django_db
+def test_index_view_invalid_ordering(client, user, examinations):
+    """
+    Тестирование того, что недопустимая сортировка заменяется сортировкой
+    по умолчанию.
+    """
+    client.login(username=user.username, password='password123')
+    response = client.get(reverse('facility:index'), {'order_by': 'reason'})
+    assert response.status_code == 200
+    assert response.context['examinations'][0] == (
+        examinations.order_by('-created_at').first()
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ordering, index', [
+    ('-created_at', 'examination_org_created_idx'),
+    ('created_at', 'examination_org_created_idx'),
+    ('next_check_date', 'examination_org_next_idx'),
+    ('-current_check_date', 'examination_org_current_idx'),
+])
+def test_deep_cursor_uses_index_range(user, examinations, ordering, index):
+    """
+    Тестирование плана запроса страницы по курсору: записи организации
+    выбираются диапазоном составного индекса без дополнительной
+    сортировки.
+    """
+    if connection.vendor != 'sqlite':
+        pytest.skip('План запроса проверяется для SQLite.')
+    queryset = examinations.filter(organization=user.organization_id)
+    paginator = CursorPaginator(queryset, PER_PAGE, ordering)
+    page = paginator.page(paginator.page().next_cursor)
+    for cursor in (page.next_cursor, page.previous_cursor):
+        plan = paginator.get_queryset(
+            paginator.get_position(cursor)
+        ).explain()
+        field = ordering.lstrip('-')
+        assert f'USING INDEX {index} (organization_id=? AND {field}' in plan
+        assert 'TEMP B-TREE' not in plan
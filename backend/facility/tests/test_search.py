@@ -0,0 +1,125 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from facility.models import Examination
+from facility.search import make_match_query, search_examinations
+from users.models import Organization, User
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+def search(text):
+    """Возвращает идентификаторы проверок, найденных по тексту."""
+    return set(search_examinations(
+        Examination.objects.all(), text
+    ).values_list('pk', flat=True))
+
+
+def test_make_match_query():
+    """
+    Тестирование запроса FTS5: слова ищутся по началу, кавычки
+    экранируются, «ё» заменяется на «е».
+    """
+    assert make_match_query('петр  инж') == '"петр"* "инж"*'
+    assert make_match_query('Фёдоров') == '"Федоров"*'
+    assert make_match_query('"Цех"') == '"""Цех"""*'
+
+
+@pytest.mark.django_db
+def test_search_examinations(user, make_examination):
+    """
+    Тестирование поиска по полям аттестуемого, программы обучения,
+    комиссии и номеру протокола: находятся проверки, содержащие все слова
+    запроса, без учёта регистра.
+    """
+    first = make_examination(
+        user, "Смирнов Олег", course='002', course_name="Охрана труда"
+    )
+    second = make_examination(user, "Кузнецов Павел", position="Мастер")
+
+    assert search('смирнов') == {first.pk}
+    assert search('маст') == {second.pk}
+    assert search('охрана труда') == {first.pk}
+    assert search('программа кузнецов') == {second.pk}
+    assert search('Алексеева') == {first.pk, second.pk}
+    assert search(second.protocol_number) == {second.pk}
+    assert search('смирнов мастер') == set()
+    assert search('  ') == {first.pk, second.pk}
+
+
+@pytest.mark.django_db
+def test_search_updated_by_signals(user, make_examination, commission):
+    """
+    Тестирование обновления поисковых документов при изменении проверки,
+    аттестуемого, программы обучения и комиссии и при удалении проверки.
+    """
+    examination = make_examination(user, "Смирнов Олег")
+
+    examination.protocol_number = 'A-77'
+    examination.save(update_fields=['protocol_number'])
+    assert search('A-77') == {examination.pk}
+
+    examined = examination.examined
+    examined.full_name = "Орлов Олег"
+    examined.save()
+    assert search('орлов') == {examination.pk}
+    assert search('смирнов') == set()
+
+    course = examination.course
+    course.course_name = "Работы на высоте"
+    course.save(update_fields=['course_name'])
+    assert search('высоте') == {examination.pk}
+
+    commission.chairman_name = "Фёдор Фёдоров"
+    commission.save()
+    assert search('федоров') == search('Фёдоров') == {examination.pk}
+
+    examination.delete()
+    assert search('орлов') == set()
+
+
+@pytest.mark.django_db
+def test_search_skipped_for_other_fields(user, make_examination,
+                                         django_assert_num_queries):
+    """
+    Тестирование сохранения полей, не входящих в поисковый документ:
+    запрос обновления документа не выполняется.
+    """
+    examination = make_examination(user, "Смирнов Олег")
+    examined = examination.examined
+    examined.work_experience = "6 лет"
+    with django_assert_num_queries(1):
+        examined.save(update_fields=['work_experience'])
+    examined.position = "Мастер"
+    with django_assert_num_queries(2):
+        examined.save(update_fields=['position'])
+    assert search('мастер') == {examination.pk}
+
+
+@pytest.mark.django_db
+def test_index_view_search(client, user, make_examination):
+    """
+    Тестирование поиска в списке проверок: параметр q оставляет проверки,
+    найденные полнотекстовым поиском.
+    """
+    cache.clear()
+    make_examination(user, "Смирнов Олег")
+    other = make_examination(
+        user, "Кузнецов Павел", course='002', course_name="Охрана труда"
+    )
+    client.login(username='testuser', password='password123')
+
+    response = client.get(reverse('facility:index'), {'q': 'охрана'})
+
+    assert response.status_code == 200
+    assert list(response.context['examinations']) == [other]
+    assert 'value="охрана"' in response.content.decode()
@@ -0,0 +1,157 @@
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from facility.models import Examination
+from facility.statistics import add_months, build_statistics, get_statistics
+from users.models import Organization, User
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.fixture
+def user(db):
+    """Фикстура создания пользователя организации."""
+    return User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='password123',
+        organization=Organization.objects.create(name='Test organization')
+    )
+
+
+def test_add_months():
+    """Тестирование сдвига месяца с переходом через год."""
+    assert add_months(date(2024, 6, 15), 0) == date(2024, 6, 1)
+    assert add_months(date(2024, 1, 31), -1) == date(2023, 12, 1)
+    assert add_months(date(2024, 12, 1), 1) == date(2025, 1, 1)
+    assert add_months(date(2024, 6, 15), -23) == date(2022, 7, 1)
+
+
+@pytest.mark.django_db
+def test_build_statistics(user, make_examination, django_assert_num_queries):
+    """
+    Тестирование статистики: проверки считаются по месяцам, программам и
+    цехам, повторные проверки дают средний интервал между проверками.
+    """
+    make_examination(
+        user, "Сотрудник 1", current_check_date=date(2024, 6, 1),
+        previous_check_date=date(2023, 6, 1)
+    )
+    make_examination(
+        user, "Сотрудник 1", current_check_date=date(2024, 4, 10),
+        previous_check_date=date(2023, 4, 30), course='002'
+    )
+    make_examination(
+        user, "Сотрудник 2", current_check_date=date(2024, 4, 20),
+        brigade="Цех №2"
+    )
+    # Проверка раньше окна по месяцам учитывается в остальных таблицах
+    make_examination(user, "Сотрудник 3", current_check_date=date(2023, 1, 15))
+
+    # Итоги, месяцы, программы обучения и цеха
+    with django_assert_num_queries(4):
+        statistics = build_statistics(
+            Examination.objects.all(), TODAY, months=3
+        )
+
+    totals = statistics['totals']
+    assert (totals['count'], totals['renewals']) == (4, 2)
+    assert totals['interval'] == 356
+    assert totals['validity'] == 365
+    assert [
+        (row['month'], row['count']) for row in statistics['months']
+    ] == [
+        (date(2024, 4, 1), 2), (date(2024, 5, 1), 0), (date(2024, 6, 1), 1)
+    ]
+    assert statistics['max_month'] == 2
+    courses = statistics['courses']
+    assert [
+        (row['course__course_number'], row['count'], row['renewals'])
+        for row in courses
+    ] == [('001', 3, 1), ('002', 1, 1)]
+    assert courses[0]['interval'] == 366
+    assert [
+        (row['examined__brigade'], row['count'])
+        for row in statistics['brigades']
+    ] == [("Цех №1", 3), ("Цех №2", 1)]
+    assert statistics['max_course'] == statistics['max_brigade'] == 3
+
+
+@pytest.mark.django_db
+def test_statistics_cache(user, make_examination, django_assert_num_queries,
+                          django_capture_on_commit_callbacks):
+    """
+    Тестирование кэша статистики: повторная статистика не обращается к
+    базе, а после изменения проверок организации пересчитывается.
+    """
+    cache.clear()
+    today = timezone.localdate()
+    make_examination(user, "Сотрудник 1", current_check_date=today)
+    assert get_statistics(user)['totals']['count'] == 1
+    with django_assert_num_queries(0):
+        assert get_statistics(user)['totals']['count'] == 1
+    with django_capture_on_commit_callbacks(execute=True):
+        make_examination(user, "Сотрудник 2", current_check_date=today)
+    assert get_statistics(user)['totals']['count'] == 2
+
+
+@pytest.mark.django_db
+def test_statistics_course_rename(user, make_examination,
+                                  django_capture_on_commit_callbacks):
+    """
+    Тестирование кэша статистики при переименовании программы обучения:
+    статистика пересчитывается с новым наименованием.
+    """
+    cache.clear()
+    course = make_examination(
+        user, "Сотрудник 1", current_check_date=timezone.localdate()
+    ).course
+    assert [
+        row['course__course_name'] for row in get_statistics(user)['courses']
+    ] == ["Программа 001"]
+    course.course_name = "Работы на высоте"
+    with django_capture_on_commit_callbacks(execute=True):
+        course.save()
+    assert [
+        row['course__course_name'] for row in get_statistics(user)['courses']
+    ] == ["Работы на высоте"]
+
+
+@pytest.mark.django_db
+def test_statistics_view(client, user, make_examination):
+    """
+    Тестирование страницы статистики: пользователь видит проверки своей
+    организации, суперпользователь выбирает организацию.
+    """
+    cache.clear()
+    other = User.objects.create_user(
+        username='otheruser',
+        email='otheruser@example.com',
+        organization=Organization.objects.create(name='Other')
+    )
+    today = timezone.localdate()
+    make_examination(user, "Сотрудник 1", current_check_date=today)
+    make_examination(
+        other, "Сотрудник 2", current_check_date=today, course='002'
+    )
+    make_examination(
+        other, "Сотрудник 3", current_check_date=today, course='002'
+    )
+    url = reverse('facility:statistics')
+
+    client.login(username='testuser', password='password123')
+    response = client.get(url, {'organization': other.organization_id})
+    assert response.status_code == 200
+    statistics = response.context['statistics']
+    assert statistics['totals']['count'] == 1
+    assert 'chart-bar' in response.content.decode()
+
+    User.objects.create_superuser(username='admin', password='adminpassword')
+    client.login(username='admin', password='adminpassword')
+    assert client.get(url).context['statistics']['totals']['count'] == 3
+    response = client.get(url, {'organization': other.organization_id})
+    courses = response.context['statistics']['courses']
+    assert [row['course__course_number'] for row in courses] == ['002']
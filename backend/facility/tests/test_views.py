@@ -3,8 +3,11 @@ from datetime import date
 import pytest
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from facility.models import Briefing, Commission, Course, Examination, Examined
+from facility.models import (Briefing, Commission, Course, Employee,
+                             Examination, Examined)
 from users.models import Organization, User
 
 
@@ -88,6 +91,31 @@ def test_index_view_user(client, create_user, create_examination):
     assert len(response.context['examinations']) == 1
 
 
+@pytest.mark.django_db
+def test_index_view_current_filter(client, create_user, create_examination):
+    """
+    Тестирование фильтра текущих проверок: проверка, продлённая более
+    поздней проверкой сотрудника по той же программе, не отображается.
+    """
+    later = Examination.objects.create(
+        current_check_date=date(2025, 1, 10),
+        next_check_date=date(2026, 1, 10),
+        protocol_number='124/2025',
+        reason="Повторная",
+        briefing=create_examination.briefing,
+        course=create_examination.course,
+        commission=create_examination.commission,
+        examined=create_examination.examined,
+    )
+    cache.clear()
+    client.login(username=create_user.username, password='password123')
+    url = reverse('facility:index')
+    assert len(client.get(url).context['examinations']) == 2
+    response = client.get(url, {'current': '1'})
+    assert list(response.context['examinations']) == [later]
+    assert 'checked' in response.content.decode()
+
+
 @pytest.mark.django_db
 def test_pagination_in_index_view(client, create_user):
     """Тестирование работы пагинации списка проверок."""
@@ -149,6 +177,81 @@ def test_pagination_in_index_view(client, create_user):
     assert response.context['page_obj'].number == 2
 
 
+def create_organization_examinations(user, count):
+    """Создаёт заданное количество проверок со связанными записями."""
+    briefing = Briefing.objects.create(name="Первичный")
+    course = Course.objects.create(
+        course_number='001', course_name="Машинист крана автомобильного"
+    )
+    for i in range(count):
+        commission = Commission.objects.create(
+            chairman_name=f"Член {i}",
+            chairman_position="Директор",
+            member1_name=f"Петров {i}",
+            member1_position="Главный инженер",
+            member2_name=f"Сидоров {i}",
+            member2_position="Техник",
+            safety_officer_name=f"Анна {i}",
+            safety_officer_position="Электрик"
+        )
+        examined = Examined.objects.create(
+            full_name=f"Тестируемый {i}",
+            position="Инженер",
+            brigade=f"Цех №{i}",
+            safety_group='III',
+            work_experience="5 лет",
+            user=user
+        )
+        Examination.objects.create(
+            current_check_date=date(2024, 1, 15),
+            next_check_date=date(2025, 1, 15),
+            protocol_number=f'123/2024-{i}',
+            reason="Повторная",
+            briefing=briefing,
+            course=course,
+            commission=commission,
+            examined=examined,
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, settings.DISPLAY_COUNT * 3])
+def test_index_view_queries_superuser(client, create_user, create_superuser,
+                                      django_assert_max_num_queries, count):
+    """
+    Тестирование постоянного числа запросов к базе при отображении списка
+    проверок суперпользователю, независимо от количества записей.
+    """
+    create_organization_examinations(create_user, count)
+    cache.clear()
+    client.login(username=create_superuser.username, password='adminpassword')
+    with django_assert_max_num_queries(5):
+        response = client.get(reverse('facility:index'))
+    assert response.status_code == 200
+    assert 'Test organization' in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, settings.DISPLAY_COUNT * 3])
+def test_index_view_queries_user(client, create_user,
+                                 django_assert_max_num_queries, count):
+    """
+    Тестирование постоянного числа запросов к базе при отображении списка
+    проверок пользователю организации, независимо от количества записей.
+    """
+    create_organization_examinations(create_user, count)
+    cache.clear()
+    client.login(username=create_user.username, password='password123')
+    with django_assert_max_num_queries(5):
+        response = client.get(
+            reverse('facility:index') + '?order_by=-course__course_name'
+        )
+    assert response.status_code == 200
+    assert len(response.context['examinations']) == min(
+        count, settings.DISPLAY_COUNT
+    )
+
+
 @pytest.mark.django_db
 def test_create_examination_view(client, create_user, create_superuser):
     """Тестирование создания новой проверки."""
@@ -186,6 +289,50 @@ def test_create_examination_view(client, create_user, create_superuser):
     assert Examination.objects.count() == 1
 
 
+@pytest.mark.django_db
+def test_create_view_prefilled_by_employee(client, create_examination):
+    """
+    Тестирование заполнения формы создания данными сотрудника: данные
+    аттестуемого и предыдущая проверка берутся из последней проверки.
+    """
+    client.login(username='testuser', password='password123')
+    employee = create_examination.employee
+    response = client.get(
+        reverse('facility:create_examination'), {'employee': employee.pk}
+    )
+    assert response.status_code == 200
+    initial = response.context['form'].initial
+    assert initial['employee'] == employee.pk
+    assert initial['full_name'] == "Антонио Фагундес"
+    assert initial['position'] == "инженер"
+    assert initial['previous_safety_group'] == 'III'
+    assert initial['previous_check_date'] == date(2024, 1, 15)
+
+
+@pytest.mark.django_db
+def test_employee_autocomplete_view(client, create_examination):
+    """
+    Тестирование подсказок ФИО: поиск по началу ФИО без учёта регистра
+    только среди сотрудников организации пользователя.
+    """
+    Employee.objects.create(
+        full_name="Антонио Фагундес",
+        organization=Organization.objects.create(name='Other')
+    )
+    client.login(username='testuser', password='password123')
+    url = reverse('facility:employee_autocomplete')
+    response = client.get(url, {'q': ' антонио'})
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['id'] for result in results] == [
+        create_examination.employee_id
+    ]
+    assert results[0]['url'].endswith(
+        f'?employee={create_examination.employee_id}'
+    )
+    assert client.get(url, {'q': 'а'}).json() == {'results': []}
+
+
 @pytest.mark.django_db
 def test_update_examination_view(client, create_superuser, create_examination):
     """Тестирование обновления существующей проверки."""
@@ -212,11 +359,23 @@ def test_update_examination_view(client, create_superuser, create_examination):
         'safety_officer_name': "Анна Алексеева",
         'safety_officer_position': "Электрик"
     }
-    response = client.post(url, data)
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(url, data)
     assert response.status_code == 302
 
     updated_examination = Examination.objects.get(id=create_examination.id)
     assert updated_examination.protocol_number == '456/2024'
+    assert updated_examination.examined.position == "Инженер"
+    # Проверка загружается один раз, а изменённые проверка и аттестуемый
+    # записываются одним запросом UPDATE каждый
+    queries = [query['sql'] for query in context.captured_queries]
+    assert len([
+        sql for sql in queries
+        if sql.startswith('SELECT') and 'FROM "facility_examination"' in sql
+    ]) == 1
+    assert [sql.split()[1] for sql in queries if sql.startswith('UPDATE')] == [
+        '"facility_examination"', '"facility_examined"'
+    ]
 
 
 @pytest.mark.django_db
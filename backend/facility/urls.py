@@ -1,17 +1,31 @@
 from django.urls import path
 
-from .views import (ExaminationCreateView, ExaminationDeleteView,
-                    ExaminationUpdateView, IndexView)
+from .views import (DashboardView, EmployeeAutocompleteView,
+                    ExaminationCreateView, ExaminationDeleteView,
+                    ExaminationExportView, ExaminationImportView,
+                    ExaminationUpdateView, IndexView, StatisticsView)
 
 app_name = 'facility'
 
 urlpatterns = [
     path('', IndexView.as_view(), name='index'),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('statistics/', StatisticsView.as_view(), name='statistics'),
     path(
         'create/',
         ExaminationCreateView.as_view(),
         name='create_examination'
     ),
+    path(
+        'employees/autocomplete/',
+        EmployeeAutocompleteView.as_view(),
+        name='employee_autocomplete'
+    ),
+    path(
+        'import/',
+        ExaminationImportView.as_view(),
+        name='import_examinations'
+    ),
     path(
         'update/<int:pk>/',
         ExaminationUpdateView.as_view(),
@@ -22,4 +36,9 @@ urlpatterns = [
         ExaminationDeleteView.as_view(),
         name='delete_examination'
     ),
+    path(
+        'export/<str:file_format>/',
+        ExaminationExportView.as_view(),
+        name='export_examinations'
+    ),
 ]
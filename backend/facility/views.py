@@ -6,11 +6,26 @@ from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
-
-from .forms import ExaminationCreateForm, ExaminationUpdateForm
+from django.core.paginator import Page
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.views.generic import (CreateView, DeleteView, FormView, ListView,
+                                  TemplateView, UpdateView, View)
+from users.models import Organization
+
+from .caching import get_page_key
+from .dashboard import get_dashboard
+from .export import CONTENT_TYPES, STREAMS, get_columns, iter_rows
+from .filters import (get_filtered_examinations, get_ordering,
+                      get_visible_employees, search_employees)
+from .forms import (ExaminationCreateForm, ExaminationImportForm,
+                    ExaminationUpdateForm)
+from .importer import ImportFileError, import_file
 from .models import Examination
+from .pagination import ApproximateCountPaginator, CursorPaginator
+from .statistics import get_statistics
 
 
 class IndexView(ListView):
@@ -19,7 +34,11 @@ class IndexView(ListView):
     записи для суперпользователей и только связанные с организацией
     текущего пользователя для других пользователей. Также поддерживает
     фильтрацию по различным параметрам: дате текущей проверки, дате следующей
-    проверки, номеру курса, названию курса и цеху (участку).
+    проверки, номеру курса, названию курса и цеху (участку). Вычисленные
+    страницы списка кэшируются отдельно для каждой организации и
+    сбрасываются при изменении данных (см. модуль caching). Вместо
+    постраничной пагинации со смещением может использоваться ключевая
+    пагинация по курсору (настройка INDEX_PAGINATION).
 
     Параметры:
         - model: Модель, с которой работает представление (Examination).
@@ -41,6 +60,9 @@ class IndexView(ListView):
         """
         Получает фильтрованный список проверок в зависимости от параметров
         запроса. Записи сортируются в зависимости от параметра 'order_by'.
+        Связанные аттестуемый, организация, комиссия, инструктаж и программа
+        обучения загружаются одним запросом через select_related, поэтому
+        число запросов к базе не зависит от размера страницы.
 
         Параметры:
             - current_check_date: Фильтрация по текущей дате проверки.
@@ -48,48 +70,204 @@ class IndexView(ListView):
             - course_number: Фильтрация по номеру курса.
             - course_name: Фильтрация по названию курса.
             - brigade: Фильтрация по цеху (участку) аттестуемого.
+            - current: Только текущие проверки сотрудников.
+            - q: Полнотекстовый поиск по аттестуемому, номеру протокола,
+              программе обучения и комиссии.
             - order_by: Параметр сортировки (по умолчанию '-created_at').
+              Недопустимое значение заменяется сортировкой по умолчанию.
 
         Возвращает:
             - queryset: Отфильтрованный и отсортированный список проверок.
         """
-        user = self.request.user
-
-        if not user.is_authenticated:
-            return Examination.objects.none()
-
-        cache_key = (f'examinations_{user.id}_filters_'
-                     f'{self.request.GET.urlencode()}')
-        queryset = cache.get(cache_key)
-        if queryset is None:
-            if user.is_superuser:
-                queryset = Examination.objects.all()
-            else:
-                queryset = Examination.objects.filter(
-                    examined__company_name=user.organization
-                )
-            filters = {
-                'current_check_date': self.request.GET.get(
-                    'current_check_date'
-                ),
-                'next_check_date': self.request.GET.get('next_check_date'),
-                'course__course_number__icontains': self.request.GET.get(
-                    'course_number'
-                ),
-                'course__course_name__icontains': self.request.GET.get(
-                    'course_name'
-                ),
-                'examined__brigade__icontains': self.request.GET.get(
-                    'brigade'
-                ),
-            }
-            filters = {key: value for key, value in filters.items() if value}
-            queryset = queryset.filter(**filters)
-            order_by = self.request.GET.get('order_by', '-created_at')
-            queryset = queryset.order_by(order_by)
-            cache.set(cache_key, queryset, timeout=settings.CACHE_TTL)
+        return get_filtered_examinations(
+            self.request.user, self.request.GET
+        ).select_related(
+            'examined__company_name', 'commission', 'briefing', 'course'
+        )
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        """
+        Возвращает пагинатор страницы. При включённой настройке
+        INDEX_APPROXIMATE_COUNT общее количество записей берётся из оценки
+        планировщика PostgreSQL вместо точного COUNT(*).
+        """
+        paginator_class = (
+            ApproximateCountPaginator
+            if settings.INDEX_APPROXIMATE_COUNT else self.paginator_class
+        )
+        return paginator_class(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page, **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Разбивает список на страницы, используя кэш вычисленных страниц.
+        Закэшированная страница восстанавливается без обращения к базе:
+        из кэша берутся общее количество записей, номер страницы и её
+        объекты вместе со связанными записями. При настройке
+        INDEX_PAGINATION = 'cursor' используется ключевая пагинация
+        (см. модуль pagination).
+        """
+        if settings.INDEX_PAGINATION == 'cursor':
+            return self.paginate_by_cursor(queryset, page_size)
+
+        cache_key = get_page_key(self.request.user, self.request.GET)
+        cached_page = cache.get(cache_key) if cache_key else None
+        if cached_page is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            page.object_list = list(object_list)
+            if cache_key:
+                cache.set(cache_key, {
+                    'count': paginator.count,
+                    'number': page.number,
+                    'object_list': page.object_list,
+                }, timeout=settings.CACHE_TTL)
+            return paginator, page, page.object_list, is_paginated
+
+        paginator = self.get_paginator(
+            queryset, page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty()
+        )
+        paginator.count = cached_page['count']
+        page = Page(
+            cached_page['object_list'], cached_page['number'], paginator
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def paginate_by_cursor(self, queryset, page_size):
+        """
+        Возвращает страницу ключевой пагинации для курсора из параметра
+        'cursor'. Страница целиком хранится в кэше.
+        """
+        cache_key = get_page_key(self.request.user, self.request.GET)
+        page = cache.get(cache_key) if cache_key else None
+        if page is None:
+            paginator = CursorPaginator(
+                queryset, page_size, get_ordering(self.request.GET)
+            )
+            page = paginator.page(
+                self.request.GET.get('cursor'),
+                with_count=settings.INDEX_APPROXIMATE_COUNT
+            )
+            if cache_key:
+                cache.set(cache_key, page, timeout=settings.CACHE_TTL)
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        """
+        Добавляет в контекст признак ключевой пагинации и параметры
+        запроса без номера страницы и курсора для ссылок пагинатора.
+        """
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params.pop('cursor', None)
+        context['cursor_pagination'] = settings.INDEX_PAGINATION == 'cursor'
+        context['pagination_query'] = params.urlencode()
+        return context
 
-        return queryset
+
+class OrganizationReportMixin:
+    """
+    Миксин отчётов по проверкам, в которых суперпользователь может выбрать
+    организацию параметром 'organization' (по умолчанию все организации).
+    """
+
+    def get_organization_id(self):
+        """Возвращает выбранную организацию отчёта или None."""
+        organization_id = self.request.GET.get('organization', '')
+        return int(organization_id) if organization_id.isdigit() else None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_superuser:
+            context['organizations'] = Organization.objects.order_by('name')
+            context['organization_id'] = self.get_organization_id()
+        return context
+
+
+class DashboardView(LoginRequiredMixin, OrganizationReportMixin,
+                    TemplateView):
+    """
+    Представление сводки сроков проверок: количество сотрудников, срок
+    следующей проверки которых прошёл или наступает в ближайшие 30, 60 и
+    90 дней, по программам обучения и цехам (участкам) и список таких
+    сотрудников (см. модуль dashboard).
+
+    Параметры:
+        - organization: Организация сводки (только для суперпользователя,
+          по умолчанию все организации).
+
+    Возвращает:
+        - render: Страница сводки.
+    """
+    template_name = 'facility/dashboard.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['dashboard'] = get_dashboard(
+            self.request.user, self.get_organization_id()
+        )
+        return context
+
+
+class StatisticsView(LoginRequiredMixin, OrganizationReportMixin,
+                     TemplateView):
+    """
+    Представление статистики проверок организации: количество проверок по
+    месяцам, программам обучения и цехам (участкам) и периодичность
+    проверок (см. модуль statistics).
+
+    Параметры:
+        - organization: Организация статистики (только для
+          суперпользователя, по умолчанию все организации).
+
+    Возвращает:
+        - render: Страница статистики.
+    """
+    template_name = 'facility/statistics.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['statistics'] = get_statistics(
+            self.request.user, self.get_organization_id()
+        )
+        return context
+
+
+class ExaminationExportView(LoginRequiredMixin, View):
+    """
+    Представление для выгрузки списка проверок в файл CSV или XLSX.
+    Выгружаются записи, которые пользователь видит на главной странице,
+    с теми же фильтрами и сортировкой. Файл формируется и передаётся
+    по частям, поэтому расход памяти не зависит от количества записей
+    (см. модуль export).
+
+    Параметры:
+        - file_format: Формат файла ('csv' или 'xlsx').
+
+    Возвращает:
+        - StreamingHttpResponse: Файл выгрузки.
+    """
+
+    def get(self, request, file_format):
+        if file_format not in STREAMS:
+            raise Http404
+        columns = get_columns(request.user)
+        rows = iter_rows(
+            get_filtered_examinations(request.user, request.GET), columns
+        )
+        response = StreamingHttpResponse(
+            STREAMS[file_format](columns, rows),
+            content_type=CONTENT_TYPES[file_format]
+        )
+        filename = f'examinations_{timezone.localdate():%Y%m%d}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class ExaminationCreateView(LoginRequiredMixin, CreateView):
@@ -110,15 +288,109 @@ class ExaminationCreateView(LoginRequiredMixin, CreateView):
     template_name = 'facility/examination_create_form.html'
     success_url = reverse_lazy('facility:index')
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def get_initial(self):
+        """
+        Заполняет форму данными сотрудника, выбранного через поиск по ФИО
+        (параметр 'employee'): данными аттестуемого последней проверки, а
+        датой и группой этой проверки — предыдущую проверку.
+        """
+        initial = super().get_initial()
+        employee_id = self.request.GET.get('employee', '')
+        if not employee_id.isdigit():
+            return initial
+        employee = get_visible_employees(self.request.user).filter(
+            pk=employee_id
+        ).first()
+        if employee is None:
+            return initial
+        initial.update(employee=employee.pk, full_name=employee.full_name)
+        latest = employee.get_latest_examination()
+        if latest is not None:
+            initial.update(
+                position=latest.examined.position,
+                brigade=latest.examined.brigade,
+                work_experience=latest.examined.work_experience,
+                previous_safety_group=latest.examined.safety_group,
+                previous_check_date=latest.current_check_date,
+            )
+        return initial
+
+
+class EmployeeAutocompleteView(LoginRequiredMixin, View):
+    """
+    Представление для подсказок при вводе ФИО в форме создания проверки.
+    Возвращает доступных пользователю сотрудников, ФИО которых начинается
+    с введённого текста, и ссылку на форму, заполненную данными
+    сотрудника.
+
+    Параметры:
+        - q: Начало ФИО, не короче AUTOCOMPLETE_MIN_LENGTH символов.
+
+    Возвращает:
+        - JsonResponse: Список сотрудников в поле 'results'.
+    """
+    AUTOCOMPLETE_MIN_LENGTH = 2
+    AUTOCOMPLETE_LIMIT = 10
+
+    def get(self, request):
+        term = request.GET.get('q', '').strip()
+        if len(term) < self.AUTOCOMPLETE_MIN_LENGTH:
+            return JsonResponse({'results': []})
+        create_url = reverse('facility:create_examination')
+        employees = search_employees(request.user, term).select_related(
+            'organization'
+        )[:self.AUTOCOMPLETE_LIMIT]
+        return JsonResponse({'results': [
+            {
+                'id': employee.pk,
+                'full_name': employee.full_name,
+                'organization': str(employee.organization or ''),
+                'url': f'{create_url}?employee={employee.pk}',
+            }
+            for employee in employees
+        ]})
+
+
+class ExaminationImportView(LoginRequiredMixin, FormView):
+    """
+    Представление для загрузки проверок из файла CSV или XLSX. Строки
+    проверяются по правилам формы создания проверки и записываются
+    пакетами (см. модуль importer). Строки с ошибками пропускаются, а
+    результат импорта выводится на странице формы.
+
+    Параметры:
+        - request: Объект запроса с загружаемым файлом.
+
+    Возвращает:
+        - render: Отображает форму загрузки и результат импорта.
+    """
+    form_class = ExaminationImportForm
+    template_name = 'facility/examination_import_form.html'
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['user'] = self.request.user
         return kwargs
 
     def form_valid(self, form):
-        response = super().form_valid(form)
-        cache.delete('examinations_*')
-        return response
+        upload = form.cleaned_data['file']
+        try:
+            result = import_file(
+                upload, upload.name, self.request.user,
+                form.cleaned_data.get('company_name'),
+                dry_run=form.cleaned_data['dry_run']
+            )
+        except ImportFileError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
 
 
 class ExaminationUpdateView(LoginRequiredMixin,
@@ -143,10 +415,41 @@ class ExaminationUpdateView(LoginRequiredMixin,
     template_name = 'facility/examination_update_form.html'
     success_url = reverse_lazy('facility:index')
 
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Обрабатывает отправку формы в одной транзакции: от чтения записи
+        до сохранения изменений.
+        """
+        if request.method != 'POST':
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """
+        Загружает проверку вместе с аттестуемым и комиссией. При отправке
+        формы строки проверки и аттестуемого блокируются до конца
+        транзакции, чтобы одновременные правки не смешивались.
+        """
+        queryset = super().get_queryset().select_related(
+            'examined', 'commission'
+        )
+        if self.request.method == 'POST':
+            queryset = queryset.select_for_update(of=('self', 'examined'))
+        return queryset
+
+    def get_object(self, queryset=None):
+        """
+        Возвращает проверку, уже загруженную при проверке прав доступа.
+        """
+        if queryset is None and getattr(self, 'object', None) is not None:
+            return self.object
+        return super().get_object(queryset)
+
     def test_func(self):
         """Проверяет, что пользователь является администратором или
         создателем записи."""
-        obj = self.get_object()
+        self.object = obj = self.get_object()
         return (self.request.user.is_superuser or obj.examined.user ==
                 self.request.user)
 
@@ -154,11 +457,6 @@ class ExaminationUpdateView(LoginRequiredMixin,
         """Если доступ запрещён, перенаправляем на кастомную страницу 403."""
         raise PermissionDenied
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        cache.delete('examinations_*')
-        return response
-
 
 class ExaminationDeleteView(LoginRequiredMixin,
                             UserPassesTestMixin, DeleteView):
@@ -191,8 +489,3 @@ class ExaminationDeleteView(LoginRequiredMixin,
     def handle_no_permission(self):
         """Если доступ запрещён, перенаправляем на кастомную страницу 403."""
         raise PermissionDenied
-
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        cache.delete('examinations_*')
-        return response
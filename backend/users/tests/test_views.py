@@ -228,3 +228,18 @@ def test_user_logout(client_with_logged_in_user):
     response = client_with_logged_in_user.get(url)
     assert response.status_code == 302
     assert response.url == reverse('users:login')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', [
+    'users:profile', 'users:edit_profile', 'facility:statistics',
+])
+def test_anonymous_user_redirected_to_login(client, name):
+    """
+    Тест перенаправления анонимного пользователя со страницы, доступной
+    после входа, на страницу входа.
+    """
+    url = reverse(name)
+    response = client.get(url)
+    assert response.status_code == 302
+    assert response.url == f"{reverse('users:login')}?next={url}"